@@ -0,0 +1,9 @@
+"""
+git-pal performance benchmarks (not shipped with the package).
+
+    python -m benchmarks run -o baseline.json       # record a baseline
+    python -m benchmarks compare baseline.json      # re-run and fail on regressions
+
+Inputs come from deterministic generators in benchmarks.corpus, so results from
+different checkouts of the same machine are comparable.
+"""
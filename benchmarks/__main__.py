@@ -0,0 +1,63 @@
+import argparse
+import fnmatch
+import sys
+from pathlib import Path
+from typing import List
+
+from benchmarks import core, tui  # noqa: F401  (registers the benchmarks)
+from benchmarks.harness import (
+    DEFAULT_THRESHOLD, REGISTRY, compare, load_results, print_lines, run, write_results,
+)
+
+# Largest input size run by default; the 1M-line corpora are opt-in (--max-size 1000000).
+DEFAULT_MAX_SIZE = 100_000
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="git-pal benchmark suite.")
+    sub = parser.add_subparsers(dest="mode", required=True)
+    for mode in ("run", "compare", "list"):
+        p = sub.add_parser(mode)
+        if mode == "list":
+            continue
+        if mode == "compare":
+            p.add_argument("baseline", type=Path, help="Results JSON to compare against.")
+            p.add_argument("--current", type=Path, help="Compare this results JSON instead of running now.")
+            p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                           help=f"Allowed slowdown as a fraction (default {DEFAULT_THRESHOLD}).")
+        p.add_argument("-o", "--output", type=Path, help="Write the results JSON here.")
+        p.add_argument("-k", "--select", action="append", default=[],
+                       help="Only benchmarks whose name matches this glob (repeatable).")
+        p.add_argument("--repeat", type=int, default=5, help="Samples per benchmark (default 5).")
+        p.add_argument("--max-size", type=int, default=DEFAULT_MAX_SIZE,
+                       help=f"Skip inputs larger than this (default {DEFAULT_MAX_SIZE}).")
+    args = parser.parse_args(argv)
+
+    if args.mode == "list":
+        for bench in REGISTRY.values():
+            print(" ".join(bench.key(size) for size in bench.sizes))
+        return 0
+    selected = [b for b in REGISTRY.values()
+                if not args.select or any(fnmatch.fnmatch(b.name, pattern) for pattern in args.select)]
+    if args.mode == "compare" and args.current is not None:
+        current = load_results(args.current)
+    else:
+        current = run(selected, repeat=args.repeat, max_size=args.max_size,
+                      log=lambda line: print(line, file=sys.stderr))
+    if args.output is not None:
+        write_results(current, args.output)
+    if args.mode == "run":
+        return 0
+    baseline = load_results(args.baseline)
+    if args.current is None:
+        # Only what was run now is comparable.
+        baseline["results"] = {key: entry for key, entry in baseline["results"].items()
+                               if key in current["results"]}
+    lines, regressed = compare(baseline, current, args.threshold)
+    print_lines(lines)
+    if regressed:
+        print(f"{len(regressed)} benchmarks regressed by more than {args.threshold:.0%}.", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
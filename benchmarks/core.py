@@ -0,0 +1,157 @@
+"""Microbenchmarks for the todo parser/writer, the merge helpers and config/licensing startup."""
+
+import atexit
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from benchmarks.corpus import conflict_triple, todo_lines, todo_text
+from benchmarks.harness import benchmark
+
+TODO_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+SOURCE_SIZES = (1_000, 10_000, 100_000)
+# A full AST parse of a 100k-line module takes seconds; that size is covered by header_only.
+FULL_PARSE_SIZES = (1_000, 10_000)
+
+_TMP = Path(tempfile.mkdtemp(prefix="git-pal-bench-"))
+atexit.register(shutil.rmtree, _TMP, True)
+
+def _todo_file(n: int) -> Path:
+    path = _TMP / f"todo-{n}"
+    if not path.exists():
+        path.write_text(todo_text(n), encoding="utf-8")
+    return path
+
+# ---- todo files ----------------------------------------------------------------
+@benchmark("parse_todo_file", TODO_SIZES, "lines")
+def bench_parse_todo_file(n: int) -> Callable[[], Any]:
+    from git_pal.rebase.parser import parse_todo_file
+    path = _todo_file(n)
+    return lambda: parse_todo_file(path)
+
+@benchmark("parse_todo_table", TODO_SIZES, "lines")
+def bench_parse_todo_table(n: int) -> Callable[[], Any]:
+    from git_pal.rebase.parser import parse_todo_table
+    path = _todo_file(n)
+    return lambda: parse_todo_table(path)
+
+@benchmark("write_todo_file", TODO_SIZES, "lines")
+def bench_write_todo_file(n: int) -> Callable[[], Any]:
+    from git_pal.rebase.parser import parse_todo_table, write_todo_file
+    target = _TMP / f"write-{n}"
+    # Alternate between two plans so every call really rewrites the file.
+    plans = [parse_todo_table(_todo_file(n)), parse_todo_table(_todo_file(n))]
+    first = plans[1].indices_where(lambda command: command == "pick")[0]
+    plans[1].set_command(first, "drop")
+    state = [0]
+
+    def write() -> None:
+        state[0] ^= 1
+        write_todo_file(target, plans[state[0]])
+    return write
+
+@benchmark("RebaseAction", TODO_SIZES, "rows")
+def bench_rebase_action(n: int) -> Callable[[], Any]:
+    from git_pal.rebase.parser import iter_todo_fields
+    from git_pal.rebase.state import RebaseAction
+    fields = list(iter_todo_fields(todo_lines(n)))
+    return lambda: [RebaseAction(*f) for f in fields]
+
+# ---- merge helpers -------------------------------------------------------------
+@benchmark("is_diff_whitespace_only/whitespace", SOURCE_SIZES, "lines")
+def bench_whitespace_only(n: int) -> Callable[[], Any]:
+    from git_pal.merge.conflict_analyzer import is_diff_whitespace_only
+    base, _ours, theirs = conflict_triple(n, "whitespace")
+    assert is_diff_whitespace_only(base, theirs)
+    return lambda: is_diff_whitespace_only(base, theirs)
+
+@benchmark("is_diff_whitespace_only/real", SOURCE_SIZES, "lines")
+def bench_whitespace_real(n: int) -> Callable[[], Any]:
+    from git_pal.merge.conflict_analyzer import is_diff_whitespace_only
+    base, ours, _theirs = conflict_triple(n, "real")
+    assert not is_diff_whitespace_only(base, ours)
+    return lambda: is_diff_whitespace_only(base, ours)
+
+@benchmark("merge_python_imports/full", FULL_PARSE_SIZES, "lines")
+def bench_merge_imports(n: int) -> Callable[[], Any]:
+    from git_pal.merge.ast_merger import merge_python_imports
+    base, ours, theirs = conflict_triple(n, "imports")
+    return lambda: merge_python_imports(base, ours, theirs)
+
+@benchmark("merge_python_imports/header_only", SOURCE_SIZES, "lines")
+def bench_merge_imports_header(n: int) -> Callable[[], Any]:
+    from git_pal.merge.ast_merger import merge_python_imports
+    base, ours, theirs = conflict_triple(n, "imports")
+    return lambda: merge_python_imports(base, ours, theirs, header_only=True)
+
+# ---- config and licensing --------------------------------------------------------
+def license_config() -> Path:
+    """A config dir with a freshly signed license, selected through XDG_CONFIG_HOME."""
+    import jwt
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from git_pal.licensing import EXPECTED_ISSUER
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.public_key().public_bytes(serialization.Encoding.PEM,
+                                        serialization.PublicFormat.SubjectPublicKeyInfo).decode()
+    token = jwt.encode({"sub": "bench@example.com", "iss": EXPECTED_ISSUER, "exp": int(time.time()) + 86400,
+                        "features": ["pro"]}, key, algorithm="RS256")
+    home = _TMP / "xdg"
+    (home / "git-pal").mkdir(parents=True, exist_ok=True)
+    config = home / "git-pal" / "config.toml"
+    config.write_text(f'license_token = "{token}"\n\n[license]\npublic_key = """{pem}"""\n', encoding="utf-8")
+    os.environ["XDG_CONFIG_HOME"] = str(home)
+    return config.parent
+
+def _uncached(name: str) -> Callable[[Path], None]:
+    def remove(config_dir: Path) -> None:
+        try:
+            (config_dir / name).unlink()
+        except FileNotFoundError:
+            pass
+    return remove
+
+@benchmark("load_config/toml")
+def bench_load_config_toml(_n: int) -> Callable[[], Any]:
+    from git_pal.config import SNAPSHOT_FILE, load_config
+    config_dir, drop_snapshot = license_config(), _uncached(SNAPSHOT_FILE)
+
+    def load() -> None:
+        drop_snapshot(config_dir)
+        load_config.cache_clear()
+        load_config()
+    return load
+
+@benchmark("load_config/snapshot")
+def bench_load_config_snapshot(_n: int) -> Callable[[], Any]:
+    from git_pal.config import load_config
+    license_config()
+
+    def load() -> None:
+        load_config.cache_clear()
+        load_config()
+    return load
+
+@benchmark("verify_license/rs256")
+def bench_verify_license(_n: int) -> Callable[[], Any]:
+    from git_pal.config import load_config
+    from git_pal.licensing import VERDICT_FILE, verify_license
+    config_dir, drop_verdict = license_config(), _uncached(VERDICT_FILE)
+    load_config.cache_clear()
+
+    def verify() -> None:
+        drop_verdict(config_dir)
+        verify_license()
+    return verify
+
+@benchmark("verify_license/verdict")
+def bench_verify_license_cached(_n: int) -> Callable[[], Any]:
+    from git_pal.config import load_config
+    from git_pal.licensing import verify_license
+    license_config()
+    load_config.cache_clear()
+    return verify_license
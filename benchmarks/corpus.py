@@ -0,0 +1,98 @@
+"""Deterministic synthetic inputs: the same (size, seed) always yields the same bytes."""
+
+import random
+from typing import List, Tuple
+
+_WORDS = ("add", "fix", "parser", "table", "cache", "merge", "rebase", "docs", "test", "config",
+          "license", "bump", "refactor", "remove", "typo", "handle", "edge", "case", "api", "cli")
+_MODULES = ("os", "re", "sys", "json", "time", "typing", "pathlib", "hashlib", "itertools", "functools",
+            "collections", "dataclasses", "subprocess", "threading", "contextlib", "textwrap")
+
+# Relative weights of plain commit commands in a generated todo.
+_COMMIT_MIX = (("pick", 70), ("fixup", 8), ("squash", 4), ("reword", 6), ("edit", 2), ("drop", 5),
+               ("p", 3), ("f", 2))
+
+def _sha(rng: random.Random) -> str:
+    return f"{rng.getrandbits(28):07x}"
+
+def _subject(rng: random.Random) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(2, 8)))
+
+def todo_lines(n: int, seed: int = 0) -> List[str]:
+    """
+    n todo lines like `git rebase -i --rebase-merges --update-refs` writes: mostly
+    commit commands, with merged topic branches (label/reset/merge), update-ref,
+    exec and break rows, blank lines and comments, and git's trailing help block.
+    """
+    rng = random.Random(seed)
+    commands = [name for name, _w in _COMMIT_MIX]
+    weights = [w for _n, w in _COMMIT_MIX]
+    lines = ["label onto", ""]
+    topic = 0
+    while len(lines) < n:
+        roll = rng.random()
+        if roll < 0.02:
+            topic += 1
+            lines.append(f"# Branch topic-{topic}")
+            lines.append("reset onto")
+            for _ in range(rng.randint(1, 4)):
+                lines.append(f"pick {_sha(rng)} {_subject(rng)}")
+            lines.append(f"label topic-{topic}")
+            lines.append("")
+            lines.append("reset onto")
+            lines.append(f"merge -C {_sha(rng)} topic-{topic} # Merge branch 'topic-{topic}'")
+        elif roll < 0.03:
+            lines.append(f"update-ref refs/heads/stack-{rng.randint(1, 50)}")
+        elif roll < 0.04:
+            lines.append(f"exec make test-{rng.randint(1, 9)}")
+        elif roll < 0.045:
+            lines.append("break")
+        elif roll < 0.06:
+            lines.append(f"# {_subject(rng)}")
+        else:
+            command = rng.choices(commands, weights)[0]
+            flags = "-C " if command == "fixup" and rng.random() < 0.2 else ""
+            lines.append(f"{command} {flags}{_sha(rng)} {_subject(rng)}")
+    del lines[n:]
+    lines += ["", "# Rebase 0000000..1111111 onto 0000000", "#", "# Commands:", "# p, pick <commit> = use commit"]
+    return lines
+
+def todo_text(n: int, seed: int = 0) -> str:
+    return "\n".join(todo_lines(n, seed)) + "\n"
+
+def _python_module(rng: random.Random, lines: int, imports: List[str]) -> List[str]:
+    out = ['"""Generated module."""'] + imports + [""]
+    fn = 0
+    while len(out) < lines:
+        fn += 1
+        out.append(f"def handler_{fn}(value, *, limit={rng.randint(1, 99)}):")
+        for _ in range(rng.randint(2, 12)):
+            out.append(f"    value = {rng.choice(_MODULES)}_helper(value, {rng.randint(0, 999)}) + limit")
+        out.append("    return value")
+        out.append("")
+    return out[:max(lines, len(imports) + 1)]
+
+def conflict_triple(lines: int, kind: str, seed: int = 0) -> Tuple[str, str, str]:
+    """
+    (base, ours, theirs) Python sources of about `lines` lines. kind is "whitespace"
+    (theirs only re-indents and adds trailing spaces), "imports" (both sides add
+    different imports) or "real" (both sides change the same statements).
+    """
+    rng = random.Random(seed)
+    imports = [f"import {m}" for m in rng.sample(_MODULES, 6)]
+    base = _python_module(rng, lines, imports)
+    ours = list(base)
+    theirs = list(base)
+    if kind == "whitespace":
+        theirs = [line.replace("    ", "\t", 1) + ("  " if i % 3 == 0 else "") for i, line in enumerate(base)]
+        theirs = [line.replace(" + ", "  +  ") for line in theirs]
+    elif kind == "imports":
+        ours[1:1] = [f"from {m} import {w}" for m, w in zip(rng.sample(_MODULES, 3), _WORDS)]
+        theirs[1:1] = [f"import {m}" for m in rng.sample(_MODULES, 3)]
+    elif kind == "real":
+        for i in range(len(base) // 2, len(base), 7):
+            ours[i] = base[i] + " * 2"
+            theirs[i] = base[i] + " * 3"
+    else:
+        raise ValueError(f"unknown conflict kind {kind!r}")
+    return "\n".join(base) + "\n", "\n".join(ours) + "\n", "\n".join(theirs) + "\n"
@@ -0,0 +1,147 @@
+"""Registry, timer, JSON results and baseline comparison shared by the benchmark modules."""
+
+import gc
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+RESULTS_VERSION = 1
+# compare fails when a benchmark's best time exceeds the baseline's by more than this fraction.
+DEFAULT_THRESHOLD = 0.25
+# Benchmarks faster than this (seconds per call) are repeated within one sample to beat timer noise.
+MIN_SAMPLE_TIME = 0.05
+
+# setup(size) returns the callable to time; it may do any untimed preparation first.
+# For a latency benchmark it returns sample(repeat) instead, which times its own
+# interactions and returns their latencies in seconds.
+Setup = Callable[[int], Callable[..., Any]]
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Setup
+    sizes: Tuple[int, ...] = (0,)
+    unit: str = ""  # what size counts ("lines", "rows"); empty for fixed-size benchmarks
+    latency: bool = False  # reported as percentiles and compared by median
+
+    def key(self, size: int) -> str:
+        return f"{self.name}[{size}]" if self.unit else self.name
+
+REGISTRY: Dict[str, Benchmark] = {}
+
+def benchmark(name: str, sizes: Iterable[int] = (0,), unit: str = "",
+              latency: bool = False) -> Callable[[Setup], Setup]:
+    """Register setup under name, to be run once per size."""
+    def register(setup: Setup) -> Setup:
+        REGISTRY[name] = Benchmark(name, setup, tuple(sizes), unit, latency)
+        return setup
+    return register
+
+def measure(fn: Callable[[], Any], repeat: int) -> List[float]:
+    """Seconds per call for `repeat` samples, with GC off while timing (like timeit)."""
+    start = time.perf_counter()
+    fn()  # warm-up (imports, caches, first-touch allocations), also sizes the samples
+    single = time.perf_counter() - start
+    number = max(1, int(MIN_SAMPLE_TIME / single)) if single > 0 else 1000
+    samples = []
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - start) / number)
+    finally:
+        if enabled:
+            gc.enable()
+    return samples
+
+def run(benchmarks: Iterable[Benchmark], repeat: int = 5, max_size: Optional[int] = None,
+        log: Callable[[str], None] = lambda line: None) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for bench in benchmarks:
+        for size in bench.sizes:
+            if max_size is not None and size > max_size:
+                continue
+            if bench.latency:
+                samples = bench.setup(size)(repeat)
+            else:
+                samples = measure(bench.setup(size), repeat)
+            best, median = min(samples), statistics.median(samples)
+            entry: Dict[str, Any] = {"best": best, "median": median, "samples": samples}
+            if bench.latency:
+                entry.update(p90=percentile(samples, 90), p99=percentile(samples, 99), max=max(samples),
+                             metric="median")
+            elif bench.unit and best > 0:
+                entry["per_second"] = size / best
+                entry["unit"] = bench.unit
+            results[bench.key(size)] = entry
+            log(format_entry(bench.key(size), entry))
+    return {"version": RESULTS_VERSION, "meta": _meta(), "results": results}
+
+def percentile(samples: List[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+def _meta() -> Dict[str, Any]:
+    from importlib import metadata
+    try:
+        version = metadata.version("git-pal")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    return {"git_pal": version, "python": platform.python_version(),
+            "implementation": platform.python_implementation(), "platform": platform.platform(),
+            "machine": platform.machine(), "timestamp": int(time.time())}
+
+def format_entry(key: str, entry: Dict[str, Any]) -> str:
+    if entry.get("metric") == "median":
+        return (f"{key:<44} p50 {entry['median'] * 1000:8.2f} ms  p90 {entry['p90'] * 1000:.2f}"
+                f"  p99 {entry['p99'] * 1000:.2f}  max {entry['max'] * 1000:.2f}  (n={len(entry['samples'])})")
+    rate = f"  {entry['per_second']:>12,.0f} {entry['unit']}/s" if "per_second" in entry else ""
+    return f"{key:<44} {entry['best'] * 1000:10.3f} ms  (median {entry['median'] * 1000:.3f}){rate}"
+
+def write_results(results: Dict[str, Any], path: Path) -> None:
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+def load_results(path: Path) -> Dict[str, Any]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path}: unsupported results version {data.get('version')!r}")
+    return data
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD) -> Tuple[List[str], List[str]]:
+    """
+    (report lines, regressed keys). Best times are compared (medians for latency
+    benchmarks); keys missing on either side are listed, not failed.
+    """
+    lines, regressed = [], []
+    base, cur = baseline["results"], current["results"]
+    for key in sorted(base.keys() | cur.keys()):
+        if key not in cur or key not in base:
+            lines.append(f"{key:<44} {'only in baseline' if key in base else 'new'}")
+            continue
+        metric = cur[key].get("metric", "best")
+        old, new = base[key][metric], cur[key][metric]
+        ratio = new / old if old > 0 else 1.0
+        verdict = ""
+        if ratio > 1 + threshold:
+            verdict = "  REGRESSION"
+            regressed.append(key)
+        elif ratio < 1 / (1 + threshold):
+            verdict = "  faster"
+        lines.append(f"{key:<44} {old * 1000:10.3f} -> {new * 1000:10.3f} ms"
+                     f"  x{ratio:.2f}{verdict}")
+    return lines, regressed
+
+def print_lines(lines: Iterable[str]) -> None:
+    for line in lines:
+        print(line, file=sys.stderr)
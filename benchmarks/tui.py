@@ -0,0 +1,138 @@
+"""Interaction latency of the rebase editor, driven through Textual's headless pilot."""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List
+
+from benchmarks.core import license_config
+from benchmarks.corpus import todo_lines
+from benchmarks.harness import benchmark
+
+TUI_SIZES = (100, 10_000, 100_000)
+TERMINAL_SIZE = (120, 40)
+# Interactions sampled per --repeat: cheap keypresses, and those opening a modal.
+KEYS_PER_REPEAT = 20
+MODALS_PER_REPEAT = 4
+
+# (pilot, RebaseScreen, count) -> latencies of `count` interactions, in seconds
+Interaction = Callable[[Any, Any, int], Awaitable[List[float]]]
+
+# Pilot.press and a bare Pilot.pause() wait for the app to go idle, which sleeps in 20ms
+# steps and would swamp the latencies measured here. Keys are posted directly instead, and
+# an interaction is over once its effect is visible (done()) and Pilot.pause(0) has let the
+# queued messages run and the screen lay out and paint, without the idle wait.
+
+async def _settle(pilot: Any, done: Callable[[], bool] = lambda: True) -> None:
+    while not done():
+        await asyncio.sleep(0)
+    await pilot.pause(0)
+
+async def _press(pilot: Any, key: str, done: Callable[[], bool]) -> None:
+    from textual import events
+    pilot.app.post_message(events.Key(key, "\r" if key == "enter" else None))
+    await _settle(pilot, done)
+
+async def _timed(action: Awaitable[None]) -> float:
+    start = time.perf_counter()
+    await action
+    return time.perf_counter() - start
+
+def _plan(n: int) -> Any:
+    from git_pal.rebase.parser import iter_todo_fields
+    from git_pal.rebase.state import ActionTable
+    license_config()
+    table = ActionTable()
+    table.extend_fields(iter_todo_fields(todo_lines(n)))
+    return table
+
+async def _start_editor(plan: Any, interact: Interaction, count: int) -> List[float]:
+    from git_pal.tui.app import GitPalApp
+    from git_pal.tui.screens.rebase import RebaseScreen
+    app = GitPalApp(initial_actions=plan.copy(), todo_file_path=Path("git-rebase-todo"))
+    async with app.run_test(size=TERMINAL_SIZE) as pilot:
+        await _settle(pilot, lambda: isinstance(app.screen, RebaseScreen))
+        return await interact(pilot, app.screen, count)
+
+def _session(n: int, interact: Interaction, per_repeat: int = MODALS_PER_REPEAT) -> Callable[[int], List[float]]:
+    """Sampler running `interact` in one editor session over an n-line plan."""
+    plan = _plan(n)
+    return lambda repeat: asyncio.run(_start_editor(plan, interact, repeat * per_repeat))
+
+@benchmark("tui/first_frame", TUI_SIZES, "lines", latency=True)
+def bench_first_frame(n: int) -> Callable[[int], List[float]]:
+    """Startup to the first painted editor frame: app, license check, screen and table build."""
+    plan = _plan(n)
+
+    def once() -> float:
+        start = time.perf_counter()
+
+        async def first_frame(pilot: Any, screen: Any, count: int) -> List[float]:
+            return [time.perf_counter() - start]
+        return asyncio.run(_start_editor(plan, first_frame, 0))[0]
+    once()  # warm-up: imports and stylesheet parsing are paid by the first app in the process
+    return lambda repeat: [once() for _ in range(repeat)]
+
+@benchmark("tui/cursor_move", TUI_SIZES, "lines", latency=True)
+def bench_cursor_move(n: int) -> Callable[[int], List[float]]:
+    async def interact(pilot: Any, screen: Any, count: int) -> List[float]:
+        table = screen.query_one("#rebase-table")
+        samples = []
+        for i in range(count):
+            # Down and back up in runs of ten, so the cursor stays near the top at every size.
+            step = 1 if (i // 10) % 2 == 0 else -1
+            row = table.cursor_row + step
+            samples.append(await _timed(_press(pilot, "down" if step > 0 else "up",
+                                               lambda row=row: table.cursor_row == row)))
+        return samples
+    return _session(n, interact, KEYS_PER_REPEAT)
+
+async def _open_modal(pilot: Any, screen: Any) -> None:
+    await _press(pilot, "enter", lambda: pilot.app.screen is not screen)
+    await _settle(pilot)  # the modal's own mount and first paint
+
+async def _focus_button(pilot: Any, button: str) -> None:
+    # Buttons are pressed with enter; Pilot.click would add its idle wait to the measurement.
+    pilot.app.screen.query_one(f"#{button}").focus()
+    await _settle(pilot)
+
+@benchmark("tui/modal_open", TUI_SIZES, "lines", latency=True)
+def bench_modal_open(n: int) -> Callable[[int], List[float]]:
+    async def interact(pilot: Any, screen: Any, count: int) -> List[float]:
+        samples = []
+        for _ in range(count):
+            samples.append(await _timed(_open_modal(pilot, screen)))
+            await _focus_button(pilot, "cancel")
+            await _press(pilot, "enter", lambda: pilot.app.screen is screen)
+        return samples
+    return _session(n, interact)
+
+@benchmark("tui/modal_close", TUI_SIZES, "lines", latency=True)
+def bench_modal_close(n: int) -> Callable[[int], List[float]]:
+    async def interact(pilot: Any, screen: Any, count: int) -> List[float]:
+        samples = []
+        for _ in range(count):
+            await _open_modal(pilot, screen)
+            await _focus_button(pilot, "cancel")
+            samples.append(await _timed(_press(pilot, "enter", lambda: pilot.app.screen is screen)))
+        return samples
+    return _session(n, interact)
+
+@benchmark("tui/edit_apply", TUI_SIZES, "lines", latency=True)
+def bench_edit_apply(n: int) -> Callable[[int], List[float]]:
+    """Save in the edit modal until the edited row is repainted (undo history and search index included)."""
+    async def interact(pilot: Any, screen: Any, count: int) -> List[float]:
+        from textual.widgets import Input
+        index = screen._view[screen.query_one("#rebase-table").cursor_row]
+        original = screen.actions.command(index)
+        samples = []
+        for i in range(count):
+            command = "drop" if i % 2 == 0 else original
+            await _open_modal(pilot, screen)
+            pilot.app.screen.query_one("#input-command", Input).value = command
+            await _focus_button(pilot, "save")
+            samples.append(await _timed(_press(
+                pilot, "enter",
+                lambda command=command: pilot.app.screen is screen and screen.actions.command(index) == command)))
+        return samples
+    return _session(n, interact)
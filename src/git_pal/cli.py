@@ -1,17 +1,75 @@
-"""GitPal CLI entry point."""
+"""GitPal CLI entry point.
+
+Startup is kept light: Textual, pydantic and the crypto stack are only imported
+once we know a TUI session is actually going to run.
+"""
 
 from __future__ import annotations
 import argparse
+import importlib
+import os
 import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from git_pal import trace
+from git_pal.rebase.journal import EditJournal, restore_journal
+from git_pal.rebase.parser import parse_todo_table, write_todo_file
+
+# Imported one by one under --profile-startup so the breakdown shows who is slow.
+_HEAVY_MODULES = (
+    "textual.app",
+    "pydantic",
+    "cryptography.hazmat.primitives.serialization",
+    "jwt",
+    "git_pal.tui.app",
+)
+
+class _StartupProfile:
+    """Wall-clock breakdown of CLI phases, printed to stderr by --profile-startup (and traced under GIT_PAL_TRACE)."""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.start = time.perf_counter()
+        self.rows: List[Tuple[str, float]] = []
 
-from git_pal.tui.app import GitPalApp, TUIQuitRequest
-from git_pal.rebase.parser import parse_todo_file, write_todo_file
-from git_pal.rebase.state import RebaseAction
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            with trace.span(name, "cli"):
+                yield
+        finally:
+            self.rows.append((name, time.perf_counter() - t0))
+
+    def import_module(self, name: str):
+        if not self.enabled and not trace.enabled():
+            return importlib.import_module(name)
+        if name == "git_pal.tui.app":
+            for dep in _HEAVY_MODULES[:-1]:
+                with self.phase(f"import {dep}"):
+                    importlib.import_module(dep)
+        with self.phase(f"import {name}"):
+            return importlib.import_module(name)
+
+    def report(self) -> None:
+        if not self.enabled:
+            return
+        total = time.perf_counter() - self.start
+        width = max([len(name) for name, _ in self.rows] + [5])
+        print("[git-pal] startup profile:", file=sys.stderr)
+        for name, seconds in self.rows:
+            print(f"  {name:<{width}}  {seconds * 1000:8.1f} ms", file=sys.stderr)
+        print(f"  {'total':<{width}}  {total * 1000:8.1f} ms", file=sys.stderr)
 
 def main(argv: list[str] | None = None) -> int:
     """Entry point for the git-pal CLI."""
     argv = argv or sys.argv[1:]
+    if argv and argv[0] == "conflicts":
+        with trace.span("cli.conflicts", "cli"):
+            return _conflicts(argv[1:])
     parser = argparse.ArgumentParser(
         prog="git-pal",
         description="Interactive TUI for Git rebase conflict resolution."
@@ -21,31 +79,148 @@ def main(argv: list[str] | None = None) -> int:
         type=Path,
         help="Path to the Git rebase todo file provided by Git."
     )
+    parser.add_argument(
+        "--rules",
+        type=Path,
+        default=os.environ.get("GIT_PAL_RULES") or None,
+        help="Apply a rules file to the todo and exit without starting the TUI (default: $GIT_PAL_RULES)."
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print an import-time and phase breakdown to stderr on exit."
+    )
     args = parser.parse_args(argv)
+    profile = _StartupProfile(args.profile_startup)
+    try:
+        with trace.span("cli.main", "cli"):
+            if args.rules is not None:
+                return _run_rules(args.todo_file, Path(args.rules), profile)
+            return _run(args.todo_file, profile)
+    finally:
+        profile.report()
 
-    todo_path = args.todo_file
+def _run(todo_path: Path, profile: _StartupProfile) -> int:
     if not todo_path.exists():
         print(f"[git-pal] error: todo file not found at {todo_path}", file=sys.stderr)
         return 1
 
     try:
-        actions: list[RebaseAction] = parse_todo_file(todo_path)
-        app = GitPalApp(initial_actions=actions, todo_file_path=todo_path)
-        final_actions = app.run()
+        with profile.phase("parse todo"):
+            actions = parse_todo_table(todo_path)
+            actions, restored = restore_journal(todo_path, actions)
+        if restored:
+            print(f"[git-pal] restored {restored} unsaved edits from the autosave journal.", file=sys.stderr)
+        tui = profile.import_module("git_pal.tui.app")
+        journal = EditJournal.open(todo_path)
+        try:
+            with profile.phase("tui session"):
+                # git runs the sequence editor from the working tree.
+                app = tui.GitPalApp(initial_actions=actions, todo_file_path=todo_path, repo_path=Path.cwd(),
+                                    journal=journal)
+                final_actions = app.run()
+        except tui.TUIQuitRequest:
+            journal.discard()
+            print("[git-pal] user exited TUI.")
+            return 1
+        finally:
+            journal.close()  # kept on disk unless the session ended normally
+        if app.return_code:
+            print("[git-pal] TUI crashed; edits are kept in the autosave journal.", file=sys.stderr)
+            return 1
 
         if final_actions is not None:
-            write_todo_file(todo_path, final_actions)
+            with profile.phase("write todo"):
+                write_todo_file(todo_path, final_actions)
+            journal.discard()
             return 0
         else:
+            journal.discard()
             print("[git-pal] rebase aborted by user.", file=sys.stderr)
             return 1
-    except TUIQuitRequest:
-        print("[git-pal] user exited TUI.")
-        return 1
     except Exception as e:
         print(f"[git-pal] fatal error: {e}", file=sys.stderr)
         return 1
 
+def _run_rules(todo_path: Path, rules_path: Path, profile: _StartupProfile) -> int:
+    """Headless mode: rewrite the todo from a rules file. Never imports Textual."""
+    from git_pal.rebase.rules import RulesError, apply_rules, load_rules
+
+    if not todo_path.exists():
+        print(f"[git-pal] error: todo file not found at {todo_path}", file=sys.stderr)
+        return 1
+    try:
+        with profile.phase("load rules"):
+            rules = load_rules(rules_path)
+        with profile.phase("parse todo"):
+            actions = parse_todo_table(todo_path)
+        with profile.phase("apply rules"):
+            # git runs the sequence editor from the working tree.
+            actions, report = apply_rules(actions, rules, repo_path=Path.cwd())
+        with profile.phase("write todo"):
+            write_todo_file(todo_path, actions)
+    except (RulesError, RuntimeError, OSError) as e:
+        print(f"[git-pal] error: {e}", file=sys.stderr)
+        return 1
+    for name in report.unresolved:
+        print(f"[git-pal] warning: {name}: no commit matches 'after'; rows left in place.", file=sys.stderr)
+    applied = ", ".join(f"{name}: {count}" for name, count in report.per_rule.items())
+    print(f"[git-pal] rules: {report.relabeled} commands changed, {report.moved} rows moved"
+          + (f" ({applied})." if applied else "."), file=sys.stderr)
+    return 0
+
+def _conflicts(argv: List[str]) -> int:
+    """`git-pal conflicts`: classify every unmerged path, optionally resolving the trivial ones."""
+    parser = argparse.ArgumentParser(
+        prog="git-pal conflicts",
+        description="Triage unmerged paths as whitespace-only, import-only or real conflicts."
+    )
+    parser.add_argument(
+        "--resolve",
+        action="store_true",
+        help="Write and stage the merged result for whitespace-only and import-only conflicts."
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes for classification (default: one per CPU)."
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore and do not update the analysis cache in .git/git-pal/."
+    )
+    args = parser.parse_args(argv)
+    from git_pal.git import get_repo_root
+    from git_pal.merge import triage
+    from git_pal.merge.cache import AnalysisCache
+
+    try:
+        repo = get_repo_root(Path.cwd())
+        entries = triage.list_unmerged(repo)
+        if not entries:
+            print("[git-pal] no unmerged paths.")
+            return 0
+        cache = None if args.no_cache else AnalysisCache.for_repo(repo)
+        results = []
+        for result in triage.triage_conflicts(repo, entries, max_workers=args.jobs, cache=cache):
+            print(f"{result.kind:<10} {result.path}" + (f"  ({result.reason})" if result.reason else ""), flush=True)
+            results.append(result)
+        trivial = [r for r in results if r.resolution is not None]
+        print(f"[git-pal] {len(results)} conflicts: {len(trivial)} trivial, {len(results) - len(trivial)} real.")
+        if cache is not None:
+            print(f"[git-pal] analysis cache: {cache.stats.hits} hits, {cache.stats.misses} misses.")
+        if args.resolve and trivial:
+            resolved = triage.apply_resolutions(repo, trivial)
+            print(f"[git-pal] resolved and staged {len(resolved)} paths.")
+            if len(resolved) < len(trivial):
+                print(f"[git-pal] left {len(trivial) - len(resolved)} symlinked paths for you to resolve.")
+        return 0
+    except (RuntimeError, FileNotFoundError) as e:
+        print(f"[git-pal] error: {e}", file=sys.stderr)
+        return 1
+
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -1,22 +1,31 @@
+import json
+import os
 import sys
+from dataclasses import asdict, dataclass
 from pathlib import Path
 from functools import lru_cache
-from pydantic import BaseModel, Field, ValidationError
+from typing import Any, Dict, Optional
 
-if sys.version_info < (3, 11):
-    import tomli as tomllib
-else:
-    import tomllib
+from git_pal.fsutil import atomic_write
+from git_pal.metrics import METRICS
+from git_pal.trace import traced
 
-class LicenseConfig(BaseModel):
-    public_key: str = Field(..., description="Public key (PEM) for license verification.")
+# Config values are plain dataclasses; pydantic (and TOML) are only imported to
+# validate a config file that has no valid snapshot yet.
 
-class Config(BaseModel):
+@dataclass(frozen=True)
+class LicenseConfig:
+    public_key: str  # Public key (PEM) for license verification.
+
+@dataclass(frozen=True)
+class Config:
     license: LicenseConfig
-    license_token: str = Field(..., description="User's license token (JWT/JWS).")
+    license_token: str  # User's license token (JWT/JWS).
+
+SNAPSHOT_FILE = "config.snapshot.json"
+SNAPSHOT_VERSION = 1
 
 def get_config_path() -> Path:
-    import os
     if sys.platform == "win32":
         return Path.home() / "AppData" / "Roaming" / "git-pal" / "config.toml"
     # Respect XDG_CONFIG_HOME on Unix-like systems
@@ -26,19 +35,77 @@ def get_config_path() -> Path:
     return Path.home() / ".config" / "git-pal" / "config.toml"
 
 @lru_cache(maxsize=1)
+@traced("load_config")
 def load_config() -> Config:
     config_path = get_config_path()
     if not config_path.is_file():
         raise FileNotFoundError(
             f"Config file not found. Please create {config_path}\nSee README.md for configuration details."
         )
+    key = _snapshot_key(config_path)
+    cached = _read_snapshot(config_path, key)
+    stats = METRICS.cache("config snapshot")
+    if cached is not None:
+        stats.hits += 1
+        return cached
+    stats.misses += 1
+    if sys.version_info < (3, 11):
+        import tomli as tomllib
+    else:
+        import tomllib
+    from pydantic import ValidationError
     try:
         with config_path.open("rb") as f:
             raw = tomllib.load(f)
-        return Config(**raw)
+        config = _validate(raw)
     except tomllib.TOMLDecodeError as e:
         raise ValueError(f"Error parsing TOML config {config_path}: {e}")
     except ValidationError as e:
         raise ValueError(f"Invalid configuration in {config_path}:\n{e}")
     except Exception as e:
         raise RuntimeError(f"Failed to load configuration: {e}")
+    if key is not None:
+        _write_snapshot(config_path, key, config)
+    return config
+
+def _validate(raw: Dict[str, Any]) -> Config:
+    from pydantic import TypeAdapter
+    return TypeAdapter(Config).validate_python(raw)
+
+# ---- Validated snapshot --------------------------------------------------------
+def get_snapshot_path(config_path: Optional[Path] = None) -> Path:
+    return (config_path or get_config_path()).parent / SNAPSHOT_FILE
+
+def _snapshot_key(config_path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        st = config_path.stat()
+    except OSError:
+        return None
+    return {"v": SNAPSHOT_VERSION, "path": str(config_path.resolve()), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+def _read_snapshot(config_path: Path, key: Optional[Dict[str, Any]]) -> Optional[Config]:
+    if key is None:
+        return None
+    try:
+        raw = json.loads(get_snapshot_path(config_path).read_text(encoding="utf-8"))
+        if raw.get("key") != key:
+            return None
+        data = raw["config"]
+        public_key, token = data["license"]["public_key"], data["license_token"]
+        if not isinstance(public_key, str) or not isinstance(token, str):
+            return None
+        return Config(license=LicenseConfig(public_key=public_key), license_token=token)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+def _write_snapshot(config_path: Path, key: Dict[str, Any], config: Config) -> None:
+    try:
+        # 0o600: holds the license token, like the config itself.
+        atomic_write(get_snapshot_path(config_path), json.dumps({"key": key, "config": asdict(config)}), mode=0o600)
+    except OSError:
+        pass
+
+def is_config_snapshot_valid(config_path: Optional[Path] = None) -> bool:
+    """True when the snapshot matches the config file's path, mtime and size, so load_config() can skip TOML and pydantic."""
+    config_path = config_path or get_config_path()
+    return _read_snapshot(config_path, _snapshot_key(config_path)) is not None
@@ -0,0 +1,50 @@
+import os
+import stat
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+def atomic_write(path: Path, data: Union[str, bytes], mode: Optional[int] = None, fsync: bool = False) -> None:
+    """
+    Replace path with data (str is written as UTF-8) through a temp file in the same
+    directory and os.replace, so readers see the old content or the new, never a mix.
+    mode is applied to the new file; by default an existing file keeps its mode and a
+    new one gets the umask default. fsync=True also flushes the data and the rename to
+    disk before returning. Raises OSError; the temp file never outlives a failure.
+    """
+    payload = data.encode("utf-8") if isinstance(data, str) else data
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    if mode is None:
+        try:
+            mode = stat.S_IMODE(path.stat().st_mode)
+        except OSError:
+            pass  # new file
+    try:
+        with tmp.open("wb") as f:
+            f.write(payload)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if mode is not None and os.name != "nt":
+            os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    if fsync:
+        _fsync_dir(path.parent)
+
+def _fsync_dir(directory: Path) -> None:
+    # Makes the rename itself durable; not supported (or needed) on Windows.
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
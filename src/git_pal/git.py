@@ -1,41 +1,449 @@
+from __future__ import annotations
+import atexit
+import os
+import re
 import subprocess
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from git_pal import trace
+from git_pal.metrics import METRICS
 
 def _run_git_command(args: list[str], cwd: Path) -> str:
+    METRICS.git_spawn()
+    started = time.perf_counter()
     try:
-        result = subprocess.run(
-            ["git"] + args,
-            cwd=cwd,
-            capture_output=True,
-            text=True,
-            check=True,
-            encoding="utf-8",
-        )
+        with trace.span(f"git {args[0]}", "git", argv=args):
+            result = subprocess.run(
+                ["git"] + args,
+                cwd=cwd,
+                capture_output=True,
+                text=True,
+                check=True,
+                encoding="utf-8",
+            )
         return result.stdout.strip()
     except subprocess.CalledProcessError as e:
         raise RuntimeError(f"Git command failed: {e.stderr.strip()}")
     except FileNotFoundError:
         raise RuntimeError("Git executable not found. Ensure 'git' is in PATH.")
+    finally:
+        METRICS.git_done(started)
+
+# ---- Repository discovery ------------------------------------------------------
+# Resolved the way git's setup code does it, from the filesystem alone: walk up
+# from a directory to the first `.git` (directory, or `gitdir:` file for linked
+# worktrees and submodules) or bare repository, honouring GIT_DIR, GIT_WORK_TREE,
+# GIT_CEILING_DIRECTORIES and, for the main worktree, core.bare/core.worktree.
+# Config includes are not followed for those two keys.
+
+_CORE_KEY_RE = re.compile(r"\s*(\w+)\s*(?:=\s*(.*?))?\s*$")
+
+@dataclass(frozen=True)
+class Repo:
+    worktree: Optional[Path]  # top of the working tree; None for a bare repository
+    git_dir: Path             # this worktree's git dir (.git, or .git/worktrees/<name>)
+    common_dir: Path          # objects, refs and config shared by all worktrees
+
+    @property
+    def bare(self) -> bool:
+        return self.worktree is None
+
+    @property
+    def path(self) -> Path:
+        """Where to run git commands for this repository."""
+        return self.worktree if self.worktree is not None else self.git_dir
+
+    @classmethod
+    def discover(cls, start: Optional[Path] = None) -> "Repo":
+        """The repository containing start (default: the current directory). Never spawns git."""
+        env = os.environ
+        # Relative GIT_* paths are relative to the process cwd, as for git itself.
+        git_dir = env.get("GIT_DIR")
+        work_tree = env.get("GIT_WORK_TREE")
+        return _discover(os.path.abspath(start if start is not None else os.curdir),
+                         os.path.abspath(git_dir) if git_dir else None,
+                         os.path.abspath(work_tree) if work_tree else None,
+                         env.get("GIT_CEILING_DIRECTORIES", ""))
+
+def _read_gitfile(path: Path) -> Optional[Path]:
+    """The git dir a `.git` file points at, or None if it is not a gitfile."""
+    try:
+        text = path.read_text(encoding="utf-8").strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+    if not text.startswith("gitdir:"):
+        return None
+    return (path.parent / text[len("gitdir:"):].strip()).resolve()
+
+def _common_dir(git_dir: Path) -> Path:
+    try:
+        common = (git_dir / "commondir").read_text(encoding="utf-8").strip()
+    except OSError:
+        return git_dir
+    return (git_dir / common).resolve()
+
+def _is_git_dir(path: Path) -> bool:
+    if not (path / "HEAD").is_file():
+        return False
+    common = _common_dir(path)
+    return (common / "objects").is_dir() and (common / "refs").is_dir()
+
+def _core_config(common_dir: Path) -> Dict[str, str]:
+    """[core] keys of the repository config (lowercased), enough for bare/worktree."""
+    values: Dict[str, str] = {}
+    try:
+        lines = (common_dir / "config").read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return values
+    in_core = False
+    for line in lines:
+        line = line.split("#", 1)[0].split(";", 1)[0]
+        if line.lstrip().startswith("["):
+            in_core = line.strip().lower() == "[core]"
+            continue
+        m = _CORE_KEY_RE.match(line) if in_core else None
+        if m:
+            value = m.group(2)
+            values[m.group(1).lower()] = "true" if value is None else value.strip('"')
+    return values
+
+def _is_true(value: Optional[str]) -> bool:
+    return value is not None and value.lower() in ("true", "yes", "on", "1")
+
+@lru_cache(maxsize=256)
+def _discover(start: str, git_dir_env: Optional[str], work_tree_env: Optional[str], ceilings: str) -> Repo:
+    start_path = Path(start).resolve()
+    if git_dir_env is not None:
+        git_dir = Path(git_dir_env)
+        if git_dir.is_file():
+            git_dir = _read_gitfile(git_dir) or git_dir
+        git_dir = git_dir.resolve()
+        if not _is_git_dir(git_dir):
+            raise FileNotFoundError(f"Not a git repository: GIT_DIR={git_dir_env}")
+        found_worktree: Optional[Path] = start_path  # with GIT_DIR alone, the cwd is the top of the worktree
+    else:
+        stop = {Path(c).resolve() for c in ceilings.split(os.pathsep) if c and os.path.isabs(c)}
+        git_dir, found_worktree = None, None
+        for directory in (start_path, *start_path.parents):
+            if directory in stop and directory != start_path:
+                break
+            dot_git = directory / ".git"
+            candidate = _read_gitfile(dot_git) if dot_git.is_file() else dot_git
+            if candidate is not None and _is_git_dir(candidate):
+                git_dir, found_worktree = candidate.resolve(), directory
+                break
+            if _is_git_dir(directory):
+                git_dir = directory  # a bare repository, or inside a .git directory
+                break
+        if git_dir is None:
+            raise FileNotFoundError(f"Not a git repository at {start}")
+    common_dir = _common_dir(git_dir)
+    # The shared config's core.bare/core.worktree describe the main worktree only; a linked
+    # worktree (git_dir under common_dir/worktrees) is always where its .git file was found.
+    core = _core_config(common_dir) if git_dir == common_dir else {}
+    if work_tree_env is not None:
+        worktree: Optional[Path] = Path(work_tree_env).resolve()
+    elif core.get("worktree"):
+        worktree = (git_dir / core["worktree"]).resolve()
+    elif _is_true(core.get("bare")):
+        worktree = None
+    else:
+        worktree = found_worktree
+    return Repo(worktree, git_dir, common_dir)
 
-@lru_cache(maxsize=1)
 def get_repo_root(cwd: Path | None = None) -> Path:
+    """Top of the working tree containing cwd (default: the current directory)."""
+    repo = Repo.discover(cwd)
+    if repo.worktree is None:
+        raise FileNotFoundError(f"Not a git repository with a working tree at {cwd or Path.cwd()}")
+    return repo.worktree
+
+def get_merge_base(branch1: str, branch2: str, repo_path: Path) -> str:
+    return _run_git_command(["merge-base", branch1, branch2], cwd=repo_path)
+
+# ---- Batched object access ---------------------------------------------------
+# One warm `git cat-file --batch` / `--batch-check` pair per repository, so
+# object lookups cost a pipe round-trip instead of a process spawn.
+
+# Requests written per round-trip. Small enough that a chunk always fits in the
+# pipe buffer, so writing a chunk before reading its answers cannot deadlock.
+BATCH_CHUNK_SIZE = 256
+
+@dataclass(frozen=True)
+class ObjectInfo:
+    oid: str
+    type: str
+    size: int
+
+@dataclass(frozen=True)
+class GitObject:
+    oid: str
+    type: str
+    size: int
+    data: bytes
+
+class _CatFileProcess:
+    """A single `git cat-file <mode>` child with its pipes."""
+
+    def __init__(self, mode: str, repo_path: Path):
+        self.mode = mode
+        self.repo_path = repo_path
+        self.proc: Optional[subprocess.Popen] = None
+
+    def ensure(self) -> subprocess.Popen:
+        if self.proc is None or self.proc.poll() is not None:
+            self.close()
+            try:
+                METRICS.git_spawn()
+                with trace.span(f"spawn git cat-file {self.mode}", "git"):
+                    self.proc = subprocess.Popen(
+                        ["git", "cat-file", self.mode],
+                        cwd=self.repo_path,
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.DEVNULL,
+                    )
+            except FileNotFoundError:
+                raise RuntimeError("Git executable not found. Ensure 'git' is in PATH.")
+        return self.proc
+
+    def close(self) -> None:
+        proc, self.proc = self.proc, None
+        if proc is None:
+            return
+        try:
+            if proc.stdin:
+                proc.stdin.close()
+            proc.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+        finally:
+            if proc.stdout:
+                proc.stdout.close()
+
+class CatFileBatch:
+    """
+    Long-lived object reader for one repository.
+    Requests are pipelined in chunks; a dead child is restarted transparently.
+    """
+
+    def __init__(self, repo_path: Path):
+        self.repo_path = Path(repo_path)
+        self._check = _CatFileProcess("--batch-check", self.repo_path)
+        self._batch = _CatFileProcess("--batch", self.repo_path)
+        self._lock = threading.Lock()
+
+    def info(self, oids: Iterable[str]) -> List[Optional[ObjectInfo]]:
+        """Type and size for each oid (None when missing or ambiguous)."""
+        return self._run(self._check, list(oids), read_data=False)
+
+    def read(self, oids: Iterable[str]) -> List[Optional[GitObject]]:
+        """Full objects for each oid (None when missing or ambiguous)."""
+        return self._run(self._batch, list(oids), read_data=True)
+
+    def read_one(self, oid: str) -> Optional[GitObject]:
+        return self.read([oid])[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._check.close()
+            self._batch.close()
+
+    def __enter__(self) -> "CatFileBatch":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _run(self, child: _CatFileProcess, oids: List[str], read_data: bool) -> list:
+        for oid in oids:
+            if not oid or "\n" in oid or "\r" in oid:
+                raise ValueError(f"Invalid object name: {oid!r}")
+        results: list = []
+        with self._lock:
+            for start in range(0, len(oids), BATCH_CHUNK_SIZE):
+                chunk = oids[start:start + BATCH_CHUNK_SIZE]
+                try:
+                    results.extend(self._round_trip(child, chunk, read_data))
+                except (OSError, ValueError):
+                    # Broken pipe / truncated answer: restart once and retry.
+                    child.close()
+                    results.extend(self._round_trip(child, chunk, read_data))
+        return results
+
+    @staticmethod
+    def _round_trip(child: _CatFileProcess, chunk: List[str], read_data: bool) -> list:
+        proc = child.ensure()
+        proc.stdin.write("".join(f"{oid}\n" for oid in chunk).encode("utf-8"))
+        proc.stdin.flush()
+        out = proc.stdout
+        answers: list = []
+        for _ in chunk:
+            header = out.readline()
+            if not header.endswith(b"\n"):
+                raise ValueError("git cat-file closed its output unexpectedly")
+            parts = header.decode("utf-8", "replace").split()
+            if parts[-1] in ("missing", "ambiguous"):
+                answers.append(None)
+                continue
+            oid, obj_type, size = parts[0], parts[1], int(parts[2])
+            if not read_data:
+                answers.append(ObjectInfo(oid, obj_type, size))
+                continue
+            data = out.read(size)
+            if len(data) != size or out.read(1) != b"\n":
+                raise ValueError("git cat-file returned a truncated object")
+            answers.append(GitObject(oid, obj_type, size, data))
+        return answers
+
+_BATCH_POOL: Dict[Path, CatFileBatch] = {}
+_BATCH_POOL_LOCK = threading.Lock()
+
+def get_cat_file_batch(repo_path: Path) -> CatFileBatch:
+    """Shared CatFileBatch for the repository at repo_path; processes start lazily on first use."""
+    try:
+        # One pair per worktree, whichever of its directories the caller passes.
+        key = Repo.discover(Path(repo_path)).git_dir
+    except FileNotFoundError:
+        key = Path(repo_path).resolve()  # git reports the error on first use
+    with _BATCH_POOL_LOCK:
+        batch = _BATCH_POOL.get(key)
+        if batch is None:
+            batch = _BATCH_POOL[key] = CatFileBatch(Path(repo_path).resolve())
+        return batch
+
+@atexit.register
+def close_cat_file_batches() -> None:
+    with _BATCH_POOL_LOCK:
+        batches = list(_BATCH_POOL.values())
+        _BATCH_POOL.clear()
+    for batch in batches:
+        batch.close()
+
+# ---- Commit metadata -----------------------------------------------------------
+
+@dataclass(frozen=True)
+class CommitInfo:
+    sha: str
+    author: str
+    timestamp: int
+    files_changed: int = 0
+    insertions: int = 0
+    deletions: int = 0
+
+_SHORTSTAT_RE = re.compile(r"(\d+) files? changed(?:, (\d+) insertions?\(\+\))?(?:, (\d+) deletions?\(-\))?")
+
+def iter_commit_info(shas: Iterable[str], repo_path: Path) -> Iterator[CommitInfo]:
     """
-    Returns the root directory of the current Git repository.
-    Evaluates cwd at call time instead of import time to avoid stale caching.
+    Stream author/date/diffstat for full commit SHAs from a single
+    `git log --no-walk --stdin` process, in input order.
     """
-    cwd = Path(cwd or Path.cwd())
+    payload = "".join(f"{sha}\n" for sha in shas)
+    if not payload:
+        return
+    started = time.perf_counter()
     try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--show-toplevel"],
-            cwd=cwd,
-            capture_output=True,
+        proc = subprocess.Popen(
+            ["git", "log", "--no-walk=unsorted", "--stdin", "--format=%x1e%H%x1f%an%x1f%at", "--shortstat"],
+            cwd=repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
             text=True,
-            check=True,
+            encoding="utf-8",
+            errors="replace",
         )
-        return Path(result.stdout.strip())
-    except subprocess.CalledProcessError as e:
-        raise FileNotFoundError(f"Not a git repository at {cwd}") from e
+    except FileNotFoundError:
+        raise RuntimeError("Git executable not found. Ensure 'git' is in PATH.")
+    METRICS.git_spawn()
+    try:
+        # git reads all of --stdin before it prints anything, so this cannot deadlock.
+        proc.stdin.write(payload)
+        proc.stdin.close()
+        current: Optional[List] = None
+        for line in proc.stdout:
+            if line.startswith("\x1e"):
+                if current is not None:
+                    yield CommitInfo(*current)
+                sha, author, ts = line[1:].rstrip("\n").split("\x1f")
+                current = [sha, author, int(ts or 0), 0, 0, 0]
+            elif current is not None:
+                m = _SHORTSTAT_RE.search(line)
+                if m:
+                    current[3:] = [int(g or 0) for g in m.groups()]
+        if current is not None:
+            yield CommitInfo(*current)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        proc.stdout.close()
+        METRICS.git_done(started)
 
-def get_merge_base(branch1: str, branch2: str, repo_path: Path) -> str:
-    return _run_git_command(["merge-base", branch1, branch2], cwd=repo_path)
+# ---- Touched paths ---------------------------------------------------------------
+
+def _write_lines(stream, lines: List[str]) -> None:
+    try:
+        stream.write("".join(f"{line}\n" for line in lines).encode("utf-8"))
+        stream.close()
+    except (OSError, ValueError):
+        pass  # reader went away first
+
+def iter_touched_paths(shas: Iterable[str], repo_path: Path) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Stream (commit, paths it changes) for full commit SHAs from a single
+    `git diff-tree --stdin` process, in input order. Merge commits report no paths.
+    """
+    wanted = list(dict.fromkeys(shas))
+    if not wanted:
+        return
+    started = time.perf_counter()
+    try:
+        proc = subprocess.Popen(
+            ["git", "diff-tree", "--stdin", "-r", "-z", "--name-only", "--root", "--always", "--no-renames"],
+            cwd=repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+    except FileNotFoundError:
+        raise RuntimeError("Git executable not found. Ensure 'git' is in PATH.")
+    METRICS.git_spawn()
+    # diff-tree answers each line as it reads it, so stdin is fed from a thread.
+    feeder = threading.Thread(target=_write_lines, args=(proc.stdin, wanted), daemon=True)
+    feeder.start()
+    try:
+        # With --always every commit echoes its id. An id still ahead of us in the input marks a
+        # boundary (git skips unknown ids), anything else is a path.
+        ahead = {sha: i for i, sha in enumerate(wanted)}
+        next_index = 0
+        current: Optional[str] = None
+        paths: List[str] = []
+        buf = b""
+        for chunk in iter(lambda: proc.stdout.read(65536), b""):
+            buf += chunk
+            *records, buf = buf.split(b"\0")
+            for record in records:
+                text = record.decode("utf-8", "surrogateescape")
+                if ahead.get(text, -1) >= next_index:
+                    if current is not None:
+                        yield current, paths
+                    current, paths = text, []
+                    next_index = ahead[text] + 1
+                elif current is not None:
+                    paths.append(text)
+        if current is not None:
+            yield current, paths
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        proc.stdout.close()
+        feeder.join()
+        METRICS.git_done(started)
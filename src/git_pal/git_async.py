@@ -0,0 +1,161 @@
+from __future__ import annotations
+import asyncio
+import os
+import signal
+import time
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, List, Optional, Set, TypeVar
+
+from git_pal.metrics import METRICS
+
+# Git for event-loop code. Kept out of git.py, so importing the synchronous
+# helpers (as the CLI does) never loads asyncio.
+
+T = TypeVar("T")
+
+class AsyncGitRunner:
+    """
+    asyncio git executor for event-loop code: at most max_concurrency children at once,
+    a per-call timeout, streaming output, and cancel_all() to drop everything
+    in flight (children are killed, never left running).
+    """
+
+    def __init__(self, repo_path: Path, max_concurrency: int = 8, timeout: Optional[float] = 30.0):
+        self.repo_path = Path(repo_path)
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def run(self, args: List[str], *, input: Optional[bytes] = None,
+                  timeout: Optional[float] = None) -> str:
+        return await self._start(self._run(args, input, self.timeout if timeout is None else timeout))
+
+    async def stream(self, args: List[str], *, input: Optional[bytes] = None,
+                     timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """Yield stdout lines (without the newline) as git produces them."""
+        # Unbounded, so the producer never blocks and its end marker always arrives.
+        lines: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        producer = self._start(self._produce(args, input, self.timeout if timeout is None else timeout, lines))
+        try:
+            while True:
+                line = await lines.get()
+                if line is None:
+                    break
+                yield line
+            await producer  # its failure, timeout or cancellation
+        finally:
+            if not producer.done():
+                producer.cancel()
+            elif not producer.cancelled():
+                producer.exception()  # retrieved: an early exit is not logged as an unhandled error
+
+    def cancel_all(self) -> None:
+        """Cancel every call in flight; their git children are killed and callers see CancelledError."""
+        for task in list(self._tasks):
+            task.cancel()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    # ---- internals ----------------------------------------------------------------
+    # Each call runs in a task of its own, so cancel_all() reaches the git call and
+    # never the caller's task (a screen's message pump, say).
+    def _start(self, call: Awaitable[T]) -> "asyncio.Task[T]":
+        task = asyncio.ensure_future(call)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _limit(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            # Created lazily so it binds to the running loop (Python 3.9).
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _run(self, args: List[str], input: Optional[bytes], timeout: Optional[float]) -> str:
+        async with self._limit():
+            started = time.perf_counter()
+            proc = await self._spawn(args, input is not None)
+            try:
+                out, err = await asyncio.wait_for(proc.communicate(input), timeout)
+            except asyncio.TimeoutError:
+                raise RuntimeError(f"Git command timed out after {timeout}s: git {' '.join(args)}")
+            finally:
+                await self._reap(proc)
+                METRICS.git_done(started)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Git command failed: {err.decode('utf-8', 'replace').strip()}")
+        return out.decode("utf-8").strip()
+
+    async def _produce(self, args: List[str], input: Optional[bytes], timeout: Optional[float],
+                       lines: "asyncio.Queue[Optional[str]]") -> None:
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        try:
+            async with self._limit():
+                started = time.perf_counter()
+                proc = await self._spawn(args, input is not None)
+                feeder = asyncio.ensure_future(self._feed(proc, input)) if input is not None else None
+                # Drained alongside stdout: a chatty git would otherwise block on a full stderr pipe.
+                errors = asyncio.ensure_future(proc.stderr.read())
+                try:
+                    while True:
+                        remaining = None if deadline is None else max(deadline - loop.time(), 0)
+                        try:
+                            line = await asyncio.wait_for(proc.stdout.readline(), remaining)
+                        except asyncio.TimeoutError:
+                            raise RuntimeError(f"Git command timed out after {timeout}s: git {' '.join(args)}")
+                        if not line:
+                            break
+                        lines.put_nowait(line.decode("utf-8", "replace").rstrip("\n"))
+                    err = await errors
+                    if await proc.wait() != 0:
+                        raise RuntimeError(f"Git command failed: {err.decode('utf-8', 'replace').strip()}")
+                finally:
+                    for helper in (feeder, errors):
+                        if helper is not None:
+                            helper.cancel()
+                    await self._reap(proc)
+                    METRICS.git_done(started)
+        finally:
+            lines.put_nowait(None)
+
+    async def _spawn(self, args: List[str], with_stdin: bool) -> asyncio.subprocess.Process:
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "git", *args,
+                cwd=self.repo_path,
+                stdin=asyncio.subprocess.PIPE if with_stdin else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                # Own process group, so a kill also reaches hooks/alias shells git spawned.
+                start_new_session=os.name != "nt",
+            )
+        except FileNotFoundError:
+            raise RuntimeError("Git executable not found. Ensure 'git' is in PATH.")
+        METRICS.git_spawn()
+        return proc
+
+    @staticmethod
+    async def _feed(proc: asyncio.subprocess.Process, data: bytes) -> None:
+        try:
+            proc.stdin.write(data)
+            await proc.stdin.drain()
+            proc.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    @staticmethod
+    async def _reap(proc: asyncio.subprocess.Process) -> None:
+        if proc.returncode is None:
+            try:
+                if os.name != "nt":
+                    os.killpg(proc.pid, signal.SIGKILL)
+                else:
+                    proc.kill()
+            except ProcessLookupError:
+                pass
+            # Shielded so a second cancellation cannot leave a zombie behind.
+            await asyncio.shield(proc.wait())
@@ -1,21 +1,30 @@
 # SPDX-License-Identifier: MIT
-from typing import Optional, List
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Dict, Optional, List
+import base64
 import time
 import hashlib
 import os
 import json
 from pathlib import Path
 
-import jwt
 from pydantic import BaseModel, Field, ValidationError
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
 
+from git_pal import config as _config
 from git_pal.config import load_config
+from git_pal.fsutil import atomic_write
+from git_pal.metrics import METRICS
+from git_pal.trace import traced
+
+if TYPE_CHECKING:
+    from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
 
 EXPECTED_ISSUER = "git-pal-licensing"
 
+# Which token passed a full verify under which key; lets repeat launches skip jwt/cryptography.
+VERDICT_FILE = "license-verdict.json"
+VERDICT_VERSION = 2
+
 class LicenseData(BaseModel):
     sub: str = Field(..., description="Subject (email)")
     iss: str = Field(..., description="Issuer")
@@ -25,20 +34,23 @@ class LicenseData(BaseModel):
     iat: Optional[int] = None
     purchase_id: Optional[str] = None
 
-def _load_public_key() -> RSAPublicKey:
+def _load_public_key(public_key_pem: Optional[str] = None) -> RSAPublicKey:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
     try:
-        public_key_pem = load_config().license.public_key.encode("utf-8")
-        key = serialization.load_pem_public_key(public_key_pem, backend=default_backend())
+        pem = (public_key_pem if public_key_pem is not None else load_config().license.public_key).encode("utf-8")
+        key = serialization.load_pem_public_key(pem, backend=default_backend())
         if not isinstance(key, RSAPublicKey):
             raise ValueError("Key is not an RSA public key")
         return key
     except Exception as e:
         raise ValueError(f"Failed to load license public key from config: {e}")
 
-def verify_license() -> LicenseData:
-    """Offline RS256 verify with issuer/exp required."""
-    key = _load_public_key()
-    token = load_config().license_token
+def _verify_token(token: str, public_key_pem: str) -> LicenseData:
+    """Check the RS256 signature, issuer and exp/nbf of token against the PEM key, then validate its claims."""
+    import jwt
+    key = _load_public_key(public_key_pem)
     try:
         payload = jwt.decode(
             token,
@@ -57,14 +69,77 @@ def verify_license() -> LicenseData:
     except ValidationError as e:
         raise ValueError(f"License data is malformed: {e}")
 
+@traced("verify_license")
+def verify_license() -> LicenseData:
+    """
+    The configured license, offline. A token that already passed the full verify under
+    the same key (same hashes, same config mtime, before its exp) is decoded without
+    jwt or cryptography; anything else gets the full RS256 verify.
+    """
+    cfg = load_config()
+    token, public_key = cfg.license_token, cfg.license.public_key
+    key = _verdict_key(token, public_key)
+    stats = METRICS.cache("license verdict")
+    cached = _read_verdict(key, token) if key is not None else None
+    if cached is not None:
+        stats.hits += 1
+        return cached
+    stats.misses += 1
+    data = _verify_token(token, public_key)
+    if key is not None:
+        _write_verdict(key, data)
+    return data
+
+# ---- Verdict cache -----------------------------------------------------------
+# The verdict holds hashes and exp only, never claims: on a hit the claims are decoded
+# from the configured token itself, whose hash is the one that was verified. Writing a
+# verdict takes write access to the config dir, which could as well swap the public key.
+
+def _verdict_path() -> Path:
+    return _config.get_config_path().parent / VERDICT_FILE
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _verdict_key(token: str, public_key: str) -> Optional[Dict[str, Any]]:
+    try:
+        mtime_ns = _config.get_config_path().stat().st_mtime_ns
+    except OSError:
+        return None
+    return {"v": VERDICT_VERSION, "token": _sha256(token), "pubkey": _sha256(public_key), "config_mtime_ns": mtime_ns}
+
+def _decode_claims(token: str) -> Dict[str, Any]:
+    """The JWT payload segment, unverified: only for a token whose hash matches a verdict."""
+    segment = token.split(".")[1]
+    return json.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+
+def _read_verdict(key: Dict[str, Any], token: str) -> Optional[LicenseData]:
+    try:
+        raw = json.loads(_verdict_path().read_text(encoding="utf-8"))
+        now = time.time()
+        if raw.get("key") != key or now >= raw["exp"]:
+            return None
+        data = LicenseData(**_decode_claims(token))
+    except (OSError, ValueError, KeyError, TypeError, IndexError):  # ValidationError is a ValueError
+        return None
+    # The exp/nbf window is re-checked on every launch, against the token's own claims.
+    if data.exp != raw["exp"] or now >= data.exp or (data.nbf is not None and now < data.nbf):
+        return None
+    return data
+
+def _write_verdict(key: Dict[str, Any], data: LicenseData) -> None:
+    try:
+        atomic_write(_verdict_path(), json.dumps({"key": key, "exp": data.exp}), mode=0o600)
+    except OSError:
+        pass
+
 # ---- Monetize helpers (breadcrumb only; no telemetry) ------------------------
 def _machine_hash() -> str:
     base = "|".join([os.name, os.getenv("COMPUTERNAME",""), os.getenv("HOSTNAME",""), str(Path.home())])
     return hashlib.sha256(base.encode("utf-8")).hexdigest()[:16]
 
 def write_receipt(purchase_id: Optional[str], sub: str, target_dir: Path) -> Path:
-    """Write a local receipt.json (anti-leak breadcrumb)."""
-    target_dir.mkdir(parents=True, exist_ok=True)
+    """Write a local receipt.json (anti-leak breadcrumb); untouched if nothing but the timestamp would change."""
     receipt = {
         "sub_hint": sub[:2] + "***" + (sub[-2:] if "@" in sub else ""),
         "purchase_id": purchase_id or "",
@@ -72,5 +147,12 @@ def write_receipt(purchase_id: Optional[str], sub: str, target_dir: Path) -> Pat
         "ts": int(time.time()),
     }
     p = target_dir / "receipt.json"
+    try:
+        existing = json.loads(p.read_text(encoding="utf-8"))
+        if all(existing.get(k) == v for k, v in receipt.items() if k != "ts"):
+            return p
+    except (OSError, ValueError, AttributeError):
+        pass
+    target_dir.mkdir(parents=True, exist_ok=True)
     p.write_text(json.dumps(receipt, indent=2), encoding="utf-8")
     return p
@@ -1,5 +1,6 @@
 import ast
-from typing import Set, Union
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple, Union
 
 class ImportVisitor(ast.NodeVisitor):
     def __init__(self):
@@ -20,8 +21,100 @@ def get_imports(source_code: str) -> Set[str]:
     except Exception:
         return set()
 
-def merge_python_imports(base: str, ours: str, theirs: str) -> str:
-    merged = set()
-    for block in (get_imports(base), get_imports(ours), get_imports(theirs)):
-        merged.update(block)
-    return "\n".join(sorted(merged))
+# One imported name: (module, level, name, asname). Plain `import x` has module None.
+ImportName = Tuple[Optional[str], int, str, Optional[str]]
+
+# Parsed import sets kept per (blob SHA, header_only), least recently used evicted first.
+IMPORT_CACHE_SIZE = 1024
+_IMPORT_CACHE: "OrderedDict[Tuple[str, bool], FrozenSet[ImportName]]" = OrderedDict()
+
+# Top-level statements that may appear in the leading import region.
+_HEADER_STARTS = ("import ", "from ", "try:", "except ", "except:", "else:", "finally:", "if ", "#", ")")
+_STRING_PREFIXES = ("'", '"', "r'", 'r"', "u'", 'u"', "b'", 'b"')
+
+def split_import_header(source: str) -> Tuple[str, str]:
+    """
+    Split source into (leading import region, rest) at a line boundary.
+    The region holds the module docstring, comments, imports and import guards
+    (try/except, if TYPE_CHECKING); it ends at the first other top-level statement.
+    """
+    lines = source.splitlines(keepends=True)
+    quote: Optional[str] = None
+    cut = len(lines)
+    for i, line in enumerate(lines):
+        if quote is not None:
+            if quote in line:
+                quote = None
+            continue
+        if not line.strip() or line[0] in " \t" or line.startswith(_HEADER_STARTS):
+            continue
+        if line.lower().startswith(_STRING_PREFIXES):
+            for q in ('"""', "'''"):
+                if line.count(q) % 2 == 1:
+                    quote = q
+                    break
+            continue
+        cut = i
+        break
+    header = "".join(lines[:cut])
+    try:
+        ast.parse(header)
+    except (SyntaxError, ValueError):
+        return source, ""  # the cut split a statement; treat the whole file as header
+    return header, "".join(lines[cut:])
+
+def _import_names(nodes: Iterable[ast.AST]) -> FrozenSet[ImportName]:
+    names: Set[ImportName] = set()
+    for node in nodes:
+        if isinstance(node, ast.Import):
+            names.update((None, 0, a.name, a.asname) for a in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            names.update((node.module, node.level or 0, a.name, a.asname) for a in node.names)
+    return frozenset(names)
+
+def get_import_names(source_code: str, sha: Optional[str] = None, header_only: bool = False) -> FrozenSet[ImportName]:
+    """
+    Imported names in source_code; with header_only, only those in the leading region
+    (including the ones under its try/except and if TYPE_CHECKING guards).
+    When sha (the blob id of source_code) is given, the result is cached under it.
+    """
+    key = (sha, header_only) if sha else None
+    if key is not None and key in _IMPORT_CACHE:
+        _IMPORT_CACHE.move_to_end(key)
+        return _IMPORT_CACHE[key]
+    try:
+        v = ImportVisitor()
+        v.visit(ast.parse(split_import_header(source_code)[0] if header_only else source_code))
+        names = _import_names(v.imports)
+    except Exception:
+        names = frozenset()
+    if key is not None:
+        _IMPORT_CACHE[key] = names
+        if len(_IMPORT_CACHE) > IMPORT_CACHE_SIZE:
+            _IMPORT_CACHE.popitem(last=False)
+    return names
+
+def format_imports(names: Iterable[ImportName]) -> List[str]:
+    """Sorted import lines; names from the same module are consolidated into one `from x import a, b`."""
+    lines = []
+    grouped: Dict[Tuple[str, int], List[str]] = {}
+    for module, level, name, asname in names:
+        alias = f"{name} as {asname}" if asname else name
+        if module is None and level == 0:
+            lines.append(f"import {alias}")
+        else:
+            grouped.setdefault((module or "", level), []).append(alias)
+    for (module, level), aliases in grouped.items():
+        lines.append(f"from {'.' * level}{module} import {', '.join(sorted(aliases))}")
+    return sorted(lines)
+
+def merge_python_imports(base: str, ours: str, theirs: str, header_only: bool = False,
+                         shas: Optional[Sequence[Optional[str]]] = None) -> str:
+    """
+    Union of the imports of all three sides, one statement per module.
+    shas are the (base, ours, theirs) blob ids; a side whose id is known is parsed at most once.
+    """
+    merged: Set[ImportName] = set()
+    for source, sha in zip((base, ours, theirs), shas or (None, None, None)):
+        merged.update(get_import_names(source, sha, header_only))
+    return "\n".join(format_imports(merged))
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+from git_pal.fsutil import atomic_write
+from git_pal.git import Repo
+from git_pal.metrics import CacheStats
+
+# Content-addressed store for merge-analysis results, shared by every git-pal
+# process working on the repository. Entries are keyed by (analyzer, version,
+# blob SHAs), so a result is valid for as long as its inputs exist.
+
+CACHE_DIR = Path("git-pal") / "analysis"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Eviction trims the store down to this fraction of max_bytes, so it does not run on every write.
+EVICT_LOW_WATER = 0.8
+
+class AnalysisCache:
+    """
+    One JSON file per entry under <root>/<2 hex>/<62 hex>.json, written atomically.
+    A hit bumps the entry's mtime; eviction drops the oldest mtimes first (LRU).
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._size: Optional[int] = None  # bytes on disk, measured on first write
+
+    @classmethod
+    def for_repo(cls, repo_path: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> "AnalysisCache":
+        """The cache in the repository's common git dir (shared by all worktrees)."""
+        return cls(Repo.discover(Path(repo_path)).common_dir / CACHE_DIR, max_bytes)
+
+    @staticmethod
+    def key(analyzer: str, version: int, shas: Sequence[Optional[str]]) -> str:
+        ident = "\0".join([analyzer, str(version)] + [sha or "-" for sha in shas])
+        return hashlib.sha256(ident.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key[2:]}.json"
+
+    def get(self, analyzer: str, version: int, shas: Sequence[Optional[str]]) -> Optional[Any]:
+        """Cached value, or None on a miss (including unreadable or foreign entries)."""
+        path = self._path(self.key(analyzer, version, shas))
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+            if record["id"] != [analyzer, version, [sha or "-" for sha in shas]]:
+                raise ValueError("key collision")
+            value = record["value"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self.stats.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # evicted by another process meanwhile; the value we read is still good
+        self.stats.hits += 1
+        return value
+
+    def put(self, analyzer: str, version: int, shas: Sequence[Optional[str]], value: Any) -> None:
+        """Store value (JSON-serializable). Failures are ignored: the cache is an optimization only."""
+        path = self._path(self.key(analyzer, version, shas))
+        data = json.dumps({"id": [analyzer, version, [sha or "-" for sha in shas]], "value": value})
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(path, data)
+        except OSError:
+            return
+        self.stats.writes += 1
+        if self._size is None:
+            self._size = sum(size for _path, size, _mtime in self._entries())
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def get_or_compute(self, analyzer: str, version: int, shas: Sequence[Optional[str]],
+                       compute: Callable[[], Any]) -> Any:
+        value = self.get(analyzer, version, shas)
+        if value is None:
+            value = compute()
+            self.put(analyzer, version, shas, value)
+        return value
+
+    def evict(self, target_bytes: Optional[int] = None) -> int:
+        """Delete least recently used entries until the store is under target_bytes; returns entries removed."""
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * EVICT_LOW_WATER)
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _path, size, _mtime in entries)
+        removed = 0
+        for path, size, _mtime in entries:
+            if total <= target_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                pass  # already gone (another process evicted it)
+            total -= size
+            removed += 1
+        self._size = total
+        self.stats.evictions += removed
+        return removed
+
+    def clear(self) -> None:
+        self.evict(0)
+
+    def _entries(self) -> Iterable[Tuple[Path, int, float]]:
+        entries: List[Tuple[Path, int, float]] = []
+        try:
+            fanout = list(os.scandir(self.root))
+        except OSError:
+            return entries
+        for sub in fanout:
+            if not sub.is_dir():
+                continue
+            try:
+                for entry in os.scandir(sub.path):
+                    if entry.name.endswith(".json"):
+                        st = entry.stat()
+                        entries.append((Path(entry.path), st.st_size, st.st_mtime_ns))
+            except OSError:
+                continue
+        return entries
@@ -1,19 +1,65 @@
-import re
-import difflib
-from typing import List
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+# Spaces around operators and punctuation are insignificant: "foo=1" == "foo = 1".
+_PUNCT = frozenset("=+-*/<>!&|,;:(){}[]")
+
+# Below this many pairs, classify_whitespace_only() stays in-process.
+PARALLEL_MIN_PAIRS = 64
+
+def _normalize_line(line: str) -> str:
+    # Whitespace-separated tokens, re-joined by one space unless either neighbour is punctuation.
+    tokens = line.split()
+    if not tokens:
+        return ""
+    out = [tokens[0]]
+    prev = tokens[0]
+    for tok in tokens[1:]:
+        if prev[-1] not in _PUNCT and tok[0] not in _PUNCT:
+            out.append(" ")
+        out.append(tok)
+        prev = tok
+    return "".join(out)
 
 def _normalize_whitespace(text: str) -> List[str]:
-    normalized: List[str] = []
-    for line in text.splitlines():
-        # Strip leading/trailing whitespace
-        line = line.strip()
-        # Replace consecutive whitespace with single space
-        line = re.sub(r"\s+", " ", line)
-        # Remove spaces around operators and punctuation to treat "foo=1" and "foo = 1" as equivalent
-        line = re.sub(r"\s*([=+\-*/<>!&|,;:(){}[\]])\s*", r"\1", line)
-        normalized.append(line)
-    return normalized
+    return [_normalize_line(line) for line in text.splitlines()]
 
 def is_diff_whitespace_only(a: str, b: str) -> bool:
-    diff = list(difflib.ndiff(_normalize_whitespace(a), _normalize_whitespace(b)))
-    return not any(d.startswith("+") or d.startswith("-") for d in diff)
+    """
+    True when a and b differ only in whitespace, line by line.
+    Linear: lines are compared pairwise, only lines that differ verbatim are
+    normalized, and the scan stops at the first real difference.
+    """
+    if a == b:
+        return True
+    lines_a, lines_b = a.splitlines(), b.splitlines()
+    if len(lines_a) != len(lines_b):
+        return False
+    for x, y in zip(lines_a, lines_b):
+        if x != y and (x.split() != y.split() and _normalize_line(x) != _normalize_line(y)):
+            return False
+    return True
+
+def _is_whitespace_pair(pair: Tuple[str, str]) -> bool:
+    return is_diff_whitespace_only(*pair)
+
+def classify_whitespace_only(pairs: Iterable[Tuple[str, str]], max_workers: Optional[int] = None,
+                             chunksize: int = 8) -> List[bool]:
+    """
+    is_diff_whitespace_only() for many (a, b) pairs, in input order.
+    Identical pairs are answered inline; the rest are spread over a process pool
+    when there are enough of them to pay for it.
+    """
+    pairs = list(pairs)
+    results: List[Optional[bool]] = [True if a == b else None for a, b in pairs]
+    todo = [i for i, r in enumerate(results) if r is None]
+    workers = max_workers or os.cpu_count() or 1
+    if workers <= 1 or len(todo) < PARALLEL_MIN_PAIRS:
+        for i in todo:
+            results[i] = is_diff_whitespace_only(*pairs[i])
+        return results  # type: ignore[return-value]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i, answer in zip(todo, pool.map(_is_whitespace_pair, (pairs[i] for i in todo), chunksize=chunksize)):
+            results[i] = answer
+    return results  # type: ignore[return-value]
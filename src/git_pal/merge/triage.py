@@ -0,0 +1,223 @@
+import ast
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+from git_pal.fsutil import atomic_write
+from git_pal.git import _run_git_command, get_cat_file_batch
+from git_pal.merge.ast_merger import ImportName, _import_names, split_import_header
+from git_pal.merge.cache import AnalysisCache
+from git_pal.merge.conflict_analyzer import is_diff_whitespace_only
+
+# Repository-wide conflict triage: every unmerged path is classified as
+# whitespace-only, import-only or real, so the trivial ones can be resolved in bulk.
+
+WHITESPACE = "whitespace"
+IMPORTS = "imports"
+REAL = "real"
+
+# Below this many conflicts, triage_conflicts() stays in-process.
+PARALLEL_MIN_CONFLICTS = 8
+
+# Bump CACHE_VERSION whenever classification or resolution output changes.
+CACHE_ANALYZER = "triage"
+CACHE_VERSION = 2
+
+@dataclass(frozen=True)
+class UnmergedPath:
+    path: str
+    base: Optional[str]  # blob SHA per index stage; None when the stage is absent
+    ours: Optional[str]
+    theirs: Optional[str]
+
+@dataclass(frozen=True)
+class ConflictResult:
+    path: str
+    kind: str
+    resolution: Optional[str] = None  # merged file content for trivial conflicts
+    reason: str = ""
+
+def list_unmerged(repo_path: Path) -> List[UnmergedPath]:
+    """Unmerged paths from `git ls-files -u` (index stages 1/2/3), in index order."""
+    out = _run_git_command(["ls-files", "-u", "-z"], cwd=repo_path)
+    stages: Dict[str, List[Optional[str]]] = {}
+    for record in out.split("\0"):
+        if not record:
+            continue
+        meta, path = record.split("\t", 1)
+        _mode, oid, stage = meta.split(" ")
+        stages.setdefault(path, [None, None, None])[int(stage) - 1] = oid
+    return [UnmergedPath(path, *oids) for path, oids in stages.items()]
+
+def _decode(data: Optional[bytes]) -> Optional[str]:
+    if data is None or b"\0" in data:
+        return None
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+# A top-level import of the leading region: (first line, end line, names it imports).
+ImportSpan = Tuple[int, int, FrozenSet[ImportName]]
+
+def _header_imports(source: str) -> Optional[Tuple[List[str], List[ImportSpan], str]]:
+    """
+    (header lines, its top-level import statements, body), or None when the header does
+    not parse or an import shares a line with another statement (it could not be kept verbatim).
+    """
+    header, body = split_import_header(source)
+    try:
+        tree = ast.parse(header)
+    except (SyntaxError, ValueError):
+        return None
+    spans: List[ImportSpan] = []
+    taken: Set[int] = set()
+    for node in tree.body:
+        lines = range(node.lineno - 1, node.end_lineno or node.lineno)
+        if taken.intersection(lines):
+            return None  # `import a; import b`
+        taken.update(lines)
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            spans.append((lines.start, lines.stop, _import_names([node])))
+    return header.splitlines(keepends=True), spans, body
+
+def _without_imports(lines: List[str], spans: List[ImportSpan], body: str) -> str:
+    skip = {i for start, end, _names in spans for i in range(start, end)}
+    return "".join(line for i, line in enumerate(lines) if i not in skip) + body
+
+def _statements(lines: List[str], spans: List[ImportSpan]) -> Dict[str, FrozenSet[ImportName]]:
+    """Exact source of each import statement (comments included) -> its names."""
+    return {"".join(lines[start:end]): names for start, end, names in spans}
+
+def _names(statements: Iterable[FrozenSet[ImportName]]) -> Set[ImportName]:
+    return set().union(*statements)
+
+def _resolve_imports(base: str, ours: str, theirs: str) -> Optional[str]:
+    """
+    Three-way merge of ours and theirs when they differ only in their leading top-level
+    imports: what either side added, minus what either side removed from base. Import
+    statements are kept verbatim; None (a real conflict) when no set of them expresses
+    that result exactly.
+    """
+    sides = [_header_imports(text) for text in (base, ours, theirs)]
+    if sides[0] is None or sides[1] is None or sides[2] is None:
+        return None
+    (base_lines, base_spans, _), (ours_lines, ours_spans, ours_body), (theirs_lines, theirs_spans, theirs_body) = sides
+    if not is_diff_whitespace_only(_without_imports(ours_lines, ours_spans, ours_body),
+                                   _without_imports(theirs_lines, theirs_spans, theirs_body)):
+        return None
+    in_base = _statements(base_lines, base_spans)
+    in_ours = _statements(ours_lines, ours_spans)
+    in_theirs = _statements(theirs_lines, theirs_spans)
+    base_names, ours_names, theirs_names = _names(in_base.values()), _names(in_ours.values()), _names(in_theirs.values())
+    wanted = (ours_names | theirs_names) - (base_names - ours_names) - (base_names - theirs_names)
+
+    # Edit one side's file (ours, unless it has no imports to anchor on): drop the base
+    # statements the other side removed, then add the other side's new ones after its last import.
+    if ours_spans:
+        lines, spans, body, mine, other = ours_lines, ours_spans, ours_body, in_ours, in_theirs
+    else:
+        lines, spans, body, mine, other = theirs_lines, theirs_spans, theirs_body, in_theirs, in_ours
+    out: List[str] = []
+    kept: Set[ImportName] = set()
+    pos = 0
+    for start, end, names in spans:
+        out += lines[pos:start]
+        statement = "".join(lines[start:end])
+        if statement not in in_base or statement in other:
+            out.append(statement)
+            kept |= names
+        pos = end
+    for statement, names in other.items():
+        if statement in mine or statement in in_base or names <= kept:
+            continue
+        if any(module == "__future__" for module, _level, _name, _asname in names):
+            return None  # has to stay first in the file
+        if out and not out[-1].endswith("\n"):
+            out[-1] += "\n"
+        out.append(statement if statement.endswith("\n") else statement + "\n")
+        kept |= names
+    if kept != wanted:
+        return None  # e.g. a statement one side edited while the other removed a name from it
+    return "".join(out + lines[pos:]) + body
+
+def classify_conflict(path: str, base: Optional[str], ours: Optional[str], theirs: Optional[str]) -> ConflictResult:
+    """Classify one conflict from the decoded stage contents (None: stage absent or binary)."""
+    if ours is None or theirs is None:
+        return ConflictResult(path, REAL, reason="deleted or binary on one side")
+    if is_diff_whitespace_only(ours, theirs):
+        return ConflictResult(path, WHITESPACE, resolution=ours)
+    if path.endswith(".py"):
+        merged = _resolve_imports(base or "", ours, theirs)
+        if merged is not None:
+            return ConflictResult(path, IMPORTS, resolution=merged)
+    return ConflictResult(path, REAL)
+
+def _classify_args(args: tuple) -> ConflictResult:
+    return classify_conflict(*args)
+
+def _cache_shas(entry: UnmergedPath) -> Tuple[Optional[str], ...]:
+    # Classification depends on the blobs and on whether the path is Python.
+    return (entry.base, entry.ours, entry.theirs, "py" if entry.path.endswith(".py") else "")
+
+def triage_conflicts(repo_path: Path, entries: Optional[List[UnmergedPath]] = None,
+                     max_workers: Optional[int] = None,
+                     cache: Optional[AnalysisCache] = None) -> Iterator[ConflictResult]:
+    """
+    Classify every unmerged path, yielding results as each one finishes (not in index order).
+    Cached results come first; the remaining stage blobs are read in one batched cat-file pass.
+    """
+    if entries is None:
+        entries = list_unmerged(repo_path)
+    todo = []
+    for e in entries:
+        cached = cache.get(CACHE_ANALYZER, CACHE_VERSION, _cache_shas(e)) if cache is not None else None
+        if cached is None:
+            todo.append(e)
+        else:
+            yield ConflictResult(e.path, cached["kind"], cached["resolution"], cached["reason"])
+    by_path = {e.path: e for e in todo}
+    for result in _classify_entries(repo_path, todo, max_workers):
+        if cache is not None:
+            cache.put(CACHE_ANALYZER, CACHE_VERSION, _cache_shas(by_path[result.path]),
+                      {"kind": result.kind, "resolution": result.resolution, "reason": result.reason})
+        yield result
+
+def _classify_entries(repo_path: Path, entries: List[UnmergedPath],
+                      max_workers: Optional[int]) -> Iterator[ConflictResult]:
+    if not entries:
+        return
+    oids = sorted({oid for e in entries for oid in (e.base, e.ours, e.theirs) if oid})
+    blobs = {oid: obj.data for oid, obj in zip(oids, get_cat_file_batch(repo_path).read(oids)) if obj is not None}
+    jobs = [(e.path, *(_decode(blobs.get(oid)) if oid else None for oid in (e.base, e.ours, e.theirs)))
+            for e in entries]
+    workers = max_workers or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) < PARALLEL_MIN_CONFLICTS:
+        for job in jobs:
+            yield _classify_args(job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_classify_args, job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+def apply_resolutions(repo_path: Path, results: List[ConflictResult]) -> List[str]:
+    """
+    Write each resolution to the work tree and stage them all with a single `git add`.
+    Files are replaced atomically and keep their mode; symlinks are left alone (never
+    written through). Returns the paths written.
+    """
+    paths = []
+    for result in results:
+        if result.resolution is None:
+            continue
+        target = repo_path / result.path
+        if target.is_symlink():
+            continue
+        atomic_write(target, result.resolution)
+        paths.append(result.path)
+    if paths:
+        _run_git_command(["add", "--"] + paths, cwd=repo_path)
+    return paths
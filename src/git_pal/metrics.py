@@ -0,0 +1,161 @@
+import math
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+# Process-wide counters behind the TUI perf panel. Recording is O(1) (an int
+# bump, a bucket increment, a bounded deque append) and always on; the panel
+# only reads them. Git children are counted from any thread, hence the lock.
+
+# Upper bounds (ms) of the git latency buckets; the last bucket is open-ended.
+LATENCY_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+# Frame times kept for the panel.
+FRAME_HISTORY = 120
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+class LatencyHistogram:
+    def __init__(self, bounds_ms: Tuple[float, ...] = LATENCY_BOUNDS_MS):
+        self.bounds_ms = bounds_ms
+        self.counts = [0] * (len(bounds_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.counts[bisect_left(self.bounds_ms, seconds * 1000)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def buckets(self) -> List[Tuple[str, int]]:
+        """(label, count) per bucket, "<=5ms" style, trimmed to the range that has samples."""
+        labels = [f"<={b:g}ms" for b in self.bounds_ms] + [f">{self.bounds_ms[-1]:g}ms"]
+        used = [i for i, n in enumerate(self.counts) if n]
+        if not used:
+            return []
+        return [(labels[i], self.counts[i]) for i in range(used[0], used[-1] + 1)]
+
+class Metrics:
+    def __init__(self) -> None:
+        self.git_spawned = 0  # git children started, including long-lived cat-file ones
+        self.git_latency = LatencyHistogram()  # start-to-exit of one-shot git commands
+        self.frames: Deque[float] = deque(maxlen=FRAME_HISTORY)
+        self.caches: Dict[str, CacheStats] = {}
+        self._lock = threading.Lock()
+
+    def cache(self, name: str) -> CacheStats:
+        """The shared stats object for a named cache (created on first use)."""
+        stats = self.caches.get(name)
+        if stats is None:
+            stats = self.caches.setdefault(name, CacheStats())
+        return stats
+
+    def git_spawn(self) -> None:
+        with self._lock:
+            self.git_spawned += 1
+
+    def git_done(self, started: float) -> None:
+        """A one-shot git command started at perf_counter() `started` has exited."""
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.git_latency.add(elapsed)
+
+    def frame(self, seconds: float) -> None:
+        self.frames.append(seconds)
+
+METRICS = Metrics()
+
+def rss_bytes() -> Tuple[Optional[int], str]:
+    """(bytes, "rss") for the current resident set where /proc has it, else (peak, "peak rss")."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE"), "rss"
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None, "rss"
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024, "peak rss"
+
+def top_allocations(limit: int = 5) -> List[Tuple[str, int]]:
+    """(file:line, bytes) of the largest live allocations tracemalloc has seen; [] when it is not tracing."""
+    import tracemalloc
+    if not tracemalloc.is_tracing():
+        return []
+    stats = tracemalloc.take_snapshot().statistics("lineno")[:limit]
+    out = []
+    for stat in stats:
+        frame = stat.traceback[0]
+        out.append((f"{os.path.basename(frame.filename)}:{frame.lineno}", stat.size))
+    return out
+
+_BAR_WIDTH = 12
+_SPARKS = "▁▂▃▄▅▆▇█"
+
+def _mib(n: int) -> str:
+    return f"{n / (1024 * 1024):.1f} MiB"
+
+def report_lines(metrics: Metrics, rows: Sequence[Tuple[str, str]] = (),
+                 allocations: Optional[List[Tuple[str, int]]] = None, frames_shown: int = 40) -> List[str]:
+    """The perf panel's text. allocations is None while tracemalloc is off."""
+    hist = metrics.git_latency
+    lines = ["git", f"  {metrics.git_spawned} started, {hist.count} finished"]
+    if hist.count:
+        lines.append(f"  mean {hist.mean * 1000:.1f} ms, max {hist.max * 1000:.1f} ms")
+        buckets = hist.buckets()
+        peak = max(n for _label, n in buckets)
+        for label, n in buckets:
+            bar = "█" * max(1, round(_BAR_WIDTH * n / peak)) if n else ""
+            lines.append(f"  {label:>9} {n:5} {bar}".rstrip())
+
+    lines += ["", "caches"]
+    for name, stats in sorted(metrics.caches.items()):
+        lookups = stats.hits + stats.misses
+        lines.append(f"  {name:<16} {stats.hit_rate:6.1%} of {lookups}" if lookups else f"  {name:<16} unused")
+
+    if rows:
+        lines += ["", "editor"] + [f"  {name:<16} {value}" for name, value in rows]
+
+    rss, label = rss_bytes()
+    lines += ["", "memory", f"  {label:<16} {_mib(rss) if rss is not None else 'n/a'}"]
+    if allocations is None:
+        lines.append("  tracemalloc off (ctrl+t)")
+    else:
+        lines.append("  top allocations:" if allocations else "  tracemalloc on, collecting")
+        lines += [f"  {size / 1024:8.0f} KiB {where}" for where, size in allocations]
+
+    frames = list(metrics.frames)
+    lines += ["", "frames"]
+    if frames:
+        ordered = sorted(frames)
+        p95 = ordered[max(0, math.ceil(len(ordered) * 0.95) - 1)]
+        lines.append(f"  last {frames[-1] * 1000:.1f} ms, p95 {p95 * 1000:.1f}, max {ordered[-1] * 1000:.1f}")
+        recent = frames[-frames_shown:]
+        top = max(recent) or 1.0
+        lines.append("  " + "".join(_SPARKS[min(len(_SPARKS) - 1, int(f / top * len(_SPARKS)))] for f in recent))
+    else:
+        lines.append("  none yet")
+    return lines
@@ -0,0 +1,31 @@
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+from git_pal.git import CommitInfo, get_cat_file_batch, iter_commit_info
+
+# Results are handed to the UI in batches of this many commits.
+ENRICH_BATCH_SIZE = 200
+
+def iter_enrichment(shas: Iterable[str], repo_path: Path,
+                    batch_size: int = ENRICH_BATCH_SIZE) -> Iterator[Dict[str, CommitInfo]]:
+    """
+    Resolve todo SHAs (usually abbreviated) to commit metadata with a constant number
+    of git processes: one `cat-file --batch-check` round for name resolution and one
+    streamed `git log --stdin`. Yields {todo_sha: CommitInfo} batches as they arrive.
+    """
+    wanted = list(dict.fromkeys(sha for sha in shas if sha))
+    if not wanted:
+        return
+    full_to_todo: Dict[str, List[str]] = {}
+    for todo_sha, info in zip(wanted, get_cat_file_batch(repo_path).info(wanted)):
+        if info is not None and info.type == "commit":
+            full_to_todo.setdefault(info.oid, []).append(todo_sha)
+    batch: Dict[str, CommitInfo] = {}
+    for info in iter_commit_info(full_to_todo, repo_path):
+        for todo_sha in full_to_todo.get(info.sha, ()):
+            batch[todo_sha] = info
+        if len(batch) >= batch_size:
+            yield batch
+            batch = {}
+    if batch:
+        yield batch
@@ -0,0 +1,110 @@
+from array import array
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Union
+
+from git_pal.rebase.state import ActionTable, RebaseAction
+
+# Undo/redo as a log of reversible deltas. A step stores only what it changed
+# (row fields, a move, or references to two whole plans), never a copy of the
+# plan, so history cost is proportional to the edits made.
+
+ActionFields = Tuple[str, str, str, str]  # (command, commit_hash, message, flags)
+
+@dataclass(frozen=True)
+class SetRows:
+    """Rows replaced wholesale: (action index, fields before, fields after)."""
+    rows: Tuple[Tuple[int, ActionFields, ActionFields], ...]
+
+    def inverse(self) -> "SetRows":
+        return SetRows(tuple((i, after, before) for i, before, after in self.rows))
+
+@dataclass(frozen=True)
+class SetCommand:
+    """One command applied to many rows (bulk edits); before holds each row's previous command."""
+    indices: array
+    before: Tuple[str, ...]
+    after: Tuple[str, ...]
+
+    def inverse(self) -> "SetCommand":
+        return SetCommand(self.indices, self.after, self.before)
+
+@dataclass(frozen=True)
+class MoveRow:
+    src: int
+    dst: int
+
+    def inverse(self) -> "MoveRow":
+        return MoveRow(self.dst, self.src)
+
+@dataclass(frozen=True)
+class ReplacePlan:
+    """The plan object itself swapped (e.g. applied suggestions); both tables are shared, not copied."""
+    before: ActionTable
+    after: ActionTable
+
+    def inverse(self) -> "ReplacePlan":
+        return ReplacePlan(self.after, self.before)
+
+Edit = Union[SetRows, SetCommand, MoveRow, ReplacePlan]
+
+def fields_of(actions: ActionTable, index: int) -> ActionFields:
+    return (actions.command(index), actions.commit_hash(index), actions.message(index), actions.flags(index))
+
+def set_command_edit(actions: ActionTable, indices: Sequence[int], command: str) -> SetCommand:
+    rows = array("I", indices)
+    before = tuple(actions.command(i) for i in rows)
+    return SetCommand(rows, before, (command,) * len(rows))
+
+def apply_edit(actions: ActionTable, edit: Edit) -> ActionTable:
+    """Apply edit to actions in place; returns the plan to use afterwards (a different one for ReplacePlan)."""
+    if isinstance(edit, SetRows):
+        for i, _before, after in edit.rows:
+            actions[i] = RebaseAction(*after)
+    elif isinstance(edit, SetCommand):
+        set_command = actions.set_command
+        if len(set(edit.after)) == 1:
+            command = edit.after[0]
+            for i in edit.indices:
+                set_command(i, command)
+        else:
+            for i, command in zip(edit.indices, edit.after):
+                set_command(i, command)
+    elif isinstance(edit, MoveRow):
+        actions.move(edit.src, edit.dst)
+    elif isinstance(edit, ReplacePlan):
+        return edit.after
+    return actions
+
+class EditHistory:
+    """Unlimited undo/redo stacks of edits; recording a new edit drops the redo stack."""
+
+    def __init__(self):
+        self._undo: List[Edit] = []
+        self._redo: List[Edit] = []
+
+    def record(self, edit: Edit) -> None:
+        self._undo.append(edit)
+        self._redo.clear()
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo(self) -> Optional[Edit]:
+        """The edit that reverts the last recorded one (to be applied by the caller), or None."""
+        if not self._undo:
+            return None
+        edit = self._undo.pop()
+        self._redo.append(edit)
+        return edit.inverse()
+
+    def redo(self) -> Optional[Edit]:
+        if not self._redo:
+            return None
+        edit = self._redo.pop()
+        self._undo.append(edit)
+        return edit
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from git_pal.git import Repo
+from git_pal.rebase.state import ActionTable, RebaseAction
+
+# Append-only log of edits made in the TUI. If a session dies before saving, the
+# next one re-applies the edits to the freshly parsed plan instead of losing them.
+# Each record is one JSON line, flushed as it is written; a torn last line from a
+# crash is ignored on restore.
+#
+# Journals live in the common git dir, not next to the todo: git deletes the
+# rebase state directory when the sequence editor fails, which is exactly when the
+# journal is needed. They are named by a hash of the todo content (and the worktree),
+# so re-running the same rebase finds the journal of the session that crashed.
+
+JOURNAL_DIR = Path("git-pal") / "journal"
+JOURNAL_SUFFIX = ".git-pal-journal"
+JOURNAL_VERSION = 2
+# Journals nobody came back for are removed after this long.
+JOURNAL_MAX_AGE = 14 * 24 * 3600
+
+def journal_path(todo_path: Path) -> Optional[Path]:
+    """The journal for the todo file's current content; None if the todo cannot be read."""
+    try:
+        digest = hashlib.sha256(todo_path.read_bytes())
+    except OSError:
+        return None
+    try:
+        repo = Repo.discover(todo_path.parent)
+    except FileNotFoundError:
+        directory = todo_path.parent  # not in a repository: nothing else deletes this directory
+    else:
+        digest.update(b"\0" + os.fsencode(repo.git_dir))
+        directory = repo.common_dir / JOURNAL_DIR
+    return directory / f"{digest.hexdigest()}{JOURNAL_SUFFIX}"
+
+def _read_records(path: Optional[Path]) -> Optional[List[Dict[str, Any]]]:
+    """The journal's edit records, or None when there is no (current) journal at path."""
+    if path is None:
+        return None
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            lines = f.read().split("\n")
+    except OSError:
+        return None
+    try:
+        if json.loads(lines[0]) != {"v": JOURNAL_VERSION}:
+            return None
+    except ValueError:
+        return None
+    records = []
+    for line in lines[1:]:
+        if not line:
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            break  # torn write at the end of a crashed session
+    return records
+
+def _prune(directory: Path) -> None:
+    cutoff = time.time() - JOURNAL_MAX_AGE
+    try:
+        for entry in os.scandir(directory):
+            if entry.name.endswith(JOURNAL_SUFFIX) and entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+    except OSError:
+        pass
+
+class EditJournal:
+    """Writer side; RebaseScreen records every edit through one of the record_* methods."""
+
+    def __init__(self, todo_path: Path):
+        self.todo_path = todo_path
+        self.path = journal_path(todo_path)
+        self._file = None
+
+    @classmethod
+    def open(cls, todo_path: Path) -> "EditJournal":
+        """Continue the journal for this todo file if there is one, else start a new one."""
+        journal = cls(todo_path)
+        path = journal.path
+        if path is None:
+            return journal
+        try:
+            if _read_records(path) is not None:
+                # Drop a torn last record so new ones do not get glued onto it.
+                with path.open("r+b") as f:
+                    data = f.read()
+                    f.truncate(data.rfind(b"\n") + 1)
+                journal._file = path.open("a", encoding="utf-8")
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                _prune(path.parent)
+                journal._file = path.open("w", encoding="utf-8")
+                journal._append({"v": JOURNAL_VERSION})
+        except OSError:
+            journal._file = None  # autosave is best effort
+        return journal
+
+    def record_set(self, index: int, action: RebaseAction) -> None:
+        self._append({"op": "set", "i": index, "c": action.command, "h": action.commit_hash,
+                      "m": action.message, "f": action.flags})
+
+    def record_commands(self, indices: Sequence[int], commands: Sequence[str]) -> None:
+        """Bulk command change; commands is parallel to indices."""
+        if not indices:
+            return
+        uniform = len(set(commands)) == 1
+        self._append({"op": "cmd", "i": list(indices), "c": commands[0] if uniform else list(commands)})
+
+    def record_move(self, src: int, dst: int) -> None:
+        self._append({"op": "move", "src": src, "dst": dst})
+
+    def record_plan(self, actions: ActionTable) -> None:
+        """Whole-plan replacement (e.g. applied suggestions)."""
+        self._append({"op": "plan", "rows": [[actions.command(i), actions.commit_hash(i), actions.message(i),
+                                              actions.flags(i)] for i in range(len(actions))]})
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._file.flush()
+        except (OSError, ValueError):
+            self._file = None  # autosave is best effort; never break the editor
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self) -> None:
+        """The session ended normally (saved or aborted): the journal is no longer needed."""
+        self.close()
+        if self.path is None:
+            return
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+def restore_journal(todo_path: Path, actions: ActionTable) -> Tuple[ActionTable, int]:
+    """Re-apply journaled edits to the plan parsed from todo_path; returns (plan, edits applied)."""
+    records = _read_records(journal_path(todo_path))
+    if not records:
+        return actions, 0
+    applied = 0
+    for record in records:
+        op = record.get("op")
+        try:
+            if op == "set":
+                actions[record["i"]] = RebaseAction(record["c"], record["h"], record["m"], record["f"])
+            elif op == "cmd":
+                commands = record["c"]
+                for n, i in enumerate(record["i"]):
+                    actions.set_command(i, commands if isinstance(commands, str) else commands[n])
+            elif op == "move":
+                actions.move(record["src"], record["dst"])
+            elif op == "plan":
+                actions = ActionTable()
+                actions.extend_fields(tuple(row) for row in record["rows"])
+            else:
+                continue
+        except (KeyError, IndexError, TypeError):
+            break  # does not fit this plan any more; keep what applied cleanly
+        applied += 1
+    return actions, applied
@@ -0,0 +1,95 @@
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping
+
+from git_pal.git import get_cat_file_batch, iter_touched_paths
+
+class FileOverlapIndex:
+    """
+    Files touched per commit, as int bitsets over interned path ids, so
+    "do these two commits touch a common file" is a single AND.
+    """
+
+    def __init__(self):
+        self.paths: List[str] = []
+        self._path_ids: Dict[str, int] = {}
+        self._masks: Dict[str, int] = {}
+
+    @classmethod
+    def build(cls, shas: Iterable[str], repo_path: Path) -> "FileOverlapIndex":
+        """
+        Index todo SHAs (usually abbreviated) with one `cat-file --batch-check` round
+        for name resolution and one streamed `git diff-tree --stdin`.
+        """
+        index = cls()
+        wanted = list(dict.fromkeys(sha for sha in shas if sha))
+        if not wanted:
+            return index
+        full_to_todo: Dict[str, List[str]] = {}
+        for todo_sha, info in zip(wanted, get_cat_file_batch(repo_path).info(wanted)):
+            if info is not None and info.type == "commit":
+                full_to_todo.setdefault(info.oid, []).append(todo_sha)
+        for full_sha, paths in iter_touched_paths(full_to_todo, repo_path):
+            for todo_sha in full_to_todo.get(full_sha, ()):
+                index.add(todo_sha, paths)
+        return index
+
+    def add(self, sha: str, paths: Iterable[str]) -> None:
+        ids = self._path_ids
+        mask = 0
+        for path in paths:
+            pid = ids.get(path)
+            if pid is None:
+                pid = ids[path] = len(self.paths)
+                self.paths.append(path)
+            mask |= 1 << pid
+        self._masks[sha] = mask
+
+    def __contains__(self, sha: object) -> bool:
+        return sha in self._masks
+
+    def __len__(self) -> int:
+        return len(self._masks)
+
+    def mask(self, sha: str) -> int:
+        return self._masks.get(sha, 0)
+
+    def paths_of(self, sha: str) -> List[str]:
+        return self._decode(self.mask(sha))
+
+    def shared_paths(self, a: str, b: str) -> List[str]:
+        return self._decode(self.mask(a) & self.mask(b))
+
+    def overlapping(self, sha: str, others: Iterable[str]) -> List[str]:
+        mask = self.mask(sha)
+        masks = self._masks
+        return [other for other in others if masks.get(other, 0) & mask] if mask else []
+
+    def _decode(self, mask: int) -> List[str]:
+        paths = []
+        while mask:
+            low = mask & -mask
+            paths.append(self.paths[low.bit_length() - 1])
+            mask ^= low
+        return paths
+
+def reorder_overlaps(index: FileOverlapIndex, sha_at: Callable[[int], str],
+                     rank: Mapping[str, int], pos: int) -> List[int]:
+    """
+    Positions of commits that the commit now at pos has been moved across, relative to
+    its original position rank[sha], and that touch a file it touches. Only the span
+    between the original and current position is examined.
+    """
+    sha = sha_at(pos)
+    r = rank.get(sha)
+    mask = index.mask(sha)
+    if r is None or r == pos or not mask:
+        return []
+    hits = []
+    for q in range(min(r, pos), max(r, pos) + 1):
+        if q == pos:
+            continue
+        other = sha_at(q)
+        rq = rank.get(other)
+        if rq is not None and (rq > r if q < pos else rq < r) and index.mask(other) & mask:
+            hits.append(q)
+    return hits
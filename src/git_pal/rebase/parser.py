@@ -1,52 +1,130 @@
-import sys
 import re
+import sys
 from pathlib import Path
-from typing import List
-from git_pal.rebase.state import RebaseAction
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from git_pal.fsutil import atomic_write
+from git_pal.rebase.state import ActionTable, RebaseAction
+from git_pal.trace import traced
+
+# Long names and the single-letter aliases git accepts in a todo list.
+COMMAND_ALIASES = {
+    "pick": "pick", "p": "pick",
+    "reword": "reword", "r": "reword",
+    "edit": "edit", "e": "edit",
+    "squash": "squash", "s": "squash",
+    "fixup": "fixup", "f": "fixup",
+    "drop": "drop", "d": "drop",
+    "merge": "merge", "m": "merge",
+    "exec": "exec", "x": "exec",
+    "label": "label", "l": "label",
+    "reset": "reset", "t": "reset",
+    "update-ref": "update-ref", "u": "update-ref",
+    "break": "break", "b": "break",
+    "noop": "noop",
+}
+
+# `<cmd> [-C|-c] <hash> [message]`; the flag is only legal for fixup/merge.
+COMMIT_ARGS_RE = re.compile(r"(?:(-[cC])\s+)?([0-9a-f]+)(?:\s+(.*))?$")
+_HEX_DIGITS = "0123456789abcdef"
+
+_COMMIT, _ARG, _BARE = 0, 1, 2
+_KINDS = {
+    "pick": _COMMIT, "reword": _COMMIT, "edit": _COMMIT, "squash": _COMMIT,
+    "fixup": _COMMIT, "drop": _COMMIT, "merge": _COMMIT,
+    "exec": _ARG, "label": _ARG, "reset": _ARG, "update-ref": _ARG,
+    "break": _BARE, "noop": _BARE,
+}
+# First token -> (command, kind): one dict lookup picks the only matcher to run.
+_DISPATCH = {alias: (name, _KINDS[name]) for alias, name in COMMAND_ALIASES.items()}
+
+UnrecognizedHandler = Callable[[int, str], None]
+# (command, commit_hash, message, flags)
+ActionFields = Tuple[str, str, str, str]
 
-COMMIT_LINE_RE = re.compile(
-    r"^(?P<command>pick|reword|edit|squash|fixup|drop)\s+(?P<hash>[a-f0-9]+)\s+(?P<message>.*)$"
-)
-MERGE_CMD_RE = re.compile(r"^(merge)\s+([0-9a-f]{4,40})\s+(.+)$")
-OTHER_CMD_RE = re.compile(r"^(?P<command>exec|label|reset|update-ref)\s+(?P<message>.*)$")
-NO_ARG_CMD_RE = re.compile(r"^(?P<command>break|noop)$")
-COMMENT_RE = re.compile(r"^(?P<command>#)(?P<message>.*)$")
+def _parse_line(line: str) -> Optional[ActionFields]:
+    if line[0] == "#":
+        return ("#", "", line[1:], "")
+    parts = line.split(None, 1)
+    entry = _DISPATCH.get(parts[0])
+    if entry is None:
+        return None
+    command, kind = entry
+    rest = parts[1] if len(parts) > 1 else ""
+    if kind == _COMMIT:
+        # Fast path for the common flagless `<cmd> <hash> [message]`; anything else takes the regex.
+        head = rest.split(None, 1)
+        if head and not head[0].strip(_HEX_DIGITS):
+            return (command, head[0], head[1] if len(head) > 1 else "", "")
+        m = COMMIT_ARGS_RE.match(rest)
+        if m is None:
+            # `merge <label>` creates a fresh merge commit; there is no hash.
+            return (command, "", rest, "") if command == "merge" and rest else None
+        flags, commit_hash, message = m.groups()
+        if flags is None:
+            return (command, commit_hash, message or "", "")
+        if command != "fixup" and command != "merge":
+            return None
+        return (command, commit_hash, message or "", flags)
+    if kind == _ARG:
+        return (command, "", rest, "") if rest else None
+    return None if rest else (command, "", "", "")
 
+def iter_todo_fields(lines: Iterable[str], on_unrecognized: Optional[UnrecognizedHandler] = None) -> Iterator[ActionFields]:
+    """
+    Lazily parse todo lines, dispatching on the first token.
+    Unrecognized lines are kept verbatim as the command and reported to on_unrecognized(idx, line).
+    """
+    for idx, line in enumerate(lines):
+        line = line.strip()
+        if not line:
+            continue
+        fields = _parse_line(line)
+        if fields is None:
+            if on_unrecognized is not None:
+                on_unrecognized(idx, line)
+            fields = (line, "", "", "")
+        yield fields
+
+def iter_todo_actions(lines: Iterable[str], on_unrecognized: Optional[UnrecognizedHandler] = None) -> Iterator[RebaseAction]:
+    for fields in iter_todo_fields(lines, on_unrecognized):
+        yield RebaseAction(*fields)
+
+def _warn_unrecognized(unrecognized: List[int]) -> None:
+    if unrecognized:
+        shown = ", ".join(str(i) for i in unrecognized[:10])
+        more = f" (+{len(unrecognized) - 10} more)" if len(unrecognized) > 10 else ""
+        print(f"Warning: {len(unrecognized)} unrecognized line(s) kept as-is: {shown}{more}", file=sys.stderr)
+
+@traced("parse_todo_file")
 def parse_todo_file(file_path: Path) -> List[RebaseAction]:
-    actions: List[RebaseAction] = []
+    unrecognized: List[int] = []
     with file_path.open("r", encoding="utf-8") as f:
-        for idx, line in enumerate(f):
-            line = line.rstrip()
-            if not line:
-                continue
-            m = COMMIT_LINE_RE.match(line)
-            if m:
-                actions.append(
-                    RebaseAction(command=m.group("command"), commit_hash=m.group("hash"), message=m.group("message"))
-                )
-                continue
-            m = MERGE_CMD_RE.match(line)
-            if m:
-                command, commit_hash, message = m.groups()
-                actions.append(RebaseAction(command=command, commit_hash=commit_hash, message=message))
-                continue
-            m = OTHER_CMD_RE.match(line)
-            if m:
-                actions.append(RebaseAction(command=m.group("command"), message=m.group("message")))
-                continue
-            m = NO_ARG_CMD_RE.match(line)
-            if m:
-                actions.append(RebaseAction(command=m.group("command")))
-                continue
-            m = COMMENT_RE.match(line)
-            if m:
-                actions.append(RebaseAction(command="#", message=m.group("message")))
-                continue
-            print(f"Warning: Unrecognized line {idx}: {line}", file=sys.stderr)
-            actions.append(RebaseAction(command=line))
+        actions = list(iter_todo_actions(f, lambda idx, _line: unrecognized.append(idx)))
+    _warn_unrecognized(unrecognized)
     return actions
 
-def write_todo_file(file_path: Path, actions: List[RebaseAction]) -> None:
-    with file_path.open("w", encoding="utf-8") as f:
-        for action in actions:
-            f.write(str(action) + "\n")
+@traced("parse_todo_table")
+def parse_todo_table(file_path: Path) -> ActionTable:
+    """Like parse_todo_file, but straight into a compact ActionTable (no per-row objects)."""
+    unrecognized: List[int] = []
+    table = ActionTable()
+    with file_path.open("r", encoding="utf-8") as f:
+        table.extend_fields(iter_todo_fields(f, lambda idx, _line: unrecognized.append(idx)))
+    _warn_unrecognized(unrecognized)
+    return table
+
+def write_todo_file(file_path: Path, actions: Sequence[RebaseAction]) -> bool:
+    """
+    Atomically replace the todo file: the whole plan is built as one payload, written to a
+    temp file next to it, fsynced and renamed over it (atomic_write), so git never sees a partial plan.
+    Returns False, leaving the file untouched, when its content would not change.
+    """
+    lines = list(actions.iter_lines() if isinstance(actions, ActionTable) else map(str, actions))
+    payload = ("\n".join(lines) + "\n" if lines else "").encode("utf-8")
+    try:
+        if file_path.stat().st_size == len(payload) and file_path.read_bytes() == payload:
+            return False
+    except OSError:
+        pass
+    atomic_write(file_path, payload, fsync=True)
+    return True
@@ -0,0 +1,244 @@
+import fnmatch
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Pattern, Sequence, Set, Tuple
+
+from git_pal.rebase.overlap import FileOverlapIndex
+from git_pal.rebase.parser import COMMAND_ALIASES
+from git_pal.rebase.selection import BULK_COMMANDS
+from git_pal.rebase.state import ActionTable
+
+# Scripted todo edits for non-interactive rebases (CI bots). A rules file is TOML
+# (or JSON with the same shape) holding a list of [[rule]] tables:
+#
+#   [[rule]]
+#   subject = "^WIP\\b"             # regex searched in the commit subject
+#   action = "drop"
+#
+#   [[rule]]
+#   sha = ["1a2b3c4", "5d6e7f8"]    # SHA prefixes
+#   action = "fixup"
+#   after = "^Add parser"           # move right after the first commit whose subject matches
+#
+#   [[rule]]
+#   path = ["docs/*", "*.md"]       # fnmatch globs (* crosses /) over the files a commit touches
+#   move = "bottom"                 # or "top"; the moved rows keep their relative order
+#
+# A rule applies to a commit row when all of its predicates match; the first rule
+# that applies wins. Rules only touch rows whose command is one a rule may set.
+
+RULE_MOVES = ("top", "bottom")
+# Todo commands that make a plan's order structural (--rebase-merges); rules cannot reorder those plans.
+STRUCTURAL_COMMANDS = ("label", "reset", "merge", "update-ref")
+
+class RulesError(ValueError):
+    """The rules file cannot be read, or a rule is invalid."""
+
+@dataclass(frozen=True)
+class Rule:
+    name: str  # "rule 3", for messages
+    subject: Optional[Pattern] = None
+    shas: Tuple[str, ...] = ()
+    paths: Optional[Pattern] = None
+    action: Optional[str] = None
+    move: Optional[str] = None
+    after: Optional[Pattern] = None
+
+    @property
+    def reorders(self) -> bool:
+        return self.move is not None or self.after is not None
+
+@dataclass
+class RulesReport:
+    relabeled: int = 0
+    moved: int = 0
+    per_rule: Dict[str, int] = field(default_factory=dict)  # rule name -> rows it applied to
+    unresolved: List[str] = field(default_factory=list)      # rules whose `after` target was not found
+
+def load_rules(path: Path) -> List[Rule]:
+    """Parse and validate a rules file (.json, otherwise TOML)."""
+    try:
+        if path.suffix == ".json":
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        else:
+            if sys.version_info < (3, 11):
+                import tomli as tomllib
+            else:
+                import tomllib
+            with path.open("rb") as f:
+                raw = tomllib.load(f)
+    except OSError as e:
+        raise RulesError(f"cannot read rules file {path}: {e}")
+    except ValueError as e:  # JSONDecodeError and TOMLDecodeError are both ValueErrors
+        raise RulesError(f"cannot parse rules file {path}: {e}")
+    entries = raw.get("rule") if isinstance(raw, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise RulesError(f"{path}: expected at least one [[rule]] table")
+    return [_parse_rule(entry, f"rule {n}") for n, entry in enumerate(entries, 1)]
+
+def _strings(value: Any, name: str, key: str) -> List[str]:
+    values = [value] if isinstance(value, str) else value
+    if not isinstance(values, list) or not values or not all(isinstance(v, str) and v for v in values):
+        raise RulesError(f"{name}: '{key}' must be a non-empty string or list of strings")
+    return values
+
+def _regex(value: Any, name: str, key: str) -> Pattern:
+    if not isinstance(value, str):
+        raise RulesError(f"{name}: '{key}' must be a regex string")
+    try:
+        return re.compile(value)
+    except re.error as e:
+        raise RulesError(f"{name}: invalid '{key}' regex: {e}")
+
+def _parse_rule(entry: Any, name: str) -> Rule:
+    if not isinstance(entry, dict):
+        raise RulesError(f"{name}: expected a table")
+    unknown = set(entry) - {"subject", "sha", "path", "action", "move", "after"}
+    if unknown:
+        raise RulesError(f"{name}: unknown keys {', '.join(sorted(unknown))}")
+    subject = _regex(entry["subject"], name, "subject") if "subject" in entry else None
+    shas = tuple(s.lower() for s in _strings(entry["sha"], name, "sha")) if "sha" in entry else ()
+    paths = None
+    if "path" in entry:
+        # One alternation for all globs, so a path is tested once per rule.
+        paths = re.compile("|".join(fnmatch.translate(g) for g in _strings(entry["path"], name, "path")))
+    if subject is None and not shas and paths is None:
+        raise RulesError(f"{name}: needs at least one of 'subject', 'sha', 'path'")
+    action = entry.get("action")
+    if action is not None:
+        action = COMMAND_ALIASES.get(action, action) if isinstance(action, str) else action
+        if action not in BULK_COMMANDS:
+            raise RulesError(f"{name}: 'action' must be one of {', '.join(BULK_COMMANDS)}")
+    move = entry.get("move")
+    if move is not None and move not in RULE_MOVES:
+        raise RulesError(f"{name}: 'move' must be one of {', '.join(RULE_MOVES)}")
+    after = _regex(entry["after"], name, "after") if "after" in entry else None
+    if move is not None and after is not None:
+        raise RulesError(f"{name}: use either 'move' or 'after', not both")
+    if action is None and move is None and after is None:
+        raise RulesError(f"{name}: needs 'action', 'move' or 'after'")
+    return Rule(name, subject, shas, paths, action, move, after)
+
+def _sha_hits(prefixes: Sequence[str], shas: Sequence[str]) -> Set[int]:
+    """Positions in shas that agree with a rule SHA, either one being the abbreviated form of the other."""
+    hits: Set[int] = set()
+    by_length: Dict[int, Set[str]] = {}
+    for prefix in prefixes:
+        by_length.setdefault(len(prefix), set()).add(prefix)
+    for n, wanted in by_length.items():
+        hits.update(j for j, sha in enumerate(shas) if sha[:n] in wanted)
+    for n in {len(sha) for sha in shas}:
+        longer = {prefix[:n] for prefix in prefixes if len(prefix) > n}
+        if longer:
+            hits.update(j for j, sha in enumerate(shas) if len(sha) == n and sha in longer)
+    return hits
+
+def _path_masks(rules: Sequence[Rule], actions: ActionTable, rows: Sequence[int],
+                repo_path: Path) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """(SHA -> touched-path bitset, rule name -> bitset of the paths it matches), from one diff-tree run."""
+    index_shas = actions.commit_hashes(rows)
+    index = FileOverlapIndex.build(index_shas, repo_path)
+    rule_masks = {}
+    for rule in rules:
+        if rule.paths is not None:
+            match = rule.paths.match
+            bits = bytearray((len(index.paths) + 7) // 8)
+            for pid, path in enumerate(index.paths):
+                if match(path):
+                    bits[pid >> 3] |= 1 << (pid & 7)
+            rule_masks[rule.name] = int.from_bytes(bits, "little")
+    return {sha: index.mask(sha) for sha in index_shas}, rule_masks
+
+def apply_rules(actions: ActionTable, rules: Sequence[Rule],
+                repo_path: Optional[Path] = None) -> Tuple[ActionTable, RulesReport]:
+    """
+    The plan after applying rules, and what changed. Commands are set in place on a copy;
+    reorders build the new row order once. Path predicates need repo_path (one git
+    cat-file and one diff-tree process for the whole plan).
+    """
+    report = RulesReport()
+    rows = actions.indices_where(lambda command: command in BULK_COMMANDS)
+    touched: Dict[str, int] = {}
+    rule_masks: Dict[str, int] = {}
+    if any(rule.paths is not None for rule in rules):
+        if repo_path is None:
+            raise RulesError("'path' rules need a git repository")
+        touched, rule_masks = _path_masks(rules, actions, rows, repo_path)
+
+    # Each rule filters the rows no earlier rule took, one column at a time, cheapest test
+    # first; only the columns some rule looks at are decoded.
+    shas = actions.commit_hashes(rows) if rule_masks or any(rule.shas for rule in rules) else []
+    subjects = actions.messages(rows) if any(rule.subject is not None for rule in rules) else []
+    matched: Dict[int, Rule] = {}
+    remaining: Sequence[int] = range(len(rows))
+    for rule in rules:
+        candidates = remaining
+        if rule.shas:
+            hits = _sha_hits(rule.shas, shas)
+            candidates = [j for j in candidates if j in hits]
+        if rule.paths is not None:
+            mask = rule_masks[rule.name]
+            candidates = [j for j in candidates if touched.get(shas[j], 0) & mask]
+        if rule.subject is not None:
+            search = rule.subject.search
+            candidates = [j for j in candidates if search(subjects[j])]
+        if not candidates:
+            continue
+        report.per_rule[rule.name] = len(candidates)
+        for j in candidates:
+            matched[rows[j]] = rule
+        taken = set(candidates)
+        remaining = [j for j in remaining if j not in taken]
+
+    result = actions.copy()
+    for i, rule in matched.items():
+        if rule.action is not None and result.command(i) != rule.action:
+            result.set_command(i, rule.action)
+            report.relabeled += 1
+    if any(rule.reorders for rule in matched.values()):
+        structural = sorted({result.command(i) for i in result.indices_where(lambda c: c in STRUCTURAL_COMMANDS)})
+        if structural:
+            raise RulesError(f"cannot reorder a plan with {', '.join(structural)} rows (--rebase-merges)")
+        result, report.moved = _reorder(result, matched, report)
+    return result, report
+
+def _reorder(actions: ActionTable, matched: Dict[int, Rule], report: RulesReport) -> Tuple[ActionTable, int]:
+    # An `after` target is never a row that moves itself, so placements do not chain.
+    targets: Dict[str, Optional[int]] = {}
+    for rule in {rule.name: rule for rule in matched.values() if rule.after is not None}.values():
+        search = rule.after.search
+        targets[rule.name] = next((i for i in range(len(actions)) if actions.command(i) in BULK_COMMANDS
+                                   and not (i in matched and matched[i].reorders)
+                                   and search(actions.message(i))), None)
+        if targets[rule.name] is None:
+            report.unresolved.append(rule.name)
+    top: List[int] = []
+    bottom: List[int] = []
+    attached: Dict[int, List[int]] = {}
+    for i in sorted(matched):
+        rule = matched[i]
+        if rule.move == "top":
+            top.append(i)
+        elif rule.move == "bottom":
+            bottom.append(i)
+        elif rule.after is not None and targets[rule.name] is not None:
+            attached.setdefault(targets[rule.name], []).append(i)
+    placed = set(top).union(bottom, *attached.values())
+    # "bottom" is the end of the plan proper, above git's trailing comment block.
+    end = len(actions)
+    while end and actions.command(end - 1).startswith("#"):
+        end -= 1
+    order = top
+    if attached:
+        for i in range(end):
+            if i not in placed:
+                order.append(i)
+                order.extend(attached.get(i, ()))
+    else:
+        order.extend(i for i in range(end) if i not in placed)
+    order.extend(bottom)
+    order.extend(range(end, len(actions)))
+    return actions.take(order), len(placed)
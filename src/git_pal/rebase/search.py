@@ -0,0 +1,125 @@
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Iterator, List, Optional, Set
+
+from git_pal.rebase.parser import COMMAND_ALIASES
+from git_pal.rebase.state import ActionTable
+
+# Incremental search over a rebase plan. Queries:
+#   "cmd:fixup"   rows with that command (aliases allowed)
+#   "sha:abc12"   rows whose SHA starts with the prefix
+#   anything else rows whose subject contains the text (case-insensitive), or,
+#                 for 4+ hex digits, whose SHA starts with it
+
+_HEX_RE = re.compile(r"[0-9a-f]{4,}")
+# Subject terms hitting at most 1/N of the rows are located with str.find over the
+# corpus; broader ones are cheaper as one substring test per row.
+SPARSE_MATCH_RATIO = 8
+
+@dataclass(frozen=True)
+class SearchQuery:
+    kind: str  # "cmd", "sha" or "text"
+    term: str
+
+    def matches(self, actions: ActionTable, index: int) -> bool:
+        if self.kind == "cmd":
+            return actions.command(index) == self.term
+        sha_hit = actions.commit_hash(index).startswith(self.term)
+        if self.kind == "sha":
+            return sha_hit
+        return (sha_hit and _HEX_RE.fullmatch(self.term) is not None) or self.term in actions.message(index).lower()
+
+def parse_query(text: str) -> Optional[SearchQuery]:
+    """The query for a search box value, or None when it is empty."""
+    text = text.strip()
+    if text.startswith("cmd:"):
+        term = text[4:].strip()
+        return SearchQuery("cmd", COMMAND_ALIASES.get(term, term)) if term else None
+    if text.startswith("sha:"):
+        term = text[4:].strip().lower()
+        return SearchQuery("sha", term) if term else None
+    return SearchQuery("text", text.lower()) if text else None
+
+class PlanSearchIndex:
+    """
+    Built once per plan, then kept in step with edits instead of rebuilt: subjects
+    are lowercased once into a list and one newline-joined corpus, so a query is a
+    C-level str.find/count over the corpus (selective terms) or a substring test per
+    row (broad ones), and SHAs sit in a sorted list searched by bisect. Entries are
+    numbered by their row at build time; moves only renumber the rows they span,
+    and entries whose text was edited are checked against the plan directly.
+    """
+
+    def __init__(self, actions: ActionTable):
+        n = len(actions)
+        self._subjects = [actions.message(i).lower() for i in range(n)]
+        self._corpus = "\n".join(self._subjects)
+        self._starts = array("I", accumulate((len(subject) + 1 for subject in self._subjects), initial=0))
+        pairs = sorted((sha, i) for i, sha in ((i, actions.commit_hash(i)) for i in range(n)) if sha)
+        self._shas = [sha for sha, _i in pairs]
+        self._sha_docs = array("I", [i for _sha, i in pairs])
+        self._doc_at = array("I", range(n))  # current row -> entry
+        self._row_of = array("I", range(n))  # entry -> current row
+        self._dirty: Set[int] = set()        # entries whose text changed since the build
+
+    def __len__(self) -> int:
+        return len(self._doc_at)
+
+    def move(self, src: int, dst: int) -> None:
+        """Mirror ActionTable.move(src, dst)."""
+        doc_at, row_of = self._doc_at, self._row_of
+        doc_at.insert(dst, doc_at.pop(src))
+        for row in range(min(src, dst), max(src, dst) + 1):
+            row_of[doc_at[row]] = row
+
+    def touch(self, index: int) -> None:
+        """The subject or SHA of row index was edited."""
+        self._dirty.add(self._doc_at[index])
+
+    def search(self, actions: ActionTable, query: SearchQuery) -> List[int]:
+        """Rows of actions (the plan this index tracks) matching query, in plan order."""
+        if query.kind == "cmd":
+            return list(actions.indices_where(lambda command: command == query.term))
+        rows: List[int] = []
+        if query.kind == "text":
+            needle = query.term
+            if self._corpus.count(needle) * SPARSE_MATCH_RATIO <= len(self):
+                row_of = self._row_of
+                rows = sorted(row_of[doc] for doc in self._subject_docs(needle))
+            else:
+                subjects = self._subjects
+                rows = [row for row, doc in enumerate(self._doc_at) if needle in subjects[doc]]
+        if query.kind == "sha" or _HEX_RE.fullmatch(query.term):
+            row_of = self._row_of
+            by_sha = [row_of[doc] for doc in self._sha_docs_with_prefix(query.term)]
+            if by_sha:
+                rows = sorted(set(rows).union(by_sha))
+        dirty = self._dirty
+        if dirty:
+            # Edited rows: drop index hits, then re-test them against the plan.
+            stale = {self._row_of[doc] for doc in dirty}
+            rows = [row for row in rows if row not in stale]
+            rows.extend(row for row in stale if query.matches(actions, row))
+            rows.sort()
+        return rows
+
+    def _subject_docs(self, needle: str) -> Iterator[int]:
+        # One find per matching entry: after a hit, resume at the start of the next entry.
+        find, starts, n = self._corpus.find, self._starts, len(self)
+        pos = find(needle)
+        while pos != -1:
+            doc = bisect_right(starts, pos) - 1
+            yield doc
+            if doc + 1 >= n:
+                return
+            pos = find(needle, starts[doc + 1])
+
+    def _sha_docs_with_prefix(self, prefix: str) -> array:
+        shas = self._shas
+        lo = bisect_left(shas, prefix)
+        # Every string with the prefix sorts before prefix + the highest code point.
+        hi = bisect_left(shas, prefix + "\U0010ffff", lo)
+        return self._sha_docs[lo:hi]
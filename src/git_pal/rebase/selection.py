@@ -0,0 +1,53 @@
+import re
+from typing import Callable, List, Optional, Sequence
+
+from git_pal.rebase.parser import COMMAND_ALIASES
+from git_pal.rebase.state import ActionTable
+
+# Row selectors for bulk edits, matched against the visible rows of a plan:
+#   "120-900", "5", "1-3, 7"   table rows, 1-based and inclusive
+#   "cmd:pick"                 rows with that command (aliases allowed)
+#   "sha:abc12"                rows whose SHA starts with the prefix
+#   "/regex/"                  rows whose subject matches the regex
+#   anything else              rows whose subject contains the text (case-insensitive)
+
+# Commands a bulk edit may set; only rows that already carry a commit take them.
+BULK_COMMANDS = ("pick", "reword", "edit", "squash", "fixup", "drop")
+
+_RANGES_RE = re.compile(r"\s*\d+(\s*-\s*\d+)?(\s*,\s*\d+(\s*-\s*\d+)?)*\s*")
+
+def parse_row_ranges(spec: str, row_count: int) -> Optional[List[int]]:
+    """0-based rows for a "120-900, 5" spec (clamped to the table), or None if spec is not a range list."""
+    if not _RANGES_RE.fullmatch(spec):
+        return None
+    rows: List[int] = []
+    for part in spec.split(","):
+        lo, _, hi = part.partition("-")
+        start, stop = int(lo) - 1, int(hi or lo)
+        rows.extend(range(max(start, 0), min(stop, row_count)))
+    return sorted(set(rows))
+
+def _row_matcher(actions: ActionTable, spec: str) -> Callable[[int], bool]:
+    if spec.startswith("cmd:"):
+        wanted = spec[4:].strip()
+        command = COMMAND_ALIASES.get(wanted, wanted)
+        return lambda idx: actions.command(idx) == command
+    if spec.startswith("sha:"):
+        prefix = spec[4:].strip().lower()
+        return lambda idx: actions.commit_hash(idx).startswith(prefix)
+    if len(spec) >= 2 and spec.startswith("/") and spec.endswith("/"):
+        search = re.compile(spec[1:-1]).search
+        return lambda idx: search(actions.message(idx)) is not None
+    needle = spec.lower()
+    return lambda idx: needle in actions.message(idx).lower()
+
+def select_rows(actions: ActionTable, view: Sequence[int], spec: str) -> List[int]:
+    """Table rows (positions in view, which maps rows to action indices) matched by a selector spec."""
+    spec = spec.strip()
+    if not spec:
+        return []
+    rows = parse_row_ranges(spec, len(view))
+    if rows is not None:
+        return rows
+    matches = _row_matcher(actions, spec)
+    return [pos for pos, idx in enumerate(view) if matches(idx)]
@@ -1,25 +1,340 @@
-from dataclasses import dataclass, field
+import re
+from array import array
+from collections.abc import Sequence
+from itertools import accumulate, islice
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union, overload
+
+COMMIT_COMMANDS = ("pick", "reword", "edit", "squash", "fixup", "drop", "merge")
+ARG_COMMANDS = ("label", "reset", "update-ref", "exec")
+BARE_COMMANDS = ("break", "noop")
+
+# Option flags for `fixup -C/-c` and `merge -C/-c`.
+FLAG_NAMES = ("", "-C", "-c")
+
+_FLAG_CODES = {name: i for i, name in enumerate(FLAG_NAMES)}
+_HEX_RE = re.compile(r"[0-9a-f]+")
+# Rows converted per columnar batch in extend_fields().
+_BULK_CHUNK = 65536
+
+def _pack_sha(commit_hash: str) -> Optional[bytes]:
+    """Binary form of a lowercase hex SHA (odd lengths padded); None if it would not round-trip."""
+    if len(commit_hash) > 255:
+        return None
+    try:
+        packed = bytes.fromhex(commit_hash if len(commit_hash) % 2 == 0 else commit_hash + "0")
+    except ValueError:
+        return None
+    return packed if packed.hex().startswith(commit_hash) else None
+
+def format_action_line(command: str, commit_hash: str = "", message: str = "", flags: str = "") -> str:
+    if command in COMMIT_COMMANDS:
+        if flags:
+            return f"{command} {flags} {commit_hash} {message}".rstrip()
+        return f"{command} {commit_hash} {message}".rstrip()
+    if command in ARG_COMMANDS:
+        return f"{command} {message}".rstrip()
+    if command in BARE_COMMANDS:
+        return command
+    if command.startswith("#"):
+        return f"{command}{message}"
+    return f"{command} {commit_hash} {message}".strip()
 
-@dataclass
 class RebaseAction:
-    command: str
-    commit_hash: str = ""
-    message: str = ""
-    original_line: str = field(init=False, repr=False, default="")
+    """One todo row. Slotted: no per-instance __dict__, and the line is formatted on demand."""
+
+    __slots__ = ("command", "commit_hash", "message", "flags")
 
-    def __post_init__(self):
-        self.original_line = self._to_line()
+    def __init__(self, command: str, commit_hash: str = "", message: str = "", flags: str = ""):
+        self.command = command
+        self.commit_hash = commit_hash
+        self.message = message
+        self.flags = flags
+
+    @property
+    def original_line(self) -> str:
+        return self._to_line()
 
     def _to_line(self) -> str:
-        if self.command in ("pick", "reword", "edit", "squash", "fixup", "drop", "merge"):
-            return f"{self.command} {self.commit_hash} {self.message}".rstrip()
-        if self.command in ("label", "reset", "update-ref", "exec"):
-            return f"{self.command} {self.message}".rstrip()
-        if self.command in ("break", "noop"):
-            return self.command
-        if self.command.startswith("#"):
-            return f"{self.command}{self.message}"
-        return f"{self.command} {self.commit_hash} {self.message}".strip()
+        return format_action_line(self.command, self.commit_hash, self.message, self.flags)
 
     def __str__(self) -> str:
         return self._to_line()
+
+    def __repr__(self) -> str:
+        return (f"RebaseAction(command={self.command!r}, commit_hash={self.commit_hash!r}, "
+                f"message={self.message!r}, flags={self.flags!r})")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RebaseAction):
+            return NotImplemented
+        return (self.command, self.commit_hash, self.message, self.flags) == (
+            other.command, other.commit_hash, other.message, other.flags)
+
+    __hash__ = None  # mutable, like the dataclass it replaces
+
+class ActionTable(Sequence):
+    """
+    Columnar store for a whole todo plan.
+    Commands are interned to small codes, SHAs are packed to binary and messages
+    live in one UTF-8 heap, so a row costs tens of bytes and copy() is a few memcpys.
+    Indexing returns a fresh RebaseAction; write back with table[i] = action.
+    """
+
+    __slots__ = ("_names", "_codes", "_cmd", "_flag", "_sha_heap", "_sha_off", "_sha_len",
+                 "_raw_sha", "_msg_heap", "_msg_off", "_msg_len")
+
+    def __init__(self, actions: Iterable[RebaseAction] = ()):
+        self._names: List[str] = list(COMMIT_COMMANDS + ARG_COMMANDS + BARE_COMMANDS + ("#",))
+        self._codes: Dict[str, int] = {name: i for i, name in enumerate(self._names)}
+        self._cmd = array("I")
+        self._flag = array("B")
+        self._sha_heap = bytearray()
+        self._sha_off = array("I")
+        self._sha_len = array("B")
+        # SHAs that are not plain lowercase hex (never produced by git) are kept as text.
+        self._raw_sha: Dict[int, str] = {}
+        self._msg_heap = bytearray()
+        self._msg_off = array("I")
+        self._msg_len = array("I")
+        for action in actions:
+            self.append(action)
+
+    @classmethod
+    def from_actions(cls, actions: Iterable[RebaseAction]) -> "ActionTable":
+        if isinstance(actions, ActionTable):
+            return actions.copy()
+        return cls(actions)
+
+    # ---- construction ------------------------------------------------------
+    def append(self, action: RebaseAction) -> None:
+        self.append_fields(action.command, action.commit_hash, action.message, action.flags)
+
+    def append_fields(self, command: str, commit_hash: str = "", message: str = "", flags: str = "") -> None:
+        # Hot path for parsing: columns are appended inline rather than via _store_*.
+        code = self._codes.get(command)
+        self._cmd.append(self._intern(command) if code is None else code)
+        self._flag.append(_FLAG_CODES.get(flags, 0))
+        packed = _pack_sha(commit_hash) if commit_hash else None
+        if packed is None:
+            if commit_hash:
+                self._raw_sha[len(self._cmd) - 1] = commit_hash
+            self._sha_off.append(0)
+            self._sha_len.append(0)
+        else:
+            self._sha_off.append(len(self._sha_heap))
+            self._sha_len.append(len(commit_hash))
+            self._sha_heap += packed
+        data = message.encode("utf-8")
+        self._msg_off.append(len(self._msg_heap))
+        self._msg_len.append(len(data))
+        self._msg_heap += data
+
+    def extend_fields(self, rows: Iterable[Tuple[str, str, str, str]]) -> None:
+        """Bulk append of (command, commit_hash, message, flags) rows, a chunk of columns at a time."""
+        it = iter(rows)
+        while True:
+            chunk = list(islice(it, _BULK_CHUNK))
+            if not chunk:
+                return
+            self._extend_chunk(chunk)
+
+    def _extend_chunk(self, chunk: List[Tuple[str, str, str, str]]) -> None:
+        codes, intern, base = self._codes, self._intern, len(self._cmd)
+        commands, shas, messages, flags = zip(*chunk)
+        self._cmd.extend([codes[c] if c in codes else intern(c) for c in commands])
+        self._flag.extend([_FLAG_CODES.get(f, 0) for f in flags])
+        joined = "".join(shas)
+        if (not joined or _HEX_RE.fullmatch(joined)) and max(map(len, shas)) < 256:
+            # Every hash is packable: validate the whole chunk with one regex call.
+            packed_hex = [sha + "0" if len(sha) & 1 else sha for sha in shas]
+            hex_lens = list(map(len, shas))
+        else:
+            packed_hex, hex_lens = self._pack_hex(shas, base)
+        sizes = [(n + 1) // 2 for n in hex_lens]
+        self._sha_off.extend(accumulate(sizes, initial=len(self._sha_heap)))
+        self._sha_off.pop()
+        self._sha_len.extend(hex_lens)
+        self._sha_heap += bytes.fromhex("".join(packed_hex))
+        data = [m.encode("utf-8") for m in messages]
+        lengths = array("I", map(len, data))
+        self._msg_off.extend(accumulate(lengths, initial=len(self._msg_heap)))
+        self._msg_off.pop()
+        self._msg_len.extend(lengths)
+        self._msg_heap += b"".join(data)
+
+    def _pack_hex(self, shas: Sequence[str], base: int) -> Tuple[List[str], List[int]]:
+        # Row by row: anything that is not plain hex is kept verbatim in _raw_sha.
+        packed_hex: List[str] = []
+        hex_lens: List[int] = []
+        for i, sha in enumerate(shas):
+            if sha and len(sha) < 256 and _HEX_RE.fullmatch(sha):
+                packed_hex.append(sha if len(sha) % 2 == 0 else sha + "0")
+                hex_lens.append(len(sha))
+            else:
+                if sha:
+                    self._raw_sha[base + i] = sha
+                hex_lens.append(0)
+        return packed_hex, hex_lens
+
+    def extend(self, actions: Iterable[RebaseAction]) -> None:
+        for action in actions:
+            self.append(action)
+
+    def copy(self) -> "ActionTable":
+        clone = ActionTable.__new__(ActionTable)
+        clone._names = list(self._names)
+        clone._codes = dict(self._codes)
+        for name in ("_cmd", "_flag", "_sha_heap", "_sha_off", "_sha_len",
+                     "_msg_heap", "_msg_off", "_msg_len"):
+            setattr(clone, name, getattr(self, name)[:])
+        clone._raw_sha = dict(self._raw_sha)
+        return clone
+
+    def take(self, order: Sequence[int]) -> "ActionTable":
+        """New table holding the rows at the given indices (e.g. a reordering), gathered column by column."""
+        clone = ActionTable.__new__(ActionTable)
+        clone._names = list(self._names)
+        clone._codes = dict(self._codes)
+        gather = itemgetter(*order) if len(order) > 1 else (lambda col: [col[i] for i in order])
+        for name in ("_cmd", "_flag", "_sha_off", "_sha_len", "_msg_off", "_msg_len"):
+            col = getattr(self, name)
+            setattr(clone, name, array(col.typecode, gather(col)))
+        clone._sha_heap = self._sha_heap[:]
+        clone._msg_heap = self._msg_heap[:]
+        raw = self._raw_sha
+        clone._raw_sha = {new: raw[old] for new, old in enumerate(order) if old in raw} if raw else {}
+        return clone
+
+    # ---- read API ----------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._cmd)
+
+    @overload
+    def __getitem__(self, index: int) -> RebaseAction: ...
+    @overload
+    def __getitem__(self, index: slice) -> List[RebaseAction]: ...
+    def __getitem__(self, index: Union[int, slice]) -> Union[RebaseAction, List[RebaseAction]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        i = self._index(index)
+        return RebaseAction(self._names[self._cmd[i]], self.commit_hash(i), self.message(i),
+                            FLAG_NAMES[self._flag[i]])
+
+    def __iter__(self) -> Iterator[RebaseAction]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def command(self, index: int) -> str:
+        return self._names[self._cmd[index]]
+
+    def flags(self, index: int) -> str:
+        return FLAG_NAMES[self._flag[index]]
+
+    def commit_hash(self, index: int) -> str:
+        n = self._sha_len[index]
+        if n == 0:
+            return self._raw_sha.get(index, "") if self._raw_sha else ""
+        off = self._sha_off[index]
+        return self._sha_heap[off:off + (n + 1) // 2].hex()[:n]
+
+    def commit_hashes(self, indices: Iterable[int]) -> List[str]:
+        """commit_hash() of many rows, hex-decoding the packed SHA heap once instead of per row."""
+        hexed, off, lengths, raw = self._sha_heap.hex(), self._sha_off, self._sha_len, self._raw_sha
+        hashes = []
+        for i in indices:
+            n = lengths[i]
+            if n:
+                start = off[i] * 2
+                hashes.append(hexed[start:start + n])
+            else:
+                hashes.append(raw.get(i, ""))
+        return hashes
+
+    def message(self, index: int) -> str:
+        off = self._msg_off[index]
+        return self._msg_heap[off:off + self._msg_len[index]].decode("utf-8")
+
+    def messages(self, indices: Iterable[int]) -> List[str]:
+        """message() of many rows; an all-ASCII heap is decoded once and sliced."""
+        heap, off, lengths = self._msg_heap, self._msg_off, self._msg_len
+        if not heap.isascii():
+            return [self.message(i) for i in indices]
+        text = heap.decode("ascii")
+        return [text[off[i]:off[i] + lengths[i]] for i in indices]
+
+    def line(self, index: int) -> str:
+        return format_action_line(self.command(index), self.commit_hash(index),
+                                  self.message(index), self.flags(index))
+
+    def indices_where(self, predicate: Callable[[str], bool]) -> array:
+        """Row indices whose command satisfies predicate (evaluated once per distinct command)."""
+        wanted = {code for code, name in enumerate(self._names) if predicate(name)}
+        return array("I", [i for i, code in enumerate(self._cmd) if code in wanted])
+
+    def iter_lines(self) -> Iterator[str]:
+        """line() of every row, with the hash and message heaps decoded in bulk."""
+        rows = range(len(self))
+        names = self._names
+        for code, flag, commit_hash, message in zip(self._cmd, self._flag, self.commit_hashes(rows), self.messages(rows)):
+            yield format_action_line(names[code], commit_hash, message, FLAG_NAMES[flag])
+
+    # ---- mutation ----------------------------------------------------------
+    def __setitem__(self, index: int, action: RebaseAction) -> None:
+        i = self._index(index)
+        self._cmd[i] = self._intern(action.command)
+        self._flag[i] = _FLAG_CODES.get(action.flags, 0)
+        if action.commit_hash != self.commit_hash(i):
+            self._store_sha(i, action.commit_hash)
+        if action.message != self.message(i):
+            self._store_message(i, action.message)
+
+    def set_command(self, index: int, command: str) -> None:
+        self._cmd[self._index(index)] = self._intern(command)
+
+    def move(self, src: int, dst: int) -> None:
+        """Move row src so that it ends up at index dst."""
+        src, dst = self._index(src), self._index(dst)
+        if src == dst:
+            return
+        for col in (self._cmd, self._flag, self._sha_off, self._sha_len, self._msg_off, self._msg_len):
+            col.insert(dst, col.pop(src))
+        if self._raw_sha:
+            order = list(range(len(self)))
+            order.insert(dst, order.pop(src))
+            self._raw_sha = {new: self._raw_sha[old] for new, old in enumerate(order) if old in self._raw_sha}
+
+    # ---- internals ---------------------------------------------------------
+    def _index(self, index: int) -> int:
+        n = len(self._cmd)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("ActionTable index out of range")
+        return index
+
+    def _intern(self, command: str) -> int:
+        code = self._codes.get(command)
+        if code is None:
+            code = self._codes[command] = len(self._names)
+            self._names.append(command)
+        return code
+
+    def _store_sha(self, row: int, commit_hash: str) -> None:
+        # Heaps are append-only; a replaced value leaves its old bytes behind.
+        self._raw_sha.pop(row, None)
+        packed = _pack_sha(commit_hash) if commit_hash else None
+        if packed is None:
+            self._sha_len[row] = 0
+            if commit_hash:
+                self._raw_sha[row] = commit_hash
+            return
+        self._sha_off[row] = len(self._sha_heap)
+        self._sha_len[row] = len(commit_hash)
+        self._sha_heap += packed
+
+    def _store_message(self, row: int, message: str) -> None:
+        data = message.encode("utf-8")
+        self._msg_off[row] = len(self._msg_heap)
+        self._msg_len[row] = len(data)
+        self._msg_heap += data
@@ -0,0 +1,154 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from git_pal.git import CommitInfo
+from git_pal.rebase.overlap import FileOverlapIndex
+from git_pal.rebase.state import ActionTable
+
+# Autosquash markers, checked in this order, and the todo command each one becomes.
+AUTOSQUASH_PREFIXES: Tuple[Tuple[str, str, str], ...] = (
+    ("fixup! ", "fixup", ""),
+    ("squash! ", "squash", ""),
+    ("amend! ", "fixup", "-C"),
+)
+# Rows that can be folded into an earlier commit, and rows that can receive one.
+FOLDABLE_COMMANDS = ("pick",)
+TARGET_COMMANDS = ("pick", "reword", "edit", "squash", "fixup")
+# Unlabeled commits at most this big are candidates for a file-overlap fixup suggestion.
+SMALL_COMMIT_PATHS = 2
+SMALL_COMMIT_LINES = 20
+
+@dataclass(frozen=True)
+class Suggestion:
+    index: int   # action index of the commit to fold
+    target: int  # action index of the commit it folds into
+    command: str
+    flags: str
+    reason: str
+
+def _strip_marker(subject: str) -> Optional[Tuple[str, str, str]]:
+    """(command, flags, target subject) for an autosquash subject; nested markers collapse to the outermost."""
+    for prefix, command, flags in AUTOSQUASH_PREFIXES:
+        if subject.startswith(prefix):
+            rest = subject[len(prefix):]
+            while rest.startswith(tuple(p for p, _c, _f in AUTOSQUASH_PREFIXES)):
+                rest = rest.split(" ", 1)[1] if " " in rest else ""
+            return command, flags, rest
+    return None
+
+def suggest(actions: ActionTable, overlaps: Optional[FileOverlapIndex] = None,
+            commit_info: Optional[Mapping[str, CommitInfo]] = None) -> List[Suggestion]:
+    """
+    Fold suggestions for a plan, in plan order. fixup!/squash!/amend! subjects are
+    matched to earlier commits the way `git rebase --autosquash` does (exact subject,
+    then SHA prefix, then subject prefix) through hash and sorted indexes, so the cost
+    is linear in the plan size. With a file index, small unlabeled commits whose files
+    were all last touched by one earlier commit are proposed as fixups of it.
+    """
+    # Exact subject / SHA -> earliest target row. Prefix lookups bisect the distinct keys,
+    # so repeated subjects cost nothing, and remember the earliest row per prefix: only
+    # that row can be the answer, whichever fixup asks.
+    by_subject: Dict[str, int] = {}
+    by_sha: Dict[str, int] = {}
+    for idx in range(len(actions)):
+        if actions.command(idx) in TARGET_COMMANDS:
+            by_subject.setdefault(actions.message(idx), idx)
+            by_sha.setdefault(actions.commit_hash(idx), idx)
+    sorted_subjects = sorted(by_subject.items())
+    sorted_shas = sorted(by_sha.items())
+    subject_prefixes: Dict[str, Optional[int]] = {}
+    sha_prefixes: Dict[str, Optional[int]] = {}
+
+    def first_prefixed(pairs: List[Tuple[str, int]], memo: Dict[str, Optional[int]],
+                       prefix: str, before: int) -> Optional[int]:
+        if prefix not in memo:
+            first = None
+            for key, idx in pairs[bisect_left(pairs, (prefix,)):]:
+                if not key.startswith(prefix):
+                    break
+                if first is None or idx < first:
+                    first = idx
+            memo[prefix] = first
+        first = memo[prefix]
+        return first if first is not None and first < before else None
+
+    suggestions: List[Suggestion] = []
+    labeled = set()
+    for idx in range(len(actions)):
+        if actions.command(idx) not in FOLDABLE_COMMANDS:
+            continue
+        marker = _strip_marker(actions.message(idx))
+        if marker is None:
+            continue
+        command, flags, wanted = marker
+        if not wanted:
+            continue
+        target = by_subject.get(wanted)
+        how = "subject"
+        if target is None or target >= idx:
+            target, how = by_sha.get(wanted), "sha"
+            if target is None or target >= idx:
+                target = first_prefixed(sorted_shas, sha_prefixes, wanted, idx) if len(wanted) >= 4 else None
+            if target is None:
+                target, how = first_prefixed(sorted_subjects, subject_prefixes, wanted, idx), "subject prefix"
+        if target is not None:
+            labeled.add(idx)
+            suggestions.append(Suggestion(idx, target, command, flags, f"{command} by {how}"))
+
+    if overlaps is not None and len(overlaps):
+        suggestions.extend(_overlap_suggestions(actions, overlaps, commit_info or {}, labeled))
+        suggestions.sort(key=lambda s: s.index)
+    return suggestions
+
+def _overlap_suggestions(actions: ActionTable, overlaps: FileOverlapIndex,
+                         commit_info: Mapping[str, CommitInfo], skip: set) -> List[Suggestion]:
+    # Single pass keeping, per interned path, the last row that touched it.
+    last_touch: Dict[int, int] = {}
+    found: List[Suggestion] = []
+    for idx in range(len(actions)):
+        command = actions.command(idx)
+        if command not in TARGET_COMMANDS:
+            continue
+        sha = actions.commit_hash(idx)
+        mask = overlaps.mask(sha)
+        if not mask:
+            continue
+        bits = []
+        m = mask
+        while m:
+            low = m & -m
+            bits.append(low.bit_length() - 1)
+            m ^= low
+        if command in FOLDABLE_COMMANDS and idx not in skip and len(bits) <= SMALL_COMMIT_PATHS:
+            info = commit_info.get(sha)
+            # Only once the diffstat is in: before enrichment every commit would look small.
+            small = info is not None and info.insertions + info.deletions <= SMALL_COMMIT_LINES
+            owners = {last_touch.get(bit) for bit in bits}
+            if small and len(owners) == 1 and None not in owners:
+                target = owners.pop()
+                found.append(Suggestion(idx, target, "fixup", "", "fixup by file overlap"))
+        for bit in bits:
+            last_touch[bit] = idx
+    return found
+
+def apply_suggestions(actions: ActionTable, suggestions: List[Suggestion]) -> ActionTable:
+    """New plan with each suggested commit moved right after its target (after earlier folds into it) and relabeled."""
+    folds: Dict[int, List[Suggestion]] = {}
+    folded: Dict[int, Suggestion] = {}
+    for s in suggestions:
+        folds.setdefault(s.target, []).append(s)
+        folded[s.index] = s
+    rows: List[Tuple[str, str, str, str]] = []
+    for idx in range(len(actions)):
+        if idx in folded:
+            continue
+        # Depth-first over fold chains (fixups of fixups), iteratively.
+        stack = [(idx, actions.command(idx), actions.flags(idx))]
+        while stack:
+            row, command, flags = stack.pop()
+            rows.append((command, actions.commit_hash(row), actions.message(row), flags))
+            stack.extend((s.index, s.command, s.flags) for s in reversed(folds.get(row, ())))
+    result = ActionTable()
+    result.extend_fields(rows)
+    return result
@@ -0,0 +1,141 @@
+import atexit
+import functools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+# Opt-in span tracing. With GIT_PAL_TRACE set, spans are recorded in memory and
+# written on exit as Chrome trace-event JSON (open in ui.perfetto.dev or
+# chrome://tracing):
+#
+#   GIT_PAL_TRACE=1                       -> $TMPDIR/git-pal-trace-<pid>.json
+#   GIT_PAL_TRACE=/tmp/trace-{pid}.json   -> that file ({pid} is expanded)
+#
+# The variable is read once, at import. When it is unset, traced() returns the
+# function it decorates unchanged and span() returns a shared no-op context
+# manager, so instrumented code pays one call at most.
+
+TRACE_ENV = "GIT_PAL_TRACE"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+class Tracer:
+    """Collects complete ("X") and instant ("i") trace events for this process."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.pid = os.getpid()
+        self.events: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter_ns()
+        self._threads: Dict[int, str] = {}
+
+    def _us(self, ns: int) -> float:
+        return (ns - self._origin) / 1000
+
+    def _tid(self) -> int:
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        return tid
+
+    @contextmanager
+    def span(self, name: str, cat: str = "git-pal", **args: Any) -> Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            event = {"name": name, "cat": cat, "ph": "X", "ts": self._us(start), "dur": (end - start) / 1000,
+                     "pid": self.pid, "tid": self._tid()}
+            if args:
+                event["args"] = args
+            self.events.append(event)  # list.append is atomic: worker threads may record too
+
+    def instant(self, name: str, cat: str = "git-pal", **args: Any) -> None:
+        event = {"name": name, "cat": cat, "ph": "i", "s": "t", "ts": self._us(time.perf_counter_ns()),
+                 "pid": self.pid, "tid": self._tid()}
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def to_json(self) -> Dict[str, Any]:
+        meta = [{"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": "git-pal"}}]
+        meta += [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                 for tid, name in list(self._threads.items())]
+        return {"traceEvents": meta + sorted(self.events, key=lambda e: e["ts"]), "displayTimeUnit": "ms"}
+
+    def write(self) -> None:
+        if os.getpid() != self.pid:
+            return  # a forked worker: the parent owns the file
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.to_json()), encoding="utf-8")
+
+_tracer: Optional[Tracer] = None
+_NULL_SPAN = nullcontext()
+
+def trace_path(value: str) -> Path:
+    """Where a GIT_PAL_TRACE value sends the trace."""
+    if value.lower() in ("1", "true", "yes", "on"):
+        return Path(tempfile.gettempdir()) / f"git-pal-trace-{os.getpid()}.json"
+    return Path(value.replace("{pid}", str(os.getpid()))).resolve()
+
+def start(path: Path) -> Tracer:
+    """Start recording (also done at import when GIT_PAL_TRACE is set); the trace is written on exit."""
+    global _tracer
+    _tracer = Tracer(path)
+    atexit.register(_write_at_exit, _tracer)
+    return _tracer
+
+def stop() -> Optional[Tracer]:
+    """Stop recording and write the trace now; returns the tracer that was active."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        atexit.unregister(_write_at_exit)
+        tracer.write()
+    return tracer
+
+def _write_at_exit(tracer: Tracer) -> None:
+    try:
+        tracer.write()
+    except OSError as e:
+        print(f"[git-pal] could not write trace to {tracer.path}: {e}", file=sys.stderr)
+        return
+    if os.getpid() == tracer.pid:
+        print(f"[git-pal] trace written to {tracer.path}", file=sys.stderr)
+
+def enabled() -> bool:
+    return _tracer is not None
+
+def span(name: str, cat: str = "git-pal", **args: Any):
+    """Context manager timing its block as one span; a no-op unless tracing."""
+    tracer = _tracer
+    return _NULL_SPAN if tracer is None else tracer.span(name, cat, **args)
+
+def instant(name: str, cat: str = "git-pal", **args: Any) -> None:
+    tracer = _tracer
+    if tracer is not None:
+        tracer.instant(name, cat, **args)
+
+def traced(name: Optional[str] = None, cat: str = "git-pal") -> Callable[[F], F]:
+    """Decorator recording each call as a span; leaves the function untouched when tracing is off at import."""
+    def decorate(fn: F) -> F:
+        if _tracer is None:
+            return fn
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(label, cat):
+                return fn(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorate
+
+if os.environ.get(TRACE_ENV):
+    start(trace_path(os.environ[TRACE_ENV]))
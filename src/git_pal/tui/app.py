@@ -1,19 +1,24 @@
+from __future__ import annotations
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Optional, Sequence
 from textual.app import App, ComposeResult
 from textual.widgets import Header, Footer
 from textual.binding import Binding
 
-from git_pal.rebase.state import RebaseAction
+from git_pal import trace
+from git_pal.rebase.journal import EditJournal
+from git_pal.rebase.state import ActionTable, RebaseAction
 from git_pal.tui.screens.rebase import RebaseScreen
 from git_pal.tui.screens.modals import LicenseModal, ExitConfirmModal
-from git_pal.config import get_config_path
-from git_pal.licensing import verify_license, LicenseData, write_receipt
+from git_pal.tui.widgets import PerfPanel
+
+if TYPE_CHECKING:
+    from git_pal.licensing import LicenseData
 
 class TUIQuitRequest(Exception):
     """Signal a clean TUI quit."""
 
-class GitPalApp(App[Optional[List[RebaseAction]]]):
+class GitPalApp(App[Optional[ActionTable]]):
     CSS = """
     Screen { align: center middle; }
     """
@@ -21,21 +26,32 @@ class GitPalApp(App[Optional[List[RebaseAction]]]):
         Binding("q", "request_quit", "Quit"),
         Binding("s", "save", "Save"),
         Binding("e", "edit", "Edit"),
+        Binding("f12", "toggle_perf_panel", "Perf panel", show=False),
+        Binding("ctrl+t", "toggle_allocation_tracking", "Track allocations", show=False),
     ]
 
-    def __init__(self, initial_actions: List[RebaseAction], todo_file_path: Path):
+    def __init__(self, initial_actions: Sequence[RebaseAction], todo_file_path: Path,
+                 repo_path: Optional[Path] = None, journal: Optional[EditJournal] = None):
         super().__init__()
         self.initial_actions = initial_actions
         self.todo_file_path = todo_file_path
+        # Working tree git runs the sequence editor in; None disables commit enrichment.
+        self.repo_path = repo_path
+        # Autosave journal for edits made in this session (None: not journaled).
+        self.journal = journal
         self.license_data: Optional[LicenseData] = None
-        self.result: Optional[List[RebaseAction]] = None
+        self.result: Optional[ActionTable] = None
         self.features: list[str] = []
 
     def compose(self) -> ComposeResult:
         yield Header()
         yield Footer()
 
+    @trace.traced("GitPalApp.on_mount", "tui")
     def on_mount(self) -> None:
+        # Config/licensing pull in pydantic and the crypto stack; load them only once the app is up.
+        from git_pal.config import get_config_path
+        from git_pal.licensing import verify_license, write_receipt
         try:
             self.license_data = verify_license()
             self.features = list(self.license_data.features or [])
@@ -44,11 +60,13 @@ class GitPalApp(App[Optional[List[RebaseAction]]]):
                 write_receipt(getattr(self.license_data, "purchase_id", None), self.license_data.sub, cfg_dir)
             except Exception:
                 pass
-            self.push_screen(RebaseScreen(self.initial_actions, features=self.features), self._on_rebase_result)
+            self.push_screen(RebaseScreen(self.initial_actions, features=self.features,
+                                          repo_path=self.repo_path, journal=self.journal),
+                             self._on_rebase_result)
         except Exception as e:
             self.push_screen(LicenseModal(str(e)))
 
-    def _on_rebase_result(self, actions: Optional[List[RebaseAction]]) -> None:
+    def _on_rebase_result(self, actions: Optional[ActionTable]) -> None:
         self.result = actions
         self.exit(self.result)
 
@@ -59,6 +77,22 @@ class GitPalApp(App[Optional[List[RebaseAction]]]):
         if confirmed:
             self.exit(None)
 
+    def action_toggle_perf_panel(self) -> None:
+        panels = self.screen.query(PerfPanel)
+        if panels:
+            panels.remove()
+        else:
+            self.screen.mount(PerfPanel())
+
+    def action_toggle_allocation_tracking(self) -> None:
+        import tracemalloc
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self.notify("Allocation tracking off.")
+        else:
+            tracemalloc.start()
+            self.notify("Allocation tracking on: allocations from now on are counted (slower while on).")
+
     def action_save(self) -> None:
         # Delegated to RebaseScreen; kept for binding completeness.
         pass
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Tuple
 from textual.app import ComposeResult
 from textual.screen import ModalScreen
 from textual.widgets import Button, Static, Input, Label
@@ -63,7 +63,39 @@ class EditActionModal(ModalScreen[Optional[RebaseAction]]):
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "save":
             new_cmd = self.query_one("#input-command", Input).value
-            self.action.command = new_cmd
-            self.dismiss(self.action)
+            # A new action: the caller's row must stay untouched so the edit can be undone.
+            a = self.action
+            self.dismiss(RebaseAction(new_cmd, a.commit_hash, a.message, a.flags))
         else:
             self.dismiss(None)
+
+class BulkEditModal(ModalScreen[Optional[Tuple[str, str]]]):
+    """Asks for a row selector and an optional command; dismisses with (selector, command)."""
+    DEFAULT_CSS = """
+    BulkEditModal { align: center middle; }
+    #bulk-dialog { width: 80%; max-width: 100; height: auto; padding: 1 2; background: $surface; border: thick $background 80%; }
+    """
+    def __init__(self, selected: int):
+        super().__init__()
+        self.selected = selected
+    def compose(self) -> ComposeResult:
+        yield Vertical(
+            Label("Select Rows / Bulk Edit", id="title"),
+            Static("Rows: 120-900, cmd:pick, sha:abc12, /regex/ or subject text. "
+                   f"Leave empty to use the {self.selected} selected rows.", id="help"),
+            Input(placeholder="selector", id="input-selector"),
+            Input(placeholder="command (optional): pick, squash, fixup, drop, ...", id="input-command"),
+            Horizontal(Button("Apply", variant="success", id="apply"),
+                       Button("Cancel", id="cancel")),
+            id="bulk-dialog",
+        )
+    def on_input_submitted(self, _event: Input.Submitted) -> None:
+        self._submit()
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "apply":
+            self._submit()
+        else:
+            self.dismiss(None)
+    def _submit(self) -> None:
+        self.dismiss((self.query_one("#input-selector", Input).value.strip(),
+                      self.query_one("#input-command", Input).value.strip()))
@@ -1,84 +1,658 @@
-from typing import List, Optional
+import re
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+from textual import work
 from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.worker import get_current_worker
 from textual.screen import Screen
-from textual.widgets import Header, Footer, DataTable, Button
+from textual.widgets import Header, Footer, DataTable, Button, Input
 from textual.containers import Vertical, Horizontal
 
-from git_pal.rebase.state import RebaseAction
-from git_pal.tui.screens.modals import EditActionModal
+from git_pal import trace
+from git_pal.git import CommitInfo
+from git_pal.rebase.enrich import iter_enrichment
+from git_pal.rebase.history import (
+    Edit, EditHistory, MoveRow, ReplacePlan, SetCommand, SetRows, apply_edit, fields_of, set_command_edit,
+)
+from git_pal.rebase.journal import EditJournal
+from git_pal.rebase.parser import COMMAND_ALIASES
+from git_pal.rebase.selection import BULK_COMMANDS, select_rows
+from git_pal.rebase.overlap import FileOverlapIndex, reorder_overlaps
+from git_pal.rebase.search import PlanSearchIndex, SearchQuery, parse_query
+from git_pal.rebase.state import ActionTable, RebaseAction
+from git_pal.rebase.suggest import apply_suggestions, suggest
+from git_pal.tui.screens.modals import BulkEditModal, EditActionModal
+from git_pal.tui.widgets import VirtualTable, update_data_table_cells
 
-class RebaseScreen(Screen[List[RebaseAction]]):
-    BINDINGS = []
+# Plans with more visible rows than this use the virtualized table.
+VIRTUAL_ROW_THRESHOLD = 2000
 
-    def __init__(self, initial_actions: List[RebaseAction], features: list[str] | None = None):
+# (label, width in the virtual table); the label doubles as the DataTable column key.
+COLUMNS: Tuple[Tuple[str, int], ...] = (
+    ("Action", 10), ("SHA", 10), ("Message", 60),
+    ("Author", 16), ("Date", 10), ("Files", 5), ("+/-", 13), ("Note", 28),
+)
+# Columns filled in after mount get a fixed DataTable width up front.
+ENRICHED_COLUMNS = ("Author", "Date", "Files", "+/-", "Note")
+# Enrichment results are pushed to the table at most this often (seconds).
+ENRICH_FLUSH_INTERVAL = 0.05
+
+def _positions_in(view: array, rows: List[int]) -> List[int]:
+    """Positions in view (ascending action indices) of the rows (ascending) it contains."""
+    if not view:
+        return []
+    if view[-1] == len(view) - 1:
+        # Nothing hidden before the last shown row (git puts its comment block at the end).
+        return rows[:bisect_left(rows, len(view))]
+    positions, lo = [], 0
+    for row in rows:
+        lo = bisect_left(view, row, lo)
+        if lo == len(view):
+            break
+        if view[lo] == row:
+            positions.append(lo)
+    return positions
+
+class RebaseScreen(Screen[ActionTable]):
+    BINDINGS = [
+        Binding("ctrl+up", "move_up", "Move up"),
+        Binding("ctrl+down", "move_down", "Move down"),
+        Binding("a", "apply_suggestions", "Apply suggestions"),
+        Binding("ctrl+z", "undo", "Undo"),
+        Binding("ctrl+y", "redo", "Redo"),
+        Binding("space", "toggle_select", "Select", show=False),
+        Binding("shift+up", "extend_selection(-1)", "Extend selection", show=False),
+        Binding("shift+down", "extend_selection(1)", "Extend selection", show=False),
+        Binding("escape", "cancel", "Clear selection / search", show=False),
+        Binding("m", "bulk_edit", "Select / bulk edit"),
+        Binding("slash", "search", "Search"),
+        Binding("n", "search_next(1)", "Next match", show=False),
+        Binding("N", "search_next(-1)", "Previous match", show=False),
+        Binding("f", "toggle_filter", "Filter"),
+    ]
+
+    @trace.traced("RebaseScreen.__init__", "tui")
+    def __init__(self, initial_actions: Sequence[RebaseAction], features: list[str] | None = None,
+                 virtual: Optional[bool] = None, repo_path: Optional[Path] = None,
+                 journal: Optional[EditJournal] = None):
         super().__init__()
         self.initial_actions = initial_actions
-        self.actions: List[RebaseAction] = [RebaseAction(a.command, a.commit_hash, a.message) for a in initial_actions]
+        self.actions = ActionTable.from_actions(initial_actions)
         self.features = set(features or [])
+        self.repo_path = repo_path
+        self.journal = journal
+        self.history = EditHistory()
+        # Selected table rows (positions in self._view); cleared when rows move.
+        self.selected: Set[int] = set()
+        # Todo SHA -> commit metadata, filled in by the enrichment worker.
+        self.commit_info: Dict[str, CommitInfo] = {}
+        # Files touched per commit, built in the background; None until ready.
+        self.overlaps: Optional[FileOverlapIndex] = None
+        # SHA -> SHAs it was moved across that touch a common file, and the reverse mapping.
+        self._crossings: Dict[str, Set[str]] = {}
+        self._crossed_by: Dict[str, Set[str]] = {}
+        self._rank: Optional[Dict[str, int]] = None  # SHA -> original table row, built before the first move
+        self._moved: Set[str] = set()
+        # Pro: SHA -> suggestion note ("fixup onto <sha>"), and what the last Save press showed.
+        self.suggestions: Dict[str, str] = {}
+        self._suggestions_confirmed: Dict[str, str] = {}
+        # Search: index over the plan (built on first use), the current query and its
+        # matches as table rows (None when stale), and the query the table is filtered to.
+        self._search_index: Optional[PlanSearchIndex] = None
+        self.search_query: Optional[SearchQuery] = None
+        self._matches: Optional[List[int]] = None
+        self.filter: Optional[SearchQuery] = None
+        # Table row -> action index, ascending. Comments are never shown.
+        self._view = self._visible_rows()
+        self.virtual = len(self._view) > VIRTUAL_ROW_THRESHOLD if virtual is None else virtual
 
     def compose(self) -> ComposeResult:
-        yield Header(show_clock=False, name=f"git-pal Rebase Editor [{'PRO' if 'pro' in self.features else 'DEMO'}]")
-        yield Vertical(
-            DataTable(id="rebase-table", cursor_type="row"),
-            Horizontal(
-                Button("Save & Exit", variant="success", id="save"),
-                Button("Abort", variant="error", id="abort"),
-                id="button-bar",
-            ),
-            id="main-container",
-        )
-        yield Footer()
+        with trace.span("RebaseScreen.compose", "tui"):
+            yield Header(show_clock=False, name=f"git-pal Rebase Editor [{'PRO' if 'pro' in self.features else 'DEMO'}]")
+            if self.virtual:
+                table: Union[DataTable, VirtualTable] = VirtualTable(
+                    COLUMNS, self._row_cells, len(self._view), id="rebase-table")
+            else:
+                table = DataTable(id="rebase-table", cursor_type="row")
+            search = Input(placeholder="Search subject, or sha:<prefix> / cmd:<command>", id="search")
+            search.display = False
+            yield Vertical(
+                search,
+                table,
+                Horizontal(
+                    Button("Save & Exit", variant="success", id="save"),
+                    Button("Abort", variant="error", id="abort"),
+                    id="button-bar",
+                ),
+                id="main-container",
+            )
+            yield Footer()
 
+    @trace.traced("RebaseScreen.on_mount", "tui")
     def on_mount(self) -> None:
-        table = self.query_one(DataTable)
-        table.add_columns("Action", "SHA", "Message")
-        for i, a in enumerate(self.actions):
-            if a.command.startswith("#"):
-                continue
-            table.add_row(a.command, a.commit_hash, a.message, key=str(i))
+        table = self._table()
+        if isinstance(table, DataTable):
+            for label, width in COLUMNS:
+                table.add_column(label, width=width if label in ENRICHED_COLUMNS else None, key=label)
+            for pos in range(len(self._view)):
+                table.add_row(*self._row_cells(pos), key=str(pos))
         table.focus()
+        if "pro" in self.features:
+            self._suggest_rows(self.actions.copy())
+        if self.repo_path is not None:
+            self._enrich_rows(self.actions.copy())
+            self._index_touched_paths(self.actions.copy())
+        if trace.enabled():
+            self.call_after_refresh(trace.instant, "first frame", "tui")
+
+    def perf_stats(self) -> List[Tuple[str, str]]:
+        """Editor numbers for the perf panel."""
+        stats = [("rows", f"{len(self.actions):,}"), ("shown", f"{len(self._view):,}"),
+                 ("table", "virtual" if self.virtual else "DataTable")]
+        if self.selected:
+            stats.append(("selected", f"{len(self.selected):,}"))
+        if self.commit_info:
+            stats.append(("enriched", f"{len(self.commit_info):,}"))
+        if self._matches is not None:
+            stats.append(("matches", f"{len(self._matches):,}"))
+        return stats
+
+    def _table(self) -> Union[DataTable, VirtualTable]:
+        return self.query_one("#rebase-table")
+
+    def _row_cells(self, pos: int) -> Tuple[str, ...]:
+        idx = self._view[pos]
+        actions = self.actions
+        sha = actions.commit_hash(idx)
+        info = self.commit_info.get(sha) if sha else None
+        note = self._note(sha)
+        command = f"* {actions.command(idx)}" if pos in self.selected else actions.command(idx)
+        if info is None:
+            return (command, sha, actions.message(idx), "", "", "", "", note)
+        return (command, sha, actions.message(idx), info.author,
+                time.strftime("%Y-%m-%d", time.localtime(info.timestamp)),
+                str(info.files_changed), f"+{info.insertions} -{info.deletions}", note)
+
+    def reorder_warnings(self, sha: str) -> Set[str]:
+        """Commits that sha now sits on the other side of, compared to the original plan, and shares files with."""
+        return self._crossings.get(sha, set()) | self._crossed_by.get(sha, set())
+
+    def _note(self, sha: str) -> str:
+        if not sha:
+            return ""
+        notes = []
+        others = self.reorder_warnings(sha)
+        if others:
+            shown = sorted(other[:7] for other in others)
+            notes.append("! overlaps " + ", ".join(shown[:3]) + (f" +{len(shown) - 3}" if len(shown) > 3 else ""))
+        if sha in self.suggestions:
+            notes.append(self.suggestions[sha])
+        return "; ".join(notes)
+
+    def _suggestion_notes(self, actions: ActionTable) -> Dict[str, str]:
+        notes = {}
+        for s in suggest(actions, self.overlaps, self.commit_info):
+            command = f"{s.command} {s.flags}" if s.flags else s.command
+            notes[actions.commit_hash(s.index)] = f"-> {command} onto {actions.commit_hash(s.target)[:7]}"
+        return notes
+
+    def _compute_suggestions(self) -> None:
+        """Pro: refresh fold suggestions (autosquash markers, file overlap) now."""
+        if "pro" in self.features:
+            self._set_suggestions(self._suggestion_notes(self.actions))
+
+    @work(thread=True, exclusive=True, group="suggest")
+    def _suggest_rows(self, actions: ActionTable) -> None:
+        """Pro: compute fold suggestions off the UI thread; large plans take a few hundred ms."""
+        notes = self._suggestion_notes(actions)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self._set_suggestions, notes)
+
+    def _set_suggestions(self, notes: Dict[str, str]) -> None:
+        changed = {sha for sha in notes.keys() | self.suggestions.keys() if notes.get(sha) != self.suggestions.get(sha)}
+        self.suggestions = notes
+        if changed:
+            self._refresh_rows([pos for pos in range(len(self._view)) if self._sha_at(pos) in changed])
+
+    def action_apply_suggestions(self) -> None:
+        """Pro: reorder and relabel the plan as suggested, like `git rebase --autosquash`."""
+        if "pro" not in self.features:
+            return
+        found = suggest(self.actions, self.overlaps, self.commit_info)
+        if not found:
+            return
+        self._edit(ReplacePlan(self.actions, apply_suggestions(self.actions, found)))
+        self.notify(f"Applied {len(found)} suggestion{'s' if len(found) != 1 else ''}.")
+
+    @work(thread=True, exclusive=True, group="enrich")
+    def _enrich_rows(self, actions: ActionTable) -> None:
+        """Fetch author/date/diffstat for every row with a constant number of git processes."""
+        worker = get_current_worker()
+        shas = (actions.commit_hash(idx) for idx in range(len(actions)))
+        pending: Dict[str, CommitInfo] = {}
+        last_flush = time.monotonic()
+        try:
+            batches = iter_enrichment(shas, self.repo_path)
+            for batch in batches:
+                if worker.is_cancelled:
+                    batches.close()
+                    return
+                pending.update(batch)
+                if time.monotonic() - last_flush >= ENRICH_FLUSH_INTERVAL:
+                    self.app.call_from_thread(self._apply_commit_info, pending)
+                    pending, last_flush = {}, time.monotonic()
+        except RuntimeError:
+            return  # not a repository / git missing: rows simply stay unenriched
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self._apply_commit_info, pending, True)
+
+    def _apply_commit_info(self, batch: Dict[str, CommitInfo], done: bool = False) -> None:
+        self.commit_info.update(batch)
+        if done and "pro" in self.features and self.overlaps is not None:
+            self._suggest_rows(self.actions.copy())  # file-overlap suggestions wait for the diffstats
+        table = self._table()
+        if isinstance(table, VirtualTable):
+            table.refresh_rows(table.visible_rows())
+            return
+        actions = self.actions
+        self._refresh_rows([pos for pos, idx in enumerate(self._view) if actions.commit_hash(idx) in batch])
+
+    @work(thread=True, exclusive=True, group="overlap")
+    def _index_touched_paths(self, actions: ActionTable) -> None:
+        """Build the per-commit file index used to warn about risky reorders."""
+        worker = get_current_worker()
+        try:
+            index = FileOverlapIndex.build((actions.commit_hash(idx) for idx in range(len(actions))), self.repo_path)
+        except RuntimeError:
+            return
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self._apply_overlap_index, index)
+
+    def _apply_overlap_index(self, index: FileOverlapIndex) -> None:
+        self.overlaps = index
+        if "pro" in self.features:
+            self._suggest_rows(self.actions.copy())
+        if self.filter is None:
+            self._refresh_reorder_warnings()
+
+    def _refresh_reorder_warnings(self) -> None:
+        # Positions must be those of the unfiltered table, which the original ranks refer to.
+        if not self._moved or self.overlaps is None:
+            return
+        changed: Set[int] = set()
+        for pos in range(len(self._view)):
+            if self._sha_at(pos) in self._moved:
+                changed |= self._update_reorder_warnings(pos)
+        self._refresh_rows(sorted(changed))
+
+    def _sha_at(self, pos: int) -> str:
+        return self.actions.commit_hash(self._view[pos])
+
+    def _update_reorder_warnings(self, pos: int) -> Set[int]:
+        """Recompute what the commit at pos was moved across; returns the table rows whose note changed."""
+        sha = self._sha_at(pos)
+        if not sha or self.overlaps is None or self._rank is None:
+            return set()
+        before = self._crossings.pop(sha, set())
+        for other in before:
+            self._crossed_by[other].discard(sha)
+            if not self._crossed_by[other]:
+                del self._crossed_by[other]
+        after = {self._sha_at(q) for q in reorder_overlaps(self.overlaps, self._sha_at, self._rank, pos)}
+        if after:
+            self._crossings[sha] = after
+            for other in after:
+                self._crossed_by.setdefault(other, set()).add(sha)
+        if before == after:
+            return set()
+        # Old and new partners lie between the original row and the current row (give or take the last step).
+        touched = before | after | {sha}
+        r = self._rank.get(sha, pos)
+        lo, hi = max(min(r, pos) - 1, 0), min(max(r, pos) + 1, len(self._view) - 1)
+        return {q for q in range(lo, hi + 1) if self._sha_at(q) in touched}
+
+    def action_move_up(self) -> None:
+        self._move_row(-1)
+
+    def action_move_down(self) -> None:
+        self._move_row(1)
+
+    def _move_row(self, delta: int) -> None:
+        if self.filter is not None:
+            self.notify("Clear the filter (f) to reorder rows.", severity="warning")
+            return
+        pos = self._cursor_position()
+        if pos is None or not 0 <= pos + delta < len(self._view):
+            return
+        top = min(pos, pos + delta)
+        a, b = self._view[top], self._view[top + 1]
+        # Comment rows between the two stay put relative to the plan; only the pair swaps.
+        self._edit(MoveRow(a, b) if delta > 0 else MoveRow(b, a))
+
+    def action_undo(self) -> None:
+        edit = self.history.undo()
+        if edit is not None:
+            self._edit(edit, record=False)
+
+    def action_redo(self) -> None:
+        edit = self.history.redo()
+        if edit is not None:
+            self._edit(edit, record=False)
+
+    def _edit(self, edit: Edit, record: bool = True) -> None:
+        """
+        The single entry point for plan mutations: applies the edit, records it for undo
+        and in the autosave journal, and repaints only the rows it touched.
+        """
+        if isinstance(edit, MoveRow):
+            self._ensure_rank()  # before the first move changes the order it records
+        self.actions = apply_edit(self.actions, edit)
+        if record:
+            self.history.record(edit)
+        self._journal_edit(edit)
+        self._update_search_index(edit)
+        if isinstance(edit, (MoveRow, ReplacePlan)):
+            if self.selected:
+                self._set_selection(set())
+            if self.filter is not None:
+                # Reorders (e.g. an undone move) apply to the whole plan, so show all of it.
+                self._set_filter(None)
+        if isinstance(edit, ReplacePlan):
+            # A new plan is the new baseline for reorder warnings.
+            self.workers.cancel_group(self, "suggest")  # results for the old plan are stale
+            self._crossings, self._crossed_by, self._rank, self._moved = {}, {}, None, set()
+            self.suggestions = {}
+            self._reload_rows()
+            if "pro" in self.features:
+                self._suggest_rows(self.actions.copy())
+            return
+        if isinstance(edit, MoveRow):
+            changed = self._patch_view(min(edit.src, edit.dst), max(edit.src, edit.dst))
+            for pos in sorted(changed):
+                self._moved.add(self._sha_at(pos))
+                changed |= self._update_reorder_warnings(pos)
+            cursor = bisect_left(self._view, edit.dst)
+        else:
+            indices = edit.indices if isinstance(edit, SetCommand) else [i for i, _b, _a in edit.rows]
+            changed = self._positions_of(indices)
+            cursor = min(changed) if changed else None
+            if isinstance(edit, SetCommand):
+                self._refresh_rows(sorted(changed), columns=("Action",))
+                return
+        self._refresh_rows(sorted(changed))
+        if cursor is not None and cursor < len(self._view):
+            self._table().move_cursor(row=cursor)
+
+    def _journal_edit(self, edit: Edit) -> None:
+        journal = self.journal
+        if journal is None:
+            return
+        if isinstance(edit, SetRows):
+            for i, _before, after in edit.rows:
+                journal.record_set(i, RebaseAction(*after))
+        elif isinstance(edit, SetCommand):
+            journal.record_commands(edit.indices, edit.after)
+        elif isinstance(edit, MoveRow):
+            journal.record_move(edit.src, edit.dst)
+        else:
+            journal.record_plan(edit.after)
+
+    def _update_search_index(self, edit: Edit) -> None:
+        self._matches = None
+        index = self._search_index
+        if index is None:
+            return
+        if isinstance(edit, MoveRow):
+            index.move(edit.src, edit.dst)
+        elif isinstance(edit, SetRows):
+            for i, before, after in edit.rows:
+                if before[1:3] != after[1:3]:
+                    index.touch(i)
+        elif isinstance(edit, ReplacePlan):
+            self._search_index = None  # rebuilt on the next search
+
+    def _positions_of(self, indices: Iterable[int]) -> Set[int]:
+        """Table rows showing the given action indices (the view is sorted, so this is a bisect per index)."""
+        view, positions = self._view, set()
+        for idx in indices:
+            pos = bisect_left(view, idx)
+            if pos < len(view) and view[pos] == idx:
+                positions.add(pos)
+        return positions
+
+    def _patch_view(self, lo: int, hi: int) -> Set[int]:
+        """Re-derive the view for action indices lo..hi after rows moved within that span."""
+        start, stop = bisect_left(self._view, lo), bisect_right(self._view, hi)
+        actions = self.actions
+        self._view[start:stop] = array("I", [i for i in range(lo, hi + 1) if not actions.command(i).startswith("#")])
+        return set(range(start, stop))
+
+    def _ensure_rank(self) -> None:
+        # Ranks are rows of the unfiltered table, whatever the view shows right now.
+        if self._rank is None:
+            self._rank = {}
+            rows = self.actions.indices_where(lambda command: not command.startswith("#"))
+            for p, sha in enumerate(self.actions.commit_hashes(rows)):
+                self._rank.setdefault(sha, p)
+
+    def _visible_rows(self) -> array:
+        not_comment = self.actions.indices_where(lambda command: not command.startswith("#"))
+        if self.filter is None:
+            return not_comment
+        rows = self._search().search(self.actions, self.filter)
+        return array("I", [not_comment[pos] for pos in _positions_in(not_comment, rows)])
+
+    def _reload_rows(self) -> None:
+        """Rebuild the view after rows were added, removed or reordered wholesale, or the filter changed."""
+        self._view = self._visible_rows()
+        table = self._table()
+        if isinstance(table, VirtualTable):
+            table.set_row_count(len(self._view))
+            table.refresh_all()
+            return
+        table.clear()
+        for pos in range(len(self._view)):
+            table.add_row(*self._row_cells(pos), key=str(pos))
+
+    def _refresh_rows(self, positions: Iterable[int], columns: Optional[Sequence[str]] = None) -> None:
+        """
+        Repaint table rows from self.actions; the single funnel for row updates in both table modes.
+        columns limits a DataTable update to the cells that can have changed; either way the
+        table is refreshed once for the whole batch.
+        """
+        table = self._table()
+        if isinstance(table, VirtualTable):
+            table.refresh_rows(positions)
+            return
+        wanted = [(i, label) for i, (label, _width) in enumerate(COLUMNS) if columns is None or label in columns]
+        update_data_table_cells(table, ((str(pos), label, cells[i])
+                                        for pos in positions
+                                        for cells in (self._row_cells(pos),)
+                                        for i, label in wanted))
+
+    # ---- selection / bulk edits ------------------------------------------------
+    def _set_selection(self, rows: Set[int]) -> None:
+        changed = self.selected ^ rows
+        self.selected = rows
+        self._refresh_rows(sorted(changed), columns=("Action",))
+
+    def action_toggle_select(self) -> None:
+        pos = self._cursor_position()
+        if pos is not None:
+            self._set_selection(self.selected ^ {pos})
+
+    def action_extend_selection(self, delta: int) -> None:
+        pos = self._cursor_position()
+        if pos is None or not 0 <= pos + delta < len(self._view):
+            return
+        self._set_selection(self.selected | {pos, pos + delta})
+        self._table().move_cursor(row=pos + delta)
+
+    def action_clear_selection(self) -> None:
+        if self.selected:
+            self._set_selection(set())
+
+    def action_cancel(self) -> None:
+        """Escape: clear the selection first, then close the search and drop its filter."""
+        if self.selected:
+            self._set_selection(set())
+        elif self.query_one("#search", Input).display or self.filter is not None:
+            self._close_search()
+
+    def action_bulk_edit(self) -> None:
+        self.app.push_screen(BulkEditModal(len(self.selected)), self._on_bulk_edit)
+
+    def _on_bulk_edit(self, result: Optional[Tuple[str, str]]) -> None:
+        if not result:
+            return
+        selector, command = result
+        if selector:
+            try:
+                rows = select_rows(self.actions, self._view, selector)
+            except re.error as e:
+                self.notify(f"Invalid pattern: {e}", severity="error")
+                return
+        else:
+            cursor = self._cursor_position()
+            rows = sorted(self.selected) or ([cursor] if cursor is not None else [])
+        if not command:
+            self._set_selection(set(rows))
+            self.notify(f"{len(rows)} rows selected.")
+            return
+        name = COMMAND_ALIASES.get(command, command)
+        if name not in BULK_COMMANDS:
+            self.notify(f"Cannot bulk-set command '{command}'.", severity="error")
+            return
+        actions, view = self.actions, self._view
+        indices = [view[pos] for pos in rows if actions.command(view[pos]) in BULK_COMMANDS
+                   and actions.command(view[pos]) != name]
+        if indices:
+            self._edit(set_command_edit(actions, indices, name))
+        self.notify(f"{len(indices)} rows set to {name}.")
+
+    # ---- search / filter ---------------------------------------------------
+    def _search(self) -> PlanSearchIndex:
+        if self._search_index is None:
+            self._search_index = PlanSearchIndex(self.actions)
+        return self._search_index
+
+    def action_search(self) -> None:
+        search = self.query_one("#search", Input)
+        search.display = True
+        search.focus()
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        if event.input.id != "search":
+            return
+        self.search_query = parse_query(event.value)
+        self._matches = None
+        matches = self._search_matches()
+        event.input.border_title = f"{len(matches)} matches" if self.search_query is not None else None
+        self._jump_to_match(0)
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        if event.input.id == "search":
+            self._table().focus()
+
+    def _search_matches(self) -> List[int]:
+        """Table rows matching the search query, recomputed lazily after edits."""
+        if self._matches is None:
+            if self.search_query is None:
+                self._matches = []
+            else:
+                rows = self._search().search(self.actions, self.search_query)
+                self._matches = _positions_in(self._view, rows)
+        return self._matches
+
+    def _jump_to_match(self, step: int) -> None:
+        """Move the cursor to the first match at (step 0), after (1) or before (-1) it, wrapping around."""
+        matches = self._search_matches()
+        pos = self._cursor_position()
+        if not matches or pos is None:
+            return
+        if step < 0:
+            i = bisect_left(matches, pos) - 1
+        else:
+            i = bisect_left(matches, pos + step)
+        self._table().move_cursor(row=matches[i % len(matches)])
+
+    def action_search_next(self, step: int) -> None:
+        self._jump_to_match(step)
+
+    def action_toggle_filter(self) -> None:
+        """Show only the rows matching the search query, or everything again."""
+        if self.filter is not None:
+            self._set_filter(None)
+        elif self.search_query is not None:
+            self._set_filter(self.search_query)
+
+    def _set_filter(self, query: Optional[SearchQuery]) -> None:
+        pos = self._cursor_position()
+        current = self._view[pos] if pos is not None and pos < len(self._view) else 0
+        if self.selected:
+            self.selected = set()  # positions refer to the old view
+        self.filter = query
+        self._matches = None
+        self._reload_rows()
+        if query is None:
+            self._refresh_reorder_warnings()
+        if self._view:
+            self._table().move_cursor(row=min(bisect_left(self._view, current), len(self._view) - 1))
+
+    def _close_search(self) -> None:
+        search = self.query_one("#search", Input)
+        search.display = False
+        search.value = ""
+        self.search_query, self._matches = None, None
+        if self.filter is not None:
+            self._set_filter(None)
+        self._table().focus()
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "save":
             if "pro" in self.features:
-                # (future hook) compute smart suggestions here
-                pass
-            # Reconstruct final_actions preserving comment positions from initial_actions
-            # and using edited actions from self.actions
-            final_actions = []
-            for i, initial_action in enumerate(self.initial_actions):
-                if initial_action.command.startswith("#"):
-                    # Preserve original comment at its position
-                    final_actions.append(initial_action)
-                else:
-                    # Use edited action from self.actions at the same index
-                    final_actions.append(self.actions[i])
-            self.dismiss(final_actions)
+                self._compute_suggestions()
+                if self.suggestions and self.suggestions != self._suggestions_confirmed:
+                    # New suggestions since the last press: show them once before saving.
+                    self._suggestions_confirmed = dict(self.suggestions)
+                    self.notify(f"{len(self.suggestions)} fold suggestions are shown in the Note column. "
+                                "Press 'a' to apply them, or Save again to keep the plan as it is.")
+                    return
+            # Comments are never shown or edited, so they are still in place in self.actions.
+            self.dismiss(self.actions)
         elif event.button.id == "abort":
             self.dismiss(None)
 
-    def on_data_table_cell_selected(self, _event: DataTable.CellSelected) -> None:
+    def on_data_table_row_selected(self, _event: DataTable.RowSelected) -> None:
+        # The table uses a row cursor, so Enter selects rows, not cells.
+        self.action_edit_row()
+
+    def on_virtual_table_row_selected(self, _event: VirtualTable.RowSelected) -> None:
         self.action_edit_row()
 
-    @staticmethod
-    def _get_row_index(table: DataTable) -> Optional[int]:
-        key = table.get_row_key(table.cursor_row)
-        return int(key) if key is not None else None
+    def _cursor_position(self) -> Optional[int]:
+        table = self._table()
+        if table.row_count == 0:
+            return None
+        return table.cursor_row
 
     def action_edit_row(self) -> None:
-        table = self.query_one(DataTable)
-        idx = self._get_row_index(table)
-        if idx is None:
+        pos = self._cursor_position()
+        if pos is None:
             return
+        idx = self._view[pos]
         self.app.push_screen(EditActionModal(action=self.actions[idx]),
-                             lambda new_action: self._on_edit_complete(idx, new_action))
+                             lambda new_action: self._on_edit_complete(pos, new_action))
 
-    def _on_edit_complete(self, idx: int, new_action: Optional[RebaseAction]) -> None:
+    def _on_edit_complete(self, pos: int, new_action: Optional[RebaseAction]) -> None:
         if not new_action:
             return
-        self.actions[idx] = new_action
-        table = self.query_one(DataTable)
-        row_key = str(idx)
-        table.update_cell(row_key, column_key="Action", value=new_action.command)
-        table.update_cell(row_key, column_key="SHA", value=new_action.commit_hash)
-        table.update_cell(row_key, column_key="Message", value=new_action.message)
+        idx = self._view[pos]
+        before = fields_of(self.actions, idx)
+        after = (new_action.command, new_action.commit_hash, new_action.message, new_action.flags)
+        if after != before:
+            self._edit(SetRows(((idx, before, after),)))
@@ -0,0 +1,264 @@
+from __future__ import annotations
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from rich.cells import set_cell_size
+from rich.segment import Segment
+from textual.binding import Binding
+from textual.geometry import Size
+from textual.message import Message
+from textual.reactive import reactive
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widgets import DataTable, Static
+from textual import events, work
+from textual.worker import get_current_worker
+
+from git_pal.metrics import METRICS, report_lines, top_allocations
+
+RowProvider = Callable[[int], Sequence[str]]
+
+class VirtualTable(ScrollView, can_focus=True):
+    """
+    Line-API table that never holds more than the visible window (plus OVERSCAN rows)
+    of cell data. Rows are fetched from get_row(row) on demand, so mount and scroll
+    cost do not depend on the row count.
+    """
+
+    DEFAULT_CSS = """
+    VirtualTable { height: 1fr; }
+    VirtualTable > .virtual-table--header { text-style: bold; background: $panel; }
+    VirtualTable > .virtual-table--cursor { background: $accent; color: $text; }
+    """
+    COMPONENT_CLASSES = {"virtual-table--header", "virtual-table--cursor"}
+    BINDINGS = [
+        Binding("up", "cursor_up", "Up", show=False),
+        Binding("down", "cursor_down", "Down", show=False),
+        Binding("pageup", "page_up", "Page up", show=False),
+        Binding("pagedown", "page_down", "Page down", show=False),
+        Binding("home", "cursor_home", "Top", show=False),
+        Binding("end", "cursor_end", "Bottom", show=False),
+        Binding("enter", "select_cursor", "Select", show=False),
+    ]
+    OVERSCAN = 16
+
+    cursor_row: reactive[int] = reactive(0, always_update=True)
+
+    class RowSelected(Message):
+        def __init__(self, table: "VirtualTable", row: int):
+            super().__init__()
+            self.table = table
+            self.row = row
+
+        @property
+        def control(self) -> "VirtualTable":
+            return self.table
+
+    def __init__(self, columns: Sequence[Tuple[str, int]], get_row: RowProvider, row_count: int = 0,
+                 *, id: Optional[str] = None):
+        super().__init__(id=id)
+        self.columns: List[Tuple[str, int]] = list(columns)
+        self._get_row = get_row
+        self._row_count = row_count
+        self._cache: Dict[int, Sequence[str]] = {}
+        self._cache_stats = METRICS.cache("table rows")
+        self._update_virtual_size()
+
+    # ---- data --------------------------------------------------------------
+    @property
+    def row_count(self) -> int:
+        return self._row_count
+
+    def set_row_count(self, row_count: int) -> None:
+        """Point the table at a new set of rows (e.g. after filtering or reordering)."""
+        self._row_count = row_count
+        self._cache.clear()
+        self._update_virtual_size()
+        if self.cursor_row >= row_count:
+            self.cursor_row = max(row_count - 1, 0)
+        self.refresh()
+
+    def refresh_rows(self, rows: Iterable[int]) -> None:
+        """Drop cached cells for rows and repaint the ones currently on screen."""
+        top, height = self._body_top(), self._body_height()
+        for row in rows:
+            self._cache.pop(row, None)
+            if top <= row < top + height:
+                self.refresh_line(row + 1)
+
+    def refresh_all(self) -> None:
+        self._cache.clear()
+        self.refresh()
+
+    def visible_rows(self) -> range:
+        top = self._body_top()
+        return range(top, min(top + self._body_height(), self._row_count))
+
+    # ---- rendering ---------------------------------------------------------
+    def render_line(self, y: int) -> Strip:
+        scroll_x, _ = self.scroll_offset
+        width = self.size.width
+        if y == 0:
+            cells: Sequence[str] = [label for label, _w in self.columns]
+            style = self.get_component_rich_style("virtual-table--header")
+        else:
+            row = self._body_top() + y - 1
+            if row >= self._row_count:
+                return Strip.blank(width, self.rich_style)
+            cells = self._row(row)
+            style = (self.get_component_rich_style("virtual-table--cursor")
+                     if row == self.cursor_row else self.rich_style)
+        text = "".join(set_cell_size(cell, w) + " " for cell, (_label, w) in zip(cells, self.columns))
+        strip = Strip([Segment(text, style)])
+        return strip.crop(scroll_x, scroll_x + width).extend_cell_length(width, style)
+
+    def _row(self, row: int) -> Sequence[str]:
+        cells = self._cache.get(row)
+        if cells is None:
+            self._load_window()
+            cells = self._cache.get(row)
+            if cells is None:
+                self._cache_stats.misses += 1
+                cells = self._cache[row] = self._get_row(row)
+        else:
+            self._cache_stats.hits += 1
+        return cells
+
+    def _load_window(self) -> None:
+        top = self._body_top()
+        start = max(top - self.OVERSCAN, 0)
+        stop = min(top + self._body_height() + self.OVERSCAN, self._row_count)
+        cache = self._cache
+        for row in [r for r in cache if not start <= r < stop]:
+            del cache[row]
+        for row in range(start, stop):
+            if row not in cache:
+                self._cache_stats.misses += 1
+                cache[row] = self._get_row(row)
+
+    # ---- geometry / cursor -------------------------------------------------
+    def _body_top(self) -> int:
+        return round(self.scroll_offset.y)
+
+    def _body_height(self) -> int:
+        return max(self.size.height - 1, 1)
+
+    def _update_virtual_size(self) -> None:
+        width = sum(w + 1 for _label, w in self.columns)
+        self.virtual_size = Size(width, self._row_count + 1)
+
+    def watch_cursor_row(self, old: int, new: int) -> None:
+        if self._row_count and not 0 <= new < self._row_count:
+            self.cursor_row = min(max(new, 0), self._row_count - 1)
+            return
+        top, height = self._body_top(), self._body_height()
+        if new < top:
+            self.scroll_to(y=new, animate=False, immediate=True)
+        elif new >= top + height:
+            self.scroll_to(y=new - height + 1, animate=False, immediate=True)
+        else:
+            self.refresh_line(old + 1)
+            self.refresh_line(new + 1)
+
+    def move_cursor(self, row: int) -> None:
+        self.cursor_row = row
+
+    def action_cursor_up(self) -> None:
+        self.cursor_row = max(self.cursor_row - 1, 0)
+
+    def action_cursor_down(self) -> None:
+        self.cursor_row = min(self.cursor_row + 1, max(self._row_count - 1, 0))
+
+    def action_page_up(self) -> None:
+        self.cursor_row = max(self.cursor_row - self._body_height(), 0)
+
+    def action_page_down(self) -> None:
+        self.cursor_row = min(self.cursor_row + self._body_height(), max(self._row_count - 1, 0))
+
+    def action_cursor_home(self) -> None:
+        self.cursor_row = 0
+
+    def action_cursor_end(self) -> None:
+        self.cursor_row = max(self._row_count - 1, 0)
+
+    def action_select_cursor(self) -> None:
+        if self._row_count:
+            self.post_message(self.RowSelected(self, self.cursor_row))
+
+    def on_click(self, event: events.Click) -> None:
+        offset = event.get_content_offset(self)
+        if offset is None or offset.y == 0:
+            return
+        row = self._body_top() + offset.y - 1
+        if row >= self._row_count:
+            return
+        if row == self.cursor_row:
+            self.post_message(self.RowSelected(self, row))
+        else:
+            self.cursor_row = row
+
+    def on_resize(self, _event: events.Resize) -> None:
+        self._cache.clear()
+
+class PerfPanel(Static):
+    """
+    Live performance numbers for the current session (F12 in the app). It redraws
+    only itself, a few times a second; allocation tracking (tracemalloc) is a
+    separate toggle because it slows every allocation while it runs. While it is
+    open it samples frame latency: how long a callback queued with call_after_refresh
+    waits for the screen to work through pending messages and repaint.
+    """
+
+    DEFAULT_CSS = """
+    PerfPanel { dock: right; width: 46; height: 100%; padding: 0 1; background: $panel; }
+    """
+    REFRESH_INTERVAL = 0.5
+    # Seconds between tracemalloc snapshots (taking one walks every live allocation).
+    SNAPSHOT_INTERVAL = 3.0
+    FRAME_SAMPLE_INTERVAL = 0.1
+
+    def __init__(self, *, id: Optional[str] = "perf-panel"):
+        super().__init__(markup=False, id=id)
+        self._allocations: List[Tuple[str, int]] = []
+        self._snapshot_at = float("-inf")
+
+    def on_mount(self) -> None:
+        self.refresh_stats()
+        self.set_interval(self.REFRESH_INTERVAL, self.refresh_stats)
+        self._sample_frame()
+        self.set_interval(self.FRAME_SAMPLE_INTERVAL, self._sample_frame)
+
+    def _sample_frame(self) -> None:
+        self.call_after_refresh(self._frame_painted, time.perf_counter())
+
+    def _frame_painted(self, start: float) -> None:
+        METRICS.frame(time.perf_counter() - start)
+
+    def refresh_stats(self) -> None:
+        import tracemalloc
+        tracing = tracemalloc.is_tracing()
+        if tracing and time.monotonic() - self._snapshot_at >= self.SNAPSHOT_INTERVAL:
+            self._snapshot_at = time.monotonic()
+            self._snapshot_allocations()
+        perf_stats = getattr(self.screen, "perf_stats", None)
+        rows = perf_stats() if callable(perf_stats) else ()
+        self.update("\n".join(report_lines(METRICS, rows, self._allocations if tracing else None)))
+
+    @work(thread=True, exclusive=True, group="perf-allocations")
+    def _snapshot_allocations(self) -> None:
+        try:
+            allocations = top_allocations()
+        except RuntimeError:  # tracing was switched off meanwhile
+            return
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(setattr, self, "_allocations", allocations)
+
+def update_data_table_cells(table: DataTable, cells: Iterable[Tuple[str, str, object]]) -> None:
+    """
+    Write many (row key, column key, value) cells as one screen update. Column widths are
+    kept (update_width=False), so a cell costs ~13 us; plans big enough for that to matter
+    use VirtualTable instead. Raises CellDoesNotExist for an unknown row or column.
+    """
+    with table.app.batch_update():
+        for row_key, column_key, value in cells:
+            table.update_cell(row_key, column_key, value, update_width=False)
@@ -78,3 +78,319 @@ async def test_tui_edit_and_save(app: GitPalApp, tmp_path):
     content = app.todo_file_path.read_text(encoding="utf-8")
     assert "pick a1b2c3d commit 1" in content
     assert "squash e4f5a6b commit 2" in content
+
+async def test_tui_enter_opens_edit_modal(app: GitPalApp):
+    """Enter on a row of the regular table opens the edit modal, like on the virtual table."""
+    from git_pal.tui.screens.modals import EditActionModal
+
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        await pilot.press("down", "enter")
+        await pilot.pause()
+        assert isinstance(app.screen, EditActionModal)
+        assert app.screen.action.commit_hash == "e4f5a6b"
+
+async def test_tui_virtual_table_edit(app: GitPalApp, monkeypatch):
+    """Large plans use the virtualized table; editing goes through the same modal."""
+    from textual.widgets import Input
+    from git_pal.rebase.state import RebaseAction
+    from git_pal.tui.screens import rebase as rebase_mod
+    from git_pal.tui.screens.modals import EditActionModal
+    from git_pal.tui.widgets import VirtualTable
+
+    monkeypatch.setattr(rebase_mod, "VIRTUAL_ROW_THRESHOLD", 100)
+    app.initial_actions = [RebaseAction("pick", f"{i:07x}", f"commit {i}") for i in range(5000)]
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        screen = app.screen
+        table = screen.query_one("#rebase-table", VirtualTable)
+        assert table.row_count == 5000
+        # Only the window around the viewport has been materialized.
+        assert len(table._cache) < 200
+
+        await pilot.press("end")
+        await pilot.pause()
+        assert table.cursor_row == 4999
+        await pilot.press("up", "enter")
+        await pilot.pause()
+        assert isinstance(app.screen, EditActionModal)
+        app.screen.query_one("#input-command", Input).value = "drop"
+        await pilot.click("#save")
+        await pilot.pause()
+        assert screen.actions.command(4998) == "drop"
+        assert table._row(4998)[0] == "drop"
+
+        await pilot.click("#save")
+        await pilot.pause()
+
+    assert app.result is not None and len(app.result) == 5000
+    assert app.result[4998].command == "drop"
+
+async def test_tui_enriches_rows_from_repo(app: GitPalApp, tmp_path):
+    """Author/date/diffstat columns are filled in by the background enrichment worker."""
+    import subprocess
+    from git_pal.rebase.state import RebaseAction
+
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout.strip()
+    git("init", "-q")
+    git("config", "user.email", "t@example.com")
+    git("config", "user.name", "Tester")
+    (repo / "f.txt").write_text("a\nb\n", encoding="utf-8")
+    git("add", "f.txt")
+    git("commit", "-q", "-m", "add f")
+    sha = git("rev-parse", "--short", "HEAD")
+
+    app.initial_actions = [RebaseAction("pick", sha, "add f"), RebaseAction("pick", "1234567", "unknown")]
+    app.repo_path = repo
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        screen = app.screen
+        await screen.workers.wait_for_complete()
+        await pilot.pause()
+        table = screen.query_one("#rebase-table", DataTable)
+        assert table.get_cell("0", "Author") == "Tester"
+        assert table.get_cell("0", "+/-") == "+2 -0"
+        assert table.get_cell("1", "Author") == ""
+
+def _repo_with_commits(path, files):
+    """A repository with one commit per (file name, content); returns it and the short SHAs."""
+    import subprocess
+    path.mkdir()
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=path, check=True, capture_output=True, text=True).stdout.strip()
+    git("init", "-q")
+    git("config", "user.email", "t@example.com")
+    git("config", "user.name", "Tester")
+    shas = []
+    for name, content in files:
+        (path / name).write_text(content, encoding="utf-8")
+        git("add", name)
+        git("commit", "-q", "-m", f"touch {name}")
+        shas.append(git("rev-parse", "--short", "HEAD"))
+    return path, shas
+
+async def test_tui_warns_when_reorder_crosses_shared_files(app: GitPalApp, tmp_path):
+    """Moving a commit past one that touches the same file annotates both rows."""
+    from git_pal.rebase.state import RebaseAction
+
+    # The last commit is too big to be proposed as a fixup of the first.
+    repo, shas = _repo_with_commits(tmp_path / "repo", (("f.txt", "1\n"), ("g.txt", "1\n"), ("f.txt", "x\n" * 30)))
+    app.initial_actions = [RebaseAction("pick", sha, f"c{i}") for i, sha in enumerate(shas)]
+    app.repo_path = repo
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        screen = app.screen
+        await screen.workers.wait_for_complete()
+        await pilot.pause()
+        table = screen.query_one("#rebase-table", DataTable)
+        table.move_cursor(row=2)
+        await pilot.press("ctrl+up")
+        await pilot.pause()
+        assert table.get_cell("1", "SHA") == shas[2] and table.get_cell("1", "Note") == ""
+        await pilot.press("ctrl+up")
+        await pilot.pause()
+        assert [table.get_cell(str(i), "SHA") for i in range(3)] == [shas[2], shas[0], shas[1]]
+        assert table.get_cell("0", "Note") == f"! overlaps {shas[0]}"
+        assert table.get_cell("1", "Note") == f"! overlaps {shas[2]}"
+        assert table.cursor_row == 0
+        await pilot.press("ctrl+down")
+        await pilot.pause()
+        assert table.get_cell("0", "Note") == table.get_cell("1", "Note") == ""
+        await pilot.click("#save")
+        await pilot.pause()
+    assert [a.commit_hash for a in app.result] == [shas[0], shas[2], shas[1]]
+
+async def test_tui_warns_on_the_first_move_across_shared_files(app: GitPalApp, tmp_path):
+    """The original order is captured before the first move, so that move is already checked."""
+    from git_pal.rebase.state import RebaseAction
+
+    repo, shas = _repo_with_commits(tmp_path / "repo", (("f.txt", "1\n"), ("f.txt", "x\n" * 30)))
+    app.initial_actions = [RebaseAction("pick", sha, f"c{i}") for i, sha in enumerate(shas)]
+    app.repo_path = repo
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        screen = app.screen
+        await screen.workers.wait_for_complete()
+        await pilot.pause()
+        table = screen.query_one("#rebase-table", DataTable)
+        table.move_cursor(row=1)
+        await pilot.press("ctrl+up")
+        await pilot.pause()
+        assert [table.get_cell(str(i), "SHA") for i in range(2)] == [shas[1], shas[0]]
+        assert table.get_cell("0", "Note") == f"! overlaps {shas[0]}"
+        assert table.get_cell("1", "Note") == f"! overlaps {shas[1]}"
+
+async def test_tui_pro_suggestions_before_save(app: GitPalApp):
+    """Pro plans show autosquash suggestions; the first Save shows them, 'a' applies them."""
+    from git_pal.rebase.state import RebaseAction
+
+    app.initial_actions = [
+        RebaseAction("pick", "a1b2c3d", "Add parser"),
+        RebaseAction("pick", "e4f5a6b", "Add writer"),
+        RebaseAction("pick", "c7d8e9f", "fixup! Add parser"),
+    ]
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        screen = app.screen
+        await screen.workers.wait_for_complete()
+        await pilot.pause()
+        table = screen.query_one("#rebase-table", DataTable)
+        assert table.get_cell("2", "Note") == "-> fixup onto a1b2c3d"
+        await pilot.click("#save")
+        await pilot.pause()
+        assert app.screen is screen  # held once to show the suggestions
+        await pilot.press("a")
+        await screen.workers.wait_for_complete()
+        await pilot.pause()
+        assert [table.get_cell(str(i), "Action") for i in range(3)] == ["pick", "fixup", "pick"]
+        assert table.get_cell("1", "Note") == ""
+        await pilot.click("#save")
+        await pilot.pause()
+    assert [(a.command, a.commit_hash) for a in app.result] == [
+        ("pick", "a1b2c3d"), ("fixup", "c7d8e9f"), ("pick", "e4f5a6b")]
+
+async def test_tui_undo_redo_repaints_only_changed_rows(app: GitPalApp, monkeypatch):
+    from textual.widgets import Input
+    from git_pal.rebase.state import RebaseAction
+    from git_pal.tui.screens.modals import EditActionModal
+
+    app.initial_actions = [RebaseAction("pick", f"{i:07x}", f"commit {i}") for i in range(50)]
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        screen = app.screen
+        table = screen.query_one("#rebase-table", DataTable)
+        repainted = []
+        real_refresh = screen._refresh_rows
+
+        def refresh_rows(rows, *args, **kwargs):
+            rows = list(rows)
+            repainted.append(rows)
+            real_refresh(rows, *args, **kwargs)  # the real repaint, with whatever columns the screen asked for
+        monkeypatch.setattr(screen, "_refresh_rows", refresh_rows)
+        table.move_cursor(row=10)
+        screen.action_edit_row()
+        await pilot.pause()
+        assert isinstance(app.screen, EditActionModal)
+        app.screen.query_one("#input-command", Input).value = "drop"
+        await pilot.click("#save")
+        await pilot.pause()
+        await pilot.press("ctrl+down")
+        await pilot.pause()
+        assert [table.get_cell(str(i), "Action") for i in (10, 11)] == ["pick", "drop"]
+        await pilot.press("ctrl+z", "ctrl+z")
+        await pilot.pause()
+        assert screen.actions.command(10) == "pick" and screen.actions.commit_hash(10) == f"{10:07x}"
+        assert table.get_cell("10", "Action") == "pick"
+        await pilot.press("ctrl+y")
+        await pilot.pause()
+        assert table.get_cell("10", "Action") == "drop"
+        assert repainted == [[10], [10, 11], [10, 11], [10], [10]]
+
+async def test_tui_bulk_edit_range_and_pattern(app: GitPalApp):
+    """Range/pattern selection with one bulk command change, undoable in one step."""
+    import time
+    from textual.widgets import Input
+    from git_pal.rebase.state import RebaseAction
+    from git_pal.tui.screens.modals import BulkEditModal
+
+    app.initial_actions = [RebaseAction("pick", f"{i:07x}", f"commit {i}") for i in range(1500)]
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        screen = app.screen
+        table = screen.query_one("#rebase-table", DataTable)
+        await pilot.press("m")
+        await pilot.pause()
+        assert isinstance(app.screen, BulkEditModal)
+        app.screen.query_one("#input-selector", Input).value = "120-900"
+        app.screen.query_one("#input-command", Input).value = "s"
+        await pilot.click("#apply")
+        await pilot.pause()
+        assert [screen.actions.command(i) for i in (118, 119, 899, 900)] == ["pick", "squash", "squash", "pick"]
+        assert table.get_cell("119", "Action") == "squash"
+
+        started = time.perf_counter()
+        screen._on_bulk_edit(("/^commit 1[0-9]{3}$/", "drop"))
+        assert time.perf_counter() - started < 0.25
+        assert screen.actions.command(1499) == "drop" and table.get_cell("1499", "Action") == "drop"
+
+        table.move_cursor(row=3)
+        await pilot.press("space", "shift+down")
+        await pilot.pause()
+        assert screen.selected == {3, 4} and table.get_cell("4", "Action") == "* pick"
+        screen._on_bulk_edit(("", "fixup"))
+        assert table.get_cell("3", "Action") == "* fixup"
+        await pilot.press("escape", "ctrl+z", "ctrl+z")
+        await pilot.pause()
+        assert table.get_cell("3", "Action") == "pick" and screen.actions.command(1000) == "pick"
+
+async def test_tui_incremental_search_and_filter(app: GitPalApp):
+    """Search moves the cursor as you type; f filters the (virtual) table to the matches."""
+    import time
+    from textual.widgets import Input
+    from git_pal.rebase.state import RebaseAction
+    from git_pal.tui.widgets import VirtualTable
+
+    app.initial_actions = [RebaseAction("pick", f"{i:07x}", f"{'fix' if i % 1000 == 7 else 'feat'}: commit {i}")
+                           for i in range(100_000)] + [RebaseAction("# fix in a comment")]
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        screen = app.screen
+        table = screen.query_one("#rebase-table", VirtualTable)
+        await pilot.press("slash", *"fix")
+        await pilot.pause()
+        search = screen.query_one("#search", Input)
+        assert search.has_focus and search.value == "fix"
+        assert table.cursor_row == 7 and search.border_title == "100 matches"
+
+        started = time.perf_counter()
+        search.value = "fix: commit 42007"
+        await pilot.pause()
+        assert time.perf_counter() - started < 0.25
+        assert table.cursor_row == 42007 and search.border_title == "1 matches"
+
+        search.value = "fix"
+        await pilot.press("enter", "n", "n", "N")
+        await pilot.pause()
+        assert table.has_focus and table.cursor_row == 43007
+        await pilot.press("f")
+        await pilot.pause()
+        assert table.row_count == 100 and table.cursor_row == 43
+        assert screen._row_cells(0)[2] == "fix: commit 7"
+        await pilot.press("ctrl+down")
+        assert screen.actions.message(7) == "fix: commit 7"  # no reordering while filtered
+        await pilot.press("escape")
+        await pilot.pause()
+        assert not search.display and table.row_count == 100_000 and table.cursor_row == 43007
+
+async def test_tui_perf_panel_toggles_and_updates(app: GitPalApp):
+    """F12 docks the perf panel on the current screen; ctrl+t switches allocation tracking."""
+    import tracemalloc
+    from git_pal.metrics import METRICS
+    from git_pal.tui.widgets import PerfPanel
+
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        screen = app.screen
+        await pilot.press("f12")
+        await pilot.pause()
+        panel = screen.query_one(PerfPanel)
+        text = str(panel.render())
+        assert "git" in text and "rows             2" in text and "tracemalloc off" in text
+        assert METRICS.frames and METRICS.cache("config snapshot").hits + METRICS.cache("config snapshot").misses
+
+        await pilot.press("ctrl+t")
+        try:
+            assert tracemalloc.is_tracing()
+            panel.refresh_stats()
+            await screen.workers.wait_for_complete()
+            panel.refresh_stats()
+            assert "top allocations" in str(panel.render())
+        finally:
+            await pilot.press("ctrl+t")
+        assert not tracemalloc.is_tracing()
+        await pilot.press("f12")
+        await pilot.pause()
+        assert not screen.query(PerfPanel)
@@ -0,0 +1,37 @@
+from benchmarks.corpus import conflict_triple, todo_lines
+from benchmarks.harness import Benchmark, compare, percentile, run
+from git_pal.merge.triage import IMPORTS, REAL, WHITESPACE, classify_conflict
+from git_pal.rebase.parser import iter_todo_fields
+
+def test_corpora_are_deterministic_and_valid():
+    lines = todo_lines(5000, seed=7)
+    assert lines == todo_lines(5000, seed=7) and lines != todo_lines(5000, seed=8)
+    unrecognized = []
+    commands = {f[0] for f in iter_todo_fields(lines, lambda n, line: unrecognized.append(line))}
+    assert not unrecognized
+    assert {"pick", "fixup", "merge", "label", "reset", "update-ref", "exec", "#"} <= commands
+    for kind, expected in (("whitespace", WHITESPACE), ("imports", IMPORTS), ("real", REAL)):
+        base, ours, theirs = conflict_triple(300, kind)
+        assert conflict_triple(300, kind) == (base, ours, theirs)
+        assert classify_conflict(f"{kind}.py", base, ours, theirs).kind == expected
+
+def test_run_and_compare_flag_regressions():
+    calls = []
+    bench = Benchmark("noop", lambda size: lambda: calls.append(size), (10, 1000), "rows")
+    results = run([bench], repeat=2, max_size=100)
+    assert list(results["results"]) == ["noop[10]"] and set(calls) == {10}
+    baseline = {"results": {"a": {"best": 1.0}, "b": {"best": 1.0}, "gone": {"best": 1.0}}}
+    current = {"results": {"a": {"best": 1.2}, "b": {"best": 1.5}, "new": {"best": 1.0}}}
+    lines, regressed = compare(baseline, current, threshold=0.25)
+    assert regressed == ["b"]
+    assert any(line.startswith("gone") and "only in baseline" in line for line in lines)
+
+def test_latency_benchmarks_report_percentiles_and_compare_medians():
+    samples = [i / 1000 for i in range(1, 101)]
+    bench = Benchmark("tui/x", lambda size: lambda repeat: samples[:repeat * 50], (100,), "lines", latency=True)
+    entry = run([bench], repeat=2)["results"]["tui/x[100]"]
+    assert (entry["median"], entry["p90"], entry["p99"], entry["max"]) == (0.0505, 0.09, 0.099, 0.1)
+    assert percentile([3.0], 50) == 3.0 and "per_second" not in entry
+    slower = dict(entry, best=entry["best"] / 2, median=entry["median"] * 1.5)
+    _lines, regressed = compare({"results": {"k": entry}}, {"results": {"k": slower}})
+    assert regressed == ["k"]
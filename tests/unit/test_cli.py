@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from git_pal.cli import main
+
+def test_missing_todo_file_does_not_load_tui(tmp_path: Path):
+    code = (
+        "import sys\n"
+        "from git_pal.cli import main\n"
+        f"rc = main([{str(tmp_path / 'missing')!r}])\n"
+        "heavy = [m for m in ('textual', 'pydantic', 'jwt', 'cryptography') if m in sys.modules]\n"
+        "print(rc, heavy)\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "1 []"
+
+def test_profile_startup_prints_breakdown(tmp_path: Path, capsys):
+    assert main([str(tmp_path / "missing"), "--profile-startup"]) == 1
+    err = capsys.readouterr().err
+    assert "startup profile" in err and "total" in err
+
+def test_rules_mode_rewrites_todo_without_tui(tmp_path: Path):
+    todo = tmp_path / "git-rebase-todo"
+    todo.write_text("pick 000000a WIP: spike\npick 000000b real work\n", encoding="utf-8")
+    rules = tmp_path / "rules.toml"
+    rules.write_text('[[rule]]\nsubject = "^WIP"\naction = "drop"\n', encoding="utf-8")
+    code = (
+        "import sys\n"
+        "from git_pal.cli import main\n"
+        f"rc = main([{str(todo)!r}])\n"
+        "heavy = [m for m in ('textual', 'pydantic', 'jwt', 'cryptography') if m in sys.modules]\n"
+        "print(rc, heavy)\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                          cwd=tmp_path, env={**os.environ, "GIT_PAL_RULES": str(rules)})
+    assert proc.stdout.strip() == "0 []"
+    assert "1 commands changed" in proc.stderr
+    assert todo.read_text(encoding="utf-8") == "drop 000000a WIP: spike\npick 000000b real work\n"
+
+    rules.write_text('[[rule]]\nsubject = "("\naction = "drop"\n', encoding="utf-8")
+    assert main([str(todo), "--rules", str(rules)]) == 1
+
+def test_trace_env_writes_startup_spans(tmp_path: Path):
+    todo = tmp_path / "git-rebase-todo"
+    todo.write_text("pick 000000a WIP: spike\n", encoding="utf-8")
+    rules = tmp_path / "rules.toml"
+    rules.write_text('[[rule]]\nsubject = "^WIP"\naction = "drop"\n', encoding="utf-8")
+    out = tmp_path / "trace.json"
+    proc = subprocess.run([sys.executable, "-m", "git_pal.cli", str(todo), "--rules", str(rules)],
+                          capture_output=True, text=True, cwd=tmp_path, env={**os.environ, "GIT_PAL_TRACE": str(out)})
+    assert proc.returncode == 0 and f"trace written to {out}" in proc.stderr
+    spans = {e["name"]: e for e in json.loads(out.read_text(encoding="utf-8"))["traceEvents"] if e["ph"] == "X"}
+    assert {"cli.main", "load rules", "parse_todo_table", "apply rules", "write todo"} <= set(spans)
+    main_span = spans["cli.main"]
+    assert main_span["ts"] <= spans["parse_todo_table"]["ts"] <= main_span["ts"] + main_span["dur"]
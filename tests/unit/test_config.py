@@ -50,3 +50,38 @@ def test_config_path_linux(monkeypatch):
     assert ".config" in str(path)
     assert "git-pal" in str(path)
     assert path.name == "config.toml"
+
+def test_load_config_uses_snapshot_until_file_changes(tmp_path, monkeypatch):
+    import subprocess
+    from git_pal import config as config_mod
+
+    cfg_path = tmp_path / "git-pal" / "config.toml"
+    cfg_path.parent.mkdir()
+    cfg_path.write_text('license_token = "tok-1"\n\n[license]\npublic_key = "PEM"\n', encoding="utf-8")
+    monkeypatch.setattr(config_mod, "get_config_path", lambda: cfg_path)
+    config_mod.load_config.cache_clear()
+    try:
+        assert load_config().license_token == "tok-1"
+        assert config_mod.is_config_snapshot_valid()
+
+        def _no_validate(_raw):
+            raise AssertionError("snapshot should have been used")
+        monkeypatch.setattr(config_mod, "_validate", _no_validate)
+        config_mod.load_config.cache_clear()
+        assert load_config().license.public_key == "PEM"
+
+        # A fresh process on the snapshot path never imports pydantic.
+        code = ("import sys; from git_pal.config import load_config; load_config(); "
+                "print('pydantic' in sys.modules, 'tomllib' in sys.modules)")
+        env = {"XDG_CONFIG_HOME": str(tmp_path), "PATH": "", "HOME": str(tmp_path)}
+        out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        assert out.stdout.strip() == "False False"
+
+        cfg_path.write_text('license_token = "tok-22"\n\n[license]\npublic_key = "PEM"\n', encoding="utf-8")
+        assert not config_mod.is_config_snapshot_valid()
+        monkeypatch.undo()
+        monkeypatch.setattr(config_mod, "get_config_path", lambda: cfg_path)
+        config_mod.load_config.cache_clear()
+        assert load_config().license_token == "tok-22"
+    finally:
+        config_mod.load_config.cache_clear()
@@ -0,0 +1,26 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from git_pal.fsutil import atomic_write
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX modes")
+def test_atomic_write_modes(tmp_path: Path):
+    target = tmp_path / "f"
+    atomic_write(target, "one", mode=0o600)
+    assert target.read_text(encoding="utf-8") == "one" and target.stat().st_mode & 0o777 == 0o600
+    target.chmod(0o640)
+    atomic_write(target, b"two", fsync=True)
+    assert target.read_bytes() == b"two" and target.stat().st_mode & 0o777 == 0o640  # kept
+
+def test_atomic_write_failure_leaves_old_content(tmp_path: Path, monkeypatch):
+    target = tmp_path / "f"
+    target.write_text("old", encoding="utf-8")
+    def crash(*_args):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "replace", crash)
+    with pytest.raises(OSError):
+        atomic_write(target, "new")
+    assert target.read_text(encoding="utf-8") == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["f"]
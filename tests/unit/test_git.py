@@ -0,0 +1,224 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from git_pal.git import CatFileBatch, Repo, get_cat_file_batch, get_repo_root, close_cat_file_batches
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout.strip()
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Path:
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "user.email", "t@example.com")
+    _git(tmp_path, "config", "user.name", "Tester")
+    (tmp_path / "a.txt").write_text("hello\n", encoding="utf-8")
+    _git(tmp_path, "add", "a.txt")
+    _git(tmp_path, "commit", "-q", "-m", "first")
+    return tmp_path
+
+def test_cat_file_batch_info_and_read(repo: Path):
+    blob = _git(repo, "rev-parse", "HEAD:a.txt")
+    with CatFileBatch(repo) as batch:
+        info = batch.info([blob, "HEAD", "0" * 40])
+        assert info[0].type == "blob" and info[0].size == 6
+        assert info[1].type == "commit"
+        assert info[2] is None
+        objs = batch.read([blob, blob])
+        assert [o.data for o in objs] == [b"hello\n", b"hello\n"]
+
+def test_cat_file_batch_restarts_dead_process(repo: Path):
+    blob = _git(repo, "rev-parse", "HEAD:a.txt")
+    with CatFileBatch(repo) as batch:
+        assert batch.read_one(blob).data == b"hello\n"
+        batch._batch.proc.kill()
+        batch._batch.proc.wait()
+        assert batch.read_one(blob).data == b"hello\n"
+
+def test_cat_file_batch_pipelines_many_requests(repo: Path, monkeypatch):
+    monkeypatch.setattr("git_pal.git.BATCH_CHUNK_SIZE", 3)
+    blob = _git(repo, "rev-parse", "HEAD:a.txt")
+    with CatFileBatch(repo) as batch:
+        infos = batch.info([blob] * 10)
+    assert len(infos) == 10 and all(i.oid == blob for i in infos)
+
+def test_get_cat_file_batch_is_shared_per_repo(repo: Path):
+    (repo / "sub").mkdir()
+    try:
+        assert get_cat_file_batch(repo) is get_cat_file_batch(repo / ".") is get_cat_file_batch(repo / "sub")
+    finally:
+        close_cat_file_batches()
+
+def _no_subprocess(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("repository discovery spawned a process")
+    monkeypatch.setattr(subprocess, "run", fail)
+    monkeypatch.setattr(subprocess, "Popen", fail)
+
+def test_repo_discover_walks_up_without_spawning(repo: Path, monkeypatch):
+    root = Path(_git(repo, "rev-parse", "--show-toplevel"))
+    (repo / "pkg" / "sub").mkdir(parents=True)
+    _no_subprocess(monkeypatch)
+    found = Repo.discover(repo / "pkg" / "sub")
+    assert found.worktree == root and not found.bare
+    assert found.git_dir == found.common_dir == root / ".git"
+    assert get_repo_root(repo / "pkg") == root
+    assert Repo.discover(repo / ".git" / "refs").git_dir == root / ".git"
+
+def test_repo_discover_linked_worktree_and_bare(repo: Path, tmp_path_factory):
+    other = tmp_path_factory.mktemp("wt") / "feature"
+    _git(repo, "worktree", "add", "-q", "-b", "feature", str(other))
+    found = Repo.discover(other)
+    assert found.worktree == Path(_git(other, "rev-parse", "--show-toplevel"))
+    assert found.git_dir == Path(_git(other, "rev-parse", "--absolute-git-dir"))
+    assert found.common_dir == Repo.discover(repo).common_dir != found.git_dir
+
+    bare = tmp_path_factory.mktemp("bare") / "repo.git"
+    _git(repo, "clone", "-q", "--bare", str(repo), str(bare))
+    found = Repo.discover(bare / "refs")
+    assert found.bare and found.path == found.git_dir == bare.resolve()
+    with pytest.raises(FileNotFoundError):
+        get_repo_root(bare)
+
+def test_repo_discover_linked_worktree_of_a_bare_repository(repo: Path, tmp_path_factory):
+    bare = tmp_path_factory.mktemp("bare") / "repo.git"
+    _git(repo, "clone", "-q", "--bare", str(repo), str(bare))
+    linked = tmp_path_factory.mktemp("wt") / "w"
+    _git(bare, "worktree", "add", "-q", str(linked))
+    found = Repo.discover(linked)
+    assert found.worktree == Path(_git(linked, "rev-parse", "--show-toplevel"))
+    assert found.common_dir == bare.resolve() != found.git_dir
+    assert get_repo_root(linked) == found.worktree
+    assert Repo.discover(bare).bare
+
+def test_repo_discover_honours_git_dir_and_work_tree(repo: Path, tmp_path_factory, monkeypatch):
+    elsewhere = tmp_path_factory.mktemp("elsewhere")
+    monkeypatch.setenv("GIT_DIR", str(repo / ".git"))
+    assert Repo.discover(elsewhere).worktree == elsewhere.resolve()
+    monkeypatch.setenv("GIT_WORK_TREE", str(repo))
+    found = Repo.discover(elsewhere)
+    assert found.worktree == repo.resolve() and found.git_dir == (repo / ".git").resolve()
+
+def test_repo_discover_outside_a_repository(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+    with pytest.raises(FileNotFoundError):
+        Repo.discover(tmp_path)
+    with pytest.raises(FileNotFoundError):
+        get_repo_root(tmp_path)
+
+def test_iter_enrichment_resolves_abbreviated_shas(repo: Path):
+    from git_pal.rebase.enrich import iter_enrichment
+    (repo / "b.txt").write_text("one\ntwo\n", encoding="utf-8")
+    _git(repo, "add", "b.txt")
+    _git(repo, "commit", "-q", "-m", "second")
+    head = _git(repo, "rev-parse", "--short", "HEAD")
+    first = _git(repo, "rev-parse", "--short", "HEAD~1")
+    try:
+        batches = list(iter_enrichment([head, first, "1234567", head], repo, batch_size=1))
+    finally:
+        close_cat_file_batches()
+    merged = {k: v for b in batches for k, v in b.items()}
+    assert set(merged) == {head, first}
+    assert merged[head].author == "Tester"
+    assert (merged[head].files_changed, merged[head].insertions, merged[head].deletions) == (1, 2, 0)
+    assert merged[first].timestamp > 0
+
+@pytest.mark.asyncio
+async def test_async_runner_run_stream_and_errors(repo: Path):
+    from git_pal.git_async import AsyncGitRunner
+    runner = AsyncGitRunner(repo, max_concurrency=2)
+    head = _git(repo, "rev-parse", "HEAD")
+    assert await runner.run(["rev-parse", "HEAD"]) == head
+    lines = [line async for line in runner.stream(["cat-file", "--batch-check"], input=f"{head}\n".encode())]
+    assert lines == [f"{head} commit {len(_git(repo, 'cat-file', 'commit', 'HEAD')) + 1}"]
+    with pytest.raises(RuntimeError, match="Git command failed"):
+        await runner.run(["rev-parse", "no-such-ref"])
+    with pytest.raises(RuntimeError, match="timed out"):
+        await runner.run(["-c", "alias.nap=!sleep 5", "nap"], timeout=0.2)
+
+@pytest.mark.asyncio
+async def test_async_runner_bounds_concurrency_and_cancels(repo: Path, monkeypatch):
+    import asyncio
+    from git_pal.git_async import AsyncGitRunner
+    runner = AsyncGitRunner(repo, max_concurrency=2)
+    live, peak = 0, 0
+    real_spawn = runner._spawn
+
+    async def counting_spawn(args, with_stdin):
+        nonlocal live, peak
+        proc = await real_spawn(args, with_stdin)
+        live += 1
+        peak = max(peak, live)
+        real_communicate = proc.communicate
+        async def communicate(input=None):
+            nonlocal live
+            try:
+                return await real_communicate(input)
+            finally:
+                live -= 1
+        proc.communicate = communicate
+        return proc
+    monkeypatch.setattr(runner, "_spawn", counting_spawn)
+
+    await asyncio.gather(*(runner.run(["rev-parse", "HEAD"]) for _ in range(6)))
+    assert peak <= 2
+
+    tasks = [asyncio.ensure_future(runner.run(["-c", "alias.nap=!sleep 5", "nap"])) for _ in range(3)]
+    await asyncio.sleep(0.2)
+    assert runner.in_flight == 3
+    runner.cancel_all()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+    assert runner.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_async_runner_cancels_its_own_tasks_and_drains_stderr(repo: Path):
+    import asyncio
+    from git_pal.git_async import AsyncGitRunner
+    runner = AsyncGitRunner(repo)
+    # 256 KiB on stderr before any stdout: more than a pipe holds, so it must be drained as it comes.
+    noisy = ["-c", "alias.noisy=!head -c 262144 /dev/zero >&2; echo done", "noisy"]
+    assert [line async for line in runner.stream(noisy, timeout=10)] == ["done"]
+
+    async def caller():
+        try:
+            await runner.run(["-c", "alias.nap=!sleep 5", "nap"])
+        except asyncio.CancelledError:
+            return "call cancelled"
+    task = asyncio.ensure_future(caller())
+    await asyncio.sleep(0.2)
+    assert runner.in_flight == 1 and task not in runner._tasks
+    runner.cancel_all()
+    assert await task == "call cancelled"  # the caller carries on; only the git call was cancelled
+
+    async def consume():
+        return [line async for line in runner.stream(["-c", "alias.nap=!sleep 5", "nap"])]
+    task = asyncio.ensure_future(consume())
+    await asyncio.sleep(0.2)
+    runner.cancel_all()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert runner.in_flight == 0
+
+def test_file_overlap_index_from_diff_tree(repo: Path):
+    from git_pal.git import iter_touched_paths
+    from git_pal.rebase.overlap import FileOverlapIndex, reorder_overlaps
+
+    first = _git(repo, "rev-parse", "HEAD")
+    (repo / "b c.txt").write_text("x\n", encoding="utf-8")
+    (repo / "a.txt").write_text("changed\n", encoding="utf-8")
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "second")
+    second = _git(repo, "rev-parse", "HEAD")
+    _git(repo, "commit", "-q", "--allow-empty", "-m", "empty")
+    empty = _git(repo, "rev-parse", "HEAD")
+    assert list(iter_touched_paths([first, "f" * 40, second, empty], repo)) == [
+        (first, ["a.txt"]), (second, ["a.txt", "b c.txt"]), (empty, [])]
+
+    index = FileOverlapIndex.build([first[:7], second[:9], empty[:7], "nothere"], repo)
+    assert index.shared_paths(first[:7], second[:9]) == ["a.txt"]
+    assert index.overlapping(second[:9], [first[:7], empty[:7]]) == [first[:7]]
+    order = [second[:9], empty[:7], first[:7]]
+    rank = {first[:7]: 0, empty[:7]: 1, second[:9]: 2}
+    assert reorder_overlaps(index, order.__getitem__, rank, 0) == [2]
@@ -88,3 +88,90 @@ def test_verify_license_invalid_issuer(tmp_path, rsa_key_pair):
     finally:
         config_mod.get_config_path = original_get_config_path
         config_mod.load_config.cache_clear()
+
+def _write_config(cfg_path, token, pub):
+    cfg_path.write_text(
+        f'license_token = "{token}"\n\n[license]\npublic_key = """{pub.decode()}"""\n',
+        encoding="utf-8",
+    )
+
+def _token(priv, sub="u@example.com", features=("pro",)):
+    now = int(time.time())
+    return jwt.encode({"sub": sub, "iss": EXPECTED_ISSUER, "exp": now + 3600, "features": list(features)},
+                      priv, algorithm="RS256")
+
+def test_verify_license_uses_cached_verdict(tmp_path, rsa_key_pair, monkeypatch):
+    import json
+    from git_pal import licensing
+    priv, pub = rsa_key_pair
+    cfg_path = tmp_path / "config.toml"
+    _write_config(cfg_path, _token(priv), pub)
+    monkeypatch.setattr(config_mod, "get_config_path", lambda: cfg_path)
+    config_mod.load_config.cache_clear()
+    try:
+        first = verify_license()
+        verdict = json.loads((tmp_path / licensing.VERDICT_FILE).read_text(encoding="utf-8"))
+        assert verdict["exp"] == first.exp and "features" not in json.dumps(verdict)
+
+        def _no_crypto(*_args):
+            raise AssertionError("full verify should be skipped")
+        monkeypatch.setattr(licensing, "_verify_token", _no_crypto)
+        cached = verify_license()
+        assert cached.sub == first.sub and cached.features == ["pro"]
+    finally:
+        config_mod.load_config.cache_clear()
+
+def test_verify_license_rejects_a_swapped_token_despite_the_verdict(tmp_path, rsa_key_pair, monkeypatch):
+    import os
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    priv, pub = rsa_key_pair
+    cfg_path = tmp_path / "config.toml"
+    _write_config(cfg_path, _token(priv), pub)
+    monkeypatch.setattr(config_mod, "get_config_path", lambda: cfg_path)
+    config_mod.load_config.cache_clear()
+    try:
+        assert verify_license().features == ["pro"]
+        # A token with extra features signed by another key, swapped in without touching the mtime.
+        st = cfg_path.stat()
+        forged = _token(rsa.generate_private_key(public_exponent=65537, key_size=2048), features=("pro", "enterprise"))
+        _write_config(cfg_path, forged, pub)
+        os.utime(cfg_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        config_mod.load_config.cache_clear()
+        try:
+            verify_license()
+            assert False, "Should have rejected a token signed by another key"
+        except ValueError as e:
+            assert "invalid license" in str(e).lower()
+    finally:
+        config_mod.load_config.cache_clear()
+
+def test_verify_license_verdict_is_bounded_by_exp(tmp_path, rsa_key_pair, monkeypatch):
+    from git_pal import licensing
+    priv, pub = rsa_key_pair
+    cfg_path = tmp_path / "config.toml"
+    _write_config(cfg_path, _token(priv), pub)
+    monkeypatch.setattr(config_mod, "get_config_path", lambda: cfg_path)
+    config_mod.load_config.cache_clear()
+    try:
+        exp = verify_license().exp
+        calls = []
+        real_verify = licensing._verify_token
+        monkeypatch.setattr(licensing, "_verify_token", lambda *a: calls.append(1) or real_verify(*a))
+        verify_license()
+        assert calls == []
+        # Past exp the verdict no longer counts: the full verify runs (and does the rejecting).
+        monkeypatch.setattr(licensing.time, "time", lambda: exp + 1)
+        verify_license()
+        assert calls == [1]
+    finally:
+        config_mod.load_config.cache_clear()
+
+def test_write_receipt_skips_unchanged_content(tmp_path, monkeypatch):
+    from git_pal import licensing
+    p = licensing.write_receipt("p-1", "u@example.com", tmp_path)
+    before = p.read_text(encoding="utf-8")
+    monkeypatch.setattr(licensing.time, "time", lambda: 4_000_000_000)
+    licensing.write_receipt("p-1", "u@example.com", tmp_path)
+    assert p.read_text(encoding="utf-8") == before
+    licensing.write_receipt("p-2", "u@example.com", tmp_path)
+    assert '"p-2"' in p.read_text(encoding="utf-8")
@@ -0,0 +1,151 @@
+import difflib
+import os
+import random
+import subprocess
+
+from git_pal.cli import main
+from git_pal.merge import ast_merger, conflict_analyzer, triage
+from git_pal.merge.cache import AnalysisCache
+from git_pal.merge.conflict_analyzer import classify_whitespace_only, is_diff_whitespace_only
+
+def _reference_whitespace_only(a: str, b: str) -> bool:
+    # The original ndiff-based definition.
+    diff = difflib.ndiff(conflict_analyzer._normalize_whitespace(a), conflict_analyzer._normalize_whitespace(b))
+    return not any(d.startswith("+") or d.startswith("-") for d in diff)
+
+def test_whitespace_only_basic():
+    assert is_diff_whitespace_only("x = 1\nfoo(a, b)\n", "x=1\n  foo( a,b )  \n")
+    assert not is_diff_whitespace_only("x = 1\n", "x = 2\n")
+    assert not is_diff_whitespace_only("a b\n", "ab\n")
+    assert not is_diff_whitespace_only("x = 1\n", "x = 1\n\n")
+
+def test_whitespace_only_matches_reference():
+    rnd = random.Random(7)
+    tokens = ["x", "y", "=", "(", ")", ",", "1", " ", "  ", "\t", "\n", "foo", ":"]
+    for _ in range(500):
+        a = "".join(rnd.choice(tokens) for _ in range(rnd.randint(0, 30)))
+        b = "".join(rnd.choice([t, t, t, " ", ""]) for t in a) if rnd.random() < 0.7 else \
+            "".join(rnd.choice(tokens) for _ in range(rnd.randint(0, 30)))
+        assert is_diff_whitespace_only(a, b) == _reference_whitespace_only(a, b), (a, b)
+
+def test_classify_whitespace_only_bulk(monkeypatch):
+    pairs = [("a = 1\n", "a=1\n"), ("a\n", "b\n"), ("same", "same")] * 10
+    expected = [True, False, True] * 10
+    assert classify_whitespace_only(pairs, max_workers=1) == expected
+    monkeypatch.setattr(conflict_analyzer, "PARALLEL_MIN_PAIRS", 0)
+    assert classify_whitespace_only(pairs, max_workers=2) == expected
+
+def _git(repo, *args):
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout
+
+def _conflicted_repo(repo):
+    _git(repo, "init", "-q", "-b", "main")
+    _git(repo, "config", "user.email", "t@example.com")
+    _git(repo, "config", "user.name", "Tester")
+    files = {
+        "ws.txt": ("a = 1\nb = 2\n", "a=1\nb = 2\n", "a = 1\nb  =  2\n"),
+        "mod.py": ("import os\n\nx = 1\n", "import os\nimport sys\n\nx = 1\n", "import os\nimport re\n\nx = 1\n"),
+        "real.txt": ("v1\n", "ours\n", "theirs\n"),
+    }
+    for name, (base, _ours, _theirs) in files.items():
+        (repo / name).write_text(base)
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "base")
+    _git(repo, "checkout", "-q", "-b", "other")
+    for name, (_base, _ours, theirs) in files.items():
+        (repo / name).write_text(theirs)
+    _git(repo, "commit", "-q", "-am", "theirs")
+    _git(repo, "checkout", "-q", "main")
+    for name, (_base, ours, _theirs) in files.items():
+        (repo / name).write_text(ours)
+    _git(repo, "commit", "-q", "-am", "ours")
+    subprocess.run(["git", "merge", "-q", "other"], cwd=repo, capture_output=True)
+
+def test_triage_classifies_and_resolves(tmp_path, monkeypatch, capsys):
+    _conflicted_repo(tmp_path)
+    entries = triage.list_unmerged(tmp_path)
+    assert sorted(e.path for e in entries) == ["mod.py", "real.txt", "ws.txt"]
+    kinds = {r.path: r.kind for r in triage.triage_conflicts(tmp_path, entries, max_workers=1)}
+    assert kinds == {"ws.txt": triage.WHITESPACE, "mod.py": triage.IMPORTS, "real.txt": triage.REAL}
+
+    monkeypatch.chdir(tmp_path)
+    assert main(["conflicts", "--resolve"]) == 0
+    out = capsys.readouterr().out
+    assert "3 conflicts: 2 trivial, 1 real" in out and "resolved and staged 2 paths" in out
+    assert [e.path for e in triage.list_unmerged(tmp_path)] == ["real.txt"]
+    assert (tmp_path / "mod.py").read_text() == "import os\nimport sys\nimport re\n\nx = 1\n"
+
+def test_apply_resolutions_keeps_mode_and_skips_symlinks(tmp_path):
+    _conflicted_repo(tmp_path)
+    results = [r for r in triage.triage_conflicts(tmp_path, triage.list_unmerged(tmp_path), max_workers=1)
+               if r.resolution is not None]
+    (tmp_path / "mod.py").chmod(0o755)
+    elsewhere = tmp_path / "elsewhere.txt"
+    elsewhere.write_text("untouched\n")
+    (tmp_path / "ws.txt").unlink()
+    (tmp_path / "ws.txt").symlink_to(elsewhere)
+    assert triage.apply_resolutions(tmp_path, results) == ["mod.py"]
+    assert (tmp_path / "mod.py").stat().st_mode & 0o777 == 0o755
+    assert elsewhere.read_text() == "untouched\n" and (tmp_path / "ws.txt").is_symlink()
+
+def test_import_resolution_is_three_way_and_verbatim():
+    merged = triage.classify_conflict("m.py", "import os\nimport sys\n\nx = 1\n",
+                                      "import os\nimport re  # noqa: F401\n\nx = 1\n",
+                                      "import json\nimport os\n\nx = 1\n")
+    # sys was removed by both sides and stays removed; ours' comment survives.
+    assert merged.kind == triage.IMPORTS
+    assert merged.resolution == "import os\nimport re  # noqa: F401\nimport json\n\nx = 1\n"
+
+    # theirs dropped b from a statement ours extended: no verbatim statement says "a, c" only.
+    base, ours, theirs = "from m import a, b\n\nx = 1\n", "from m import a, b, c\n\nx = 1\n", "from m import a\n\nx = 1\n"
+    assert triage.classify_conflict("m.py", base, ours, theirs).kind == triage.REAL
+    assert triage.classify_conflict("m.py", "", "import a; import b\n", "import a\n").kind == triage.REAL
+
+def test_header_only_imports_are_consolidated_and_cached(monkeypatch):
+    src = '"""Doc.\n\nimport fake\n"""\nimport os\nfrom x import a\ntry:\n    import y\nexcept ImportError:\n    y = None\n\ndef f():\n    import z\n'
+    header, body = ast_merger.split_import_header(src)
+    assert header.endswith("y = None\n\n") and body.startswith("def f")
+    merged = ast_merger.merge_python_imports("", src, "from x import b as c\nimport os\n", header_only=True)
+    assert merged == "from x import a, b as c\nimport os\nimport y"  # guarded imports count too
+    assert "import z" in ast_merger.merge_python_imports("", src, "")
+
+    # `exceptions = ...` is ordinary code: the header ends there, not after it.
+    header, body = ast_merger.split_import_header("import os\nexceptions = {}\nimport late\n")
+    assert header == "import os\n" and body.startswith("exceptions")
+    guarded = "if TYPE_CHECKING:\n    from typing import List\nexcept_count = 0\n"
+    assert ast_merger.get_import_names(guarded, header_only=True) == {("typing", 0, "List", None)}
+
+    calls = []
+    real_parse = ast_merger.ast.parse
+    monkeypatch.setattr(ast_merger.ast, "parse", lambda text: calls.append(text) or real_parse(text))
+    monkeypatch.setattr(ast_merger, "_IMPORT_CACHE", ast_merger.OrderedDict())
+    for _ in range(3):
+        ast_merger.merge_python_imports(src, src + "x = 1\n", src, header_only=True, shas=("b1", "o1", "b1"))
+    assert len(calls) == 4  # split check + parse, once per distinct blob
+
+def test_analysis_cache_roundtrip_and_lru(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache", max_bytes=10_000)
+    assert cache.get("ws", 1, ("a", "b")) is None
+    cache.put("ws", 1, ("a", "b"), {"kind": "whitespace"})
+    assert cache.get("ws", 1, ("a", "b")) == {"kind": "whitespace"}
+    assert cache.get("ws", 2, ("a", "b")) is None  # version is part of the key
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.writes) == (1, 2, 1)
+
+    cache.put("ws", 1, ("old",), "x" * 4000)
+    cache.put("ws", 1, ("new",), "y" * 4000)
+    os.utime(cache._path(cache.key("ws", 1, ("old",))), ns=(1, 1))
+    cache.get("ws", 1, ("new",))
+    cache.put("ws", 1, ("newest",), "z" * 4000)  # over the cap: evicts least recently used
+    assert cache.get("ws", 1, ("old",)) is None
+    assert cache.get("ws", 1, ("newest",)) == "z" * 4000
+    assert cache.stats.evictions >= 1
+    assert not list((tmp_path / "cache").rglob("*.tmp"))
+
+def test_triage_uses_analysis_cache(tmp_path):
+    _conflicted_repo(tmp_path)
+    cache = AnalysisCache.for_repo(tmp_path)
+    assert cache.root == tmp_path / ".git" / "git-pal" / "analysis"
+    first = sorted((r.path, r.kind) for r in triage.triage_conflicts(tmp_path, max_workers=1, cache=cache))
+    again = AnalysisCache.for_repo(tmp_path)
+    assert sorted((r.path, r.kind) for r in triage.triage_conflicts(tmp_path, max_workers=1, cache=again)) == first
+    assert (again.stats.hits, again.stats.misses) == (3, 0)
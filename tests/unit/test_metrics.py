@@ -0,0 +1,28 @@
+from git_pal.metrics import Metrics, report_lines, rss_bytes
+
+def test_git_latency_histogram_and_report():
+    metrics = Metrics()
+    for seconds in (0.0004, 0.003, 0.004, 0.7):
+        metrics.git_spawn()
+        metrics.git_latency.add(seconds)
+    hist = metrics.git_latency
+    assert hist.count == 4 and hist.max == 0.7
+    assert hist.buckets()[0] == ("<=1ms", 1) and hist.buckets()[-1] == ("<=1000ms", 1)
+    assert sum(n for _label, n in hist.buckets()) == 4
+
+    rows = metrics.cache("table rows")
+    rows.hits, rows.misses = 3, 1
+    metrics.cache("config snapshot")
+    for ms in (2, 4, 30):
+        metrics.frame(ms / 1000)
+    lines = report_lines(metrics, [("rows", "100")], allocations=[("rebase.py:10", 4096)])
+    assert "  4 started, 4 finished" in lines
+    assert "  table rows        75.0% of 4" in lines and "  config snapshot  unused" in lines
+    assert "  rows             100" in lines and "         4 KiB rebase.py:10" in lines
+    assert "  last 30.0 ms, p95 30.0, max 30.0" in lines
+    assert "  tracemalloc off (ctrl+t)" in report_lines(Metrics())
+
+def test_rss_is_reported():
+    rss, label = rss_bytes()
+    assert rss is None or rss > 1024 * 1024
+    assert label in ("rss", "peak rss")
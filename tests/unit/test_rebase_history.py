@@ -0,0 +1,40 @@
+from git_pal.rebase.history import EditHistory, MoveRow, ReplacePlan, SetRows, apply_edit, set_command_edit
+from git_pal.rebase.state import ActionTable
+
+def _plan(n):
+    table = ActionTable()
+    table.extend_fields(("pick", f"{i:07x}", f"commit {i}", "") for i in range(n))
+    return table
+
+def test_undo_redo_round_trip():
+    actions, history = _plan(3), EditHistory()
+    original = list(actions.iter_lines())
+    for edit in (SetRows(((1, ("pick", "0000001", "commit 1", ""), ("drop", "0000001", "commit 1", "")),)),
+                 MoveRow(2, 0),
+                 set_command_edit(actions, [0, 1], "squash")):
+        actions = apply_edit(actions, edit)
+        history.record(edit)
+    edited = list(actions.iter_lines())
+    assert edited == ["squash 0000002 commit 2", "squash 0000000 commit 0", "drop 0000001 commit 1"]
+    while history.can_undo:
+        actions = apply_edit(actions, history.undo())
+    assert list(actions.iter_lines()) == original
+    while history.can_redo:
+        actions = apply_edit(actions, history.redo())
+    assert list(actions.iter_lines()) == edited
+
+def test_bulk_edits_share_plan_structure():
+    actions, history = _plan(50_000), EditHistory()
+    before = actions
+    replacement = _plan(10)
+    for _ in range(20):
+        edit = set_command_edit(actions, range(0, 50_000, 2), "fixup")
+        actions = apply_edit(actions, edit)
+        history.record(edit)
+    edit = ReplacePlan(actions, replacement)
+    actions = apply_edit(actions, edit)
+    history.record(edit)
+    assert actions is replacement
+    actions = apply_edit(actions, history.undo())
+    assert actions is before  # the original table object, not a copy
+    assert actions.command(2) == "fixup" and actions.command(1) == "pick"
@@ -0,0 +1,61 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+from git_pal.rebase.journal import EditJournal, journal_path, restore_journal
+from git_pal.rebase.parser import parse_todo_table
+from git_pal.rebase.state import ActionTable, RebaseAction
+
+TODO = "pick a1b2c3d one\npick e4f5a6b two\npick 7c8d9e0 three\n"
+
+def test_journal_restores_edits_after_crash(tmp_path: Path):
+    todo = tmp_path / "git-rebase-todo"
+    todo.write_text(TODO, encoding="utf-8")
+    journal = EditJournal.open(todo)
+    journal.record_set(1, RebaseAction("squash", "e4f5a6b", "two"))
+    journal.record_move(2, 0)
+    journal.close()  # process dies without saving
+    with journal_path(todo).open("a", encoding="utf-8") as f:
+        f.write('{"op":"set","i":0,')  # torn last record
+
+    actions, restored = restore_journal(todo, parse_todo_table(todo))
+    assert restored == 2
+    assert list(actions.iter_lines()) == ["pick 7c8d9e0 three", "pick a1b2c3d one", "squash e4f5a6b two"]
+
+    # The next session keeps appending to the same journal.
+    journal = EditJournal.open(todo)
+    plan = ActionTable.from_actions([RebaseAction("drop", "a1b2c3d", "one")])
+    journal.record_plan(plan)
+    journal.close()
+    actions, restored = restore_journal(todo, parse_todo_table(todo))
+    assert restored == 3 and list(actions.iter_lines()) == ["drop a1b2c3d one"]
+
+    journal.discard()
+    assert not journal_path(todo).exists()
+
+def test_journal_ignored_when_todo_changed(tmp_path: Path):
+    todo = tmp_path / "git-rebase-todo"
+    todo.write_text(TODO, encoding="utf-8")
+    journal = EditJournal.open(todo)
+    journal.record_set(0, RebaseAction("drop", "a1b2c3d", "one"))
+    journal.close()
+    todo.write_text(TODO + "pick 1111111 four\n", encoding="utf-8")
+    actions, restored = restore_journal(todo, parse_todo_table(todo))
+    assert restored == 0 and actions.command(0) == "pick"
+
+def test_journal_survives_git_removing_the_rebase_state(tmp_path: Path):
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    state = tmp_path / ".git" / "rebase-merge"
+    state.mkdir()
+    todo = state / "git-rebase-todo"
+    todo.write_text(TODO, encoding="utf-8")
+    journal = EditJournal.open(todo)
+    journal.record_set(0, RebaseAction("drop", "a1b2c3d", "one"))
+    journal.close()  # the editor crashes...
+    assert journal_path(todo).parent == (tmp_path / ".git" / "git-pal" / "journal").resolve()
+
+    shutil.rmtree(state)  # ...so git drops the rebase state, then the rebase is started again
+    state.mkdir()
+    todo.write_text(TODO, encoding="utf-8")
+    actions, restored = restore_journal(todo, parse_todo_table(todo))
+    assert restored == 1 and actions.command(0) == "drop"
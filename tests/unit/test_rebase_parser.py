@@ -61,3 +61,51 @@ def test_merge_command(tmp_path: Path):
     assert actions[1].command == "merge"
     assert actions[1].commit_hash == "def4567"
     assert actions[1].message == "Merge feature branch"
+
+def test_iter_todo_actions_aliases_and_flags():
+    from git_pal.rebase.parser import iter_todo_actions
+    lines = [
+        "p a1b2c3d commit 1",
+        "f -C e4f5a6b commit 2",
+        "s 7c8d9e0 commit 3",
+        "x make test",
+        "merge -C f1a2b3c topic # Merge branch 'topic'",
+        "t onto",
+        "b",
+    ]
+    actions = list(iter_todo_actions(lines))
+    assert [a.command for a in actions] == ["pick", "fixup", "squash", "exec", "merge", "reset", "break"]
+    assert actions[1].flags == "-C" and actions[1].commit_hash == "e4f5a6b"
+    assert str(actions[1]) == "fixup -C e4f5a6b commit 2"
+    assert str(actions[4]) == "merge -C f1a2b3c topic # Merge branch 'topic'"
+
+def test_iter_todo_actions_reports_unrecognized(capsys):
+    from git_pal.rebase.parser import iter_todo_actions
+    seen = []
+    actions = list(iter_todo_actions(["bogus line", "pick abc123 ok"], lambda idx, line: seen.append((idx, line))))
+    assert seen == [(0, "bogus line")]
+    assert actions[0].command == "bogus line"
+    assert capsys.readouterr().err == ""
+
+def test_write_todo_file_is_atomic_and_change_aware(tmp_path: Path, monkeypatch):
+    import os
+    todo = tmp_path / "todo"
+    todo.write_text(GIT_REBASE_TODO_CONTENT, encoding="utf-8")
+    actions = parse_todo_file(todo)
+    mtime = todo.stat().st_mtime_ns
+    assert write_todo_file(todo, actions) is False  # unchanged: not rewritten
+    assert todo.stat().st_mtime_ns == mtime
+
+    actions[0].command = "drop"
+    def crash(*_args):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "replace", crash)
+    try:
+        write_todo_file(todo, actions)
+    except OSError:
+        pass
+    assert todo.read_text(encoding="utf-8") == GIT_REBASE_TODO_CONTENT
+    assert [p.name for p in tmp_path.iterdir()] == ["todo"]
+    monkeypatch.undo()
+    assert write_todo_file(todo, actions) is True
+    assert todo.read_text(encoding="utf-8").startswith("drop a1b2c3d commit 1\n")
@@ -0,0 +1,90 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from git_pal.rebase.rules import RulesError, apply_rules, load_rules
+from git_pal.rebase.state import ActionTable
+
+RULES = '''
+[[rule]]
+subject = "^WIP\\\\b"
+action = "drop"
+
+[[rule]]
+sha = ["000000c", "000000d1234abcd"]
+action = "f"
+after = "^Add parser"
+
+[[rule]]
+subject = "^docs:"
+move = "bottom"
+'''
+
+def _plan(rows):
+    table = ActionTable()
+    table.extend_fields(rows)
+    return table
+
+def _write(tmp_path: Path, text: str, name: str = "rules.toml") -> Path:
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return path
+
+def test_rules_relabel_and_reorder(tmp_path: Path):
+    rules = load_rules(_write(tmp_path, RULES))
+    actions = _plan([
+        ("pick", "000000a", "docs: readme", ""),
+        ("pick", "000000b", "Add parser", ""),
+        ("pick", "000000e", "WIP try things", ""),
+        ("exec", "", "make test", ""),
+        ("pick", "000000c", "tweak", ""),
+        ("pick", "000000d", "docs: WIP notes", ""),
+        ("# Rebase onto x", "", "", ""),
+    ])
+    result, report = apply_rules(actions, rules)
+    assert list(result.iter_lines()) == [
+        "pick 000000b Add parser",
+        "fixup 000000c tweak",
+        "fixup 000000d docs: WIP notes",  # rule 2 wins over rule 3: the first matching rule applies
+        "drop 000000e WIP try things",
+        "exec make test",
+        "pick 000000a docs: readme",
+        "# Rebase onto x",
+    ]
+    assert report.per_rule == {"rule 1": 1, "rule 2": 2, "rule 3": 1}
+    assert (report.relabeled, report.moved, report.unresolved) == (3, 3, [])
+    assert actions.command(2) == "pick"  # the input plan is left alone
+
+def test_rules_validation_and_structural_plans(tmp_path: Path):
+    for text, message in (('[[rule]]\naction = "drop"', "needs at least one"),
+                          ('[[rule]]\nsubject = "x"\naction = "exec"', "'action' must be one of"),
+                          ('[[rule]]\nsubject = "("\nmove = "top"', "invalid 'subject' regex"),
+                          ('[[rule]]\nsubject = "x"\ncolour = "red"', "unknown keys colour"),
+                          ("rule = 3", "expected at least one")):
+        with pytest.raises(RulesError, match=message):
+            load_rules(_write(tmp_path, text))
+    rules = load_rules(_write(tmp_path, '{"rule": [{"subject": "^b", "move": "top"}]}', "rules.json"))
+    plan = _plan([("label", "", "onto", ""), ("pick", "000000a", "a", ""), ("pick", "000000b", "b", "")])
+    with pytest.raises(RulesError, match="label"):
+        apply_rules(plan, rules)
+    with pytest.raises(RulesError, match="need a git repository"):
+        apply_rules(plan, load_rules(_write(tmp_path, '[[rule]]\npath = "*.md"\naction = "drop"')))
+
+def test_path_rules_use_touched_files(tmp_path: Path):
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True, text=True).stdout.strip()
+    git("init", "-q")
+    git("config", "user.email", "t@example.com")
+    git("config", "user.name", "Tester")
+    shas = []
+    for name in ("src/app.py", "docs/guide/intro.md", "README.md"):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(name, encoding="utf-8")
+        git("add", name)
+        git("commit", "-q", "-m", f"add {name}")
+        shas.append(git("rev-parse", "--short", "HEAD"))
+    rules = load_rules(_write(tmp_path, '[[rule]]\npath = ["docs/*", "*.md"]\nmove = "top"'))
+    result, report = apply_rules(_plan([("pick", sha, f"c{n}", "") for n, sha in enumerate(shas)]), rules, tmp_path)
+    assert [result.message(i) for i in range(3)] == ["c1", "c2", "c0"]
+    assert report.moved == 2
@@ -0,0 +1,32 @@
+from git_pal.rebase.search import PlanSearchIndex, parse_query
+from git_pal.rebase.state import ActionTable, RebaseAction
+
+def _plan(n):
+    table = ActionTable()
+    table.extend_fields(("pick", f"{i * 7919:08x}", f"Commit {i}: {'fix' if i % 3 == 0 else 'feat'} parser", "")
+                        for i in range(n))
+    return table
+
+def _brute(actions, text):
+    query = parse_query(text)
+    return [i for i in range(len(actions)) if query.matches(actions, i)]
+
+def test_search_matches_a_full_scan():
+    actions = _plan(3000)
+    index = PlanSearchIndex(actions)
+    for text in ("fix", "FIX PARSER", "commit 29", "2999", "sha:0000", "0001e", "cmd:p", "cmd:pick", "nothing"):
+        assert index.search(actions, parse_query(text)) == _brute(actions, text), text
+    assert index.search(actions, parse_query("commit 1234:")) == [1234]
+    assert parse_query("  ") is None
+
+def test_search_index_follows_edits():
+    actions = _plan(200)
+    index = PlanSearchIndex(actions)
+    for src, dst in ((5, 150), (199, 0), (40, 41)):
+        actions.move(src, dst)
+        index.move(src, dst)
+    actions[10] = RebaseAction("pick", "deadbeef", "brand new subject")
+    index.touch(10)
+    actions.set_command(11, "fixup")
+    for text in ("brand", "deadbeef", "commit 5:", "commit 199:", "fix", "cmd:f"):
+        assert index.search(actions, parse_query(text)) == _brute(actions, text), text
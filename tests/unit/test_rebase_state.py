@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from git_pal.rebase.parser import parse_todo_file, parse_todo_table
+from git_pal.rebase.state import ActionTable, RebaseAction
+
+TODO = """\
+pick a1b2c3d commit 1
+# a comment
+fixup -C e4f5a6b0 fix: commit 2 ✓
+exec make test
+label onto
+break
+"""
+
+def test_action_table_matches_parsed_actions(tmp_path: Path):
+    todo = tmp_path / "todo"
+    todo.write_text(TODO, encoding="utf-8")
+    actions = parse_todo_file(todo)
+    table = parse_todo_table(todo)
+    assert len(table) == len(actions)
+    assert list(table) == actions
+    assert list(table.iter_lines()) == [str(a) for a in actions]
+    assert table.commit_hash(0) == "a1b2c3d"  # odd-length SHA survives packing
+    assert table.flags(2) == "-C" and table.message(2) == "fix: commit 2 ✓"
+
+def test_action_table_copy_is_independent():
+    table = ActionTable([RebaseAction("pick", "abc1234", "one"), RebaseAction("pick", "def5678", "two")])
+    clone = table.copy()
+    clone[1] = RebaseAction("squash", "def5678", "two (edited)")
+    clone.set_command(0, "reword")
+    assert [a.command for a in table] == ["pick", "pick"]
+    assert table.message(1) == "two"
+    assert clone[1] == RebaseAction("squash", "def5678", "two (edited)")
+    assert clone.command(0) == "reword"
+
+def test_action_table_move_and_raw_values():
+    table = ActionTable([RebaseAction("pick", "aaa1111", "a"), RebaseAction("pick", "not-hex", "b"),
+                         RebaseAction("something odd")])
+    table.move(0, 2)
+    assert [a.commit_hash for a in table] == ["not-hex", "", "aaa1111"]
+    assert table.command(1) == "something odd"
+    assert table[-1].message == "a"
+
+def test_rebase_action_has_no_instance_dict():
+    action = RebaseAction("pick", "abc", "msg")
+    assert not hasattr(action, "__dict__")
+    assert action.original_line == "pick abc msg"
+
+def test_select_rows_specs():
+    from git_pal.rebase.selection import select_rows
+    table = ActionTable()
+    table.extend_fields([("pick", "a1b2c3d", "Add parser", ""), ("#", "", " note", ""),
+                         ("squash", "e4f5a6b", "fix typo", ""), ("pick", "c7d8e9f", "Add writer", "")])
+    view = table.indices_where(lambda command: not command.startswith("#"))
+    assert select_rows(table, view, "2-3, 1") == [0, 1, 2]
+    assert select_rows(table, view, "3-99") == [2]
+    assert select_rows(table, view, "cmd:s") == [1]
+    assert select_rows(table, view, "sha:C7D") == [2]
+    assert select_rows(table, view, "/^Add /") == [0, 2]
+    assert select_rows(table, view, "TYPO") == [1]
+
+def test_action_table_bulk_reads_and_take():
+    table = ActionTable([RebaseAction("pick", "aaa1111", "a"), RebaseAction("pick", "not-hex", "b ✓"),
+                         RebaseAction("exec", "", "make"), RebaseAction("fixup", "bb22", "d", "-C")])
+    assert table.commit_hashes(range(4)) == ["aaa1111", "not-hex", "", "bb22"]
+    assert table.messages([3, 1]) == ["d", "b ✓"]
+    taken = table.take([3, 1, 0])
+    assert list(taken.iter_lines()) == ["fixup -C bb22 d", "pick not-hex b ✓", "pick aaa1111 a"]
+    assert len(table) == 4 and taken.take([2]).messages([0]) == ["a"]
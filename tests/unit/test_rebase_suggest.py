@@ -0,0 +1,53 @@
+from git_pal.git import CommitInfo
+from git_pal.rebase.overlap import FileOverlapIndex
+from git_pal.rebase.state import ActionTable, RebaseAction
+from git_pal.rebase.suggest import apply_suggestions, suggest
+
+def _plan(*rows):
+    return ActionTable.from_actions([RebaseAction(cmd, sha, msg) for cmd, sha, msg in rows])
+
+def test_autosquash_markers_match_earlier_commits():
+    plan = _plan(
+        ("pick", "aaa1111", "Add parser"),
+        ("pick", "bbb2222", "Add writer"),
+        ("pick", "ccc3333", "fixup! Add parser"),
+        ("pick", "ddd4444", "squash! bbb22"),
+        ("pick", "eee5555", "amend! fixup! Add wri"),
+        ("pick", "fff6666", "fixup! Nothing like this"),
+    )
+    found = [(s.index, s.target, s.command, s.flags) for s in suggest(plan)]
+    assert found == [(2, 0, "fixup", ""), (3, 1, "squash", ""), (4, 1, "fixup", "-C")]
+
+    applied = apply_suggestions(plan, suggest(plan))
+    assert list(applied.iter_lines()) == [
+        "pick aaa1111 Add parser",
+        "fixup ccc3333 fixup! Add parser",
+        "pick bbb2222 Add writer",
+        "squash ddd4444 squash! bbb22",
+        "fixup -C eee5555 amend! fixup! Add wri",
+        "pick fff6666 fixup! Nothing like this",
+    ]
+
+def test_small_commit_overlap_suggestion():
+    plan = _plan(("pick", "a1", "core"), ("pick", "b2", "docs"), ("pick", "c3", "tweak"), ("pick", "d4", "big"))
+    index = FileOverlapIndex()
+    index.add("a1", ["core.py", "util.py"])
+    index.add("b2", ["README"])
+    index.add("c3", ["util.py"])
+    index.add("d4", ["core.py"])
+    assert suggest(plan, index, {}) == []  # no diffstat yet: size unknown
+    info = {"c3": CommitInfo("c3", "x", 0, 1, 3, 1), "d4": CommitInfo("d4", "x", 0, 1, 400, 0)}
+    found = [(s.index, s.target, s.reason) for s in suggest(plan, index, info)]
+    assert found == [(2, 0, "fixup by file overlap")]
+
+def test_suggest_is_linear_on_large_plans():
+    rows = [("pick", f"{i:07x}", f"commit {i}") for i in range(50_000)]
+    rows += [("pick", f"f{i:06x}", f"fixup! commit {i * 7}") for i in range(5_000)]
+    found = suggest(_plan(*rows))
+    assert len(found) == 5_000 and found[-1].target == 4_999 * 7
+
+    # Many commits sharing one subject, each fixed up by subject prefix.
+    rows = [("pick", f"{i:07x}", "WIP") for i in range(20_000)]
+    rows += [("pick", f"f{i:06x}", "fixup! WI") for i in range(20_000)]
+    found = suggest(_plan(*rows))
+    assert len(found) == 20_000 and all(s.target == 0 for s in found)
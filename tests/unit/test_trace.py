@@ -0,0 +1,39 @@
+import json
+import os
+from pathlib import Path
+
+from git_pal import trace
+
+def test_disabled_tracing_is_a_no_op():
+    assert not trace.enabled()
+
+    def work():
+        return 42
+    assert trace.traced("work")(work) is work
+    assert trace.span("a") is trace.span("b")
+    trace.instant("ignored")
+
+def test_spans_are_written_as_chrome_trace_events(tmp_path: Path):
+    path = tmp_path / "trace.json"
+    trace.start(path)
+    try:
+        traced_sum = trace.traced("sum")(lambda n: sum(range(n)))
+        with trace.span("outer", "cli", rows=3):
+            assert traced_sum(10) == 45
+            trace.instant("first frame", "tui")
+    finally:
+        assert trace.stop() is not None
+    assert not trace.enabled() and trace.span("after") is trace.span("stop")
+
+    events = json.loads(path.read_text(encoding="utf-8"))["traceEvents"]
+    assert events[0] == {"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": "git-pal"}}
+    by_name = {e["name"]: e for e in events if e["ph"] != "M"}
+    outer, inner, mark = by_name["outer"], by_name["sum"], by_name["first frame"]
+    assert outer["ph"] == inner["ph"] == "X" and mark["ph"] == "i"
+    assert outer["args"] == {"rows": 3} and outer["cat"] == "cli"
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert outer["ts"] <= mark["ts"] <= outer["ts"] + outer["dur"]
+
+def test_trace_path_from_env_value(tmp_path: Path):
+    assert trace.trace_path("1").name == f"git-pal-trace-{os.getpid()}.json"
+    assert trace.trace_path(str(tmp_path / "t-{pid}.json")) == tmp_path / f"t-{os.getpid()}.json"